@@ -14,6 +14,7 @@ dotenv.config();
 const app = express();
 const PORT = process.env.PORT || 3001;
 const ML_API_URL = process.env.ML_API_URL || 'http://localhost:5001/api';
+const ML_API_TIMEOUT_MS = parseInt(process.env.ML_API_TIMEOUT_MS, 10) || 2000;
 
 // ============================================
 // SECURITY CONFIGURATION
@@ -555,15 +556,25 @@ app.get('/api/collective/average',
 // ============================================
 
 // Helper function to call ML API
+// Always JSON: the backend sends per-user requests and cohorts of nested advanced
+// payloads, while the ML API's binary format only covers flat session/trend/classify rows
 async function callMLAPI(endpoint, method = 'GET', body = null) {
   try {
+    // The ML API drops requests that cannot finish within this budget
     const options = {
       method,
-      headers: { 'Content-Type': 'application/json' }
+      headers: {
+        'Content-Type': 'application/json',
+        'X-Request-Timeout-Ms': String(ML_API_TIMEOUT_MS)
+      },
+      signal: AbortSignal.timeout(ML_API_TIMEOUT_MS)
     };
     if (body) options.body = JSON.stringify(body);
     
     const response = await fetch(`${ML_API_URL}${endpoint}`, options);
+    if (response.status === 503) {
+      return { success: false, error: 'ML API busy, please retry shortly' };
+    }
     return await response.json();
   } catch (error) {
     console.error('ML API error:', error);
@@ -571,6 +582,31 @@ async function callMLAPI(endpoint, method = 'GET', body = null) {
   }
 }
 
+// Build the ML API's advanced prediction payload from a user's recent sessions
+function buildAdvancedRequest(sessions, currentSanity) {
+  const history = sessions.slice(0, 10).reverse().map(s => s.sanity_level);
+  const now = new Date();
+
+  return {
+    current_sanity: Number(currentSanity),
+    history: history,
+    session_data: {
+      hour: now.getHours(),
+      day_of_week: now.getDay(),
+      session_duration: 15.0,
+      interactions: sessions.length,
+      stress_level: Number(currentSanity) < 50 ? 100 - Number(currentSanity) : 50,
+      mood_factor: Number(currentSanity) / 20
+    },
+    user_stats: {
+      session_count: sessions.length,
+      avg_duration: 15.0,
+      interaction_rate: sessions.length / Math.max(1, sessions.length / 10),
+      consistency: calculateConsistency(history)
+    }
+  };
+}
+
 // Get AI predictions for user
 app.post('/api/ml/predict/advanced',
   [
@@ -602,27 +638,7 @@ app.post('/api/ml/predict/advanced',
       }
 
       // Prepare ML request
-      const history = sessions.slice(0, 10).reverse().map(s => s.sanity_level);
-      const now = new Date();
-
-      const mlRequest = {
-        current_sanity: Number(currentSanity),
-        history: history,
-        session_data: {
-          hour: now.getHours(),
-          day_of_week: now.getDay(),
-          session_duration: 15.0,
-          interactions: sessions.length,
-          stress_level: Number(currentSanity) < 50 ? 100 - Number(currentSanity) : 50,
-          mood_factor: Number(currentSanity) / 20
-        },
-        user_stats: {
-          session_count: sessions.length,
-          avg_duration: 15.0,
-          interaction_rate: sessions.length / Math.max(1, sessions.length / 10),
-          consistency: calculateConsistency(history)
-        }
-      };
+      const mlRequest = buildAdvancedRequest(sessions, currentSanity);
 
       // Call ML API
       const prediction = await callMLAPI('/predict/advanced', 'POST', mlRequest);
@@ -634,15 +650,60 @@ app.post('/api/ml/predict/advanced',
     }
   });
 
+// Get AI predictions for many users in one ML API call (admin dashboards, digests)
+app.post('/api/ml/predict/cohort',
+  [
+    body('users').isArray({ min: 1, max: 1000 }).withMessage('Users must be an array of 1 to 1000 entries'),
+    body('users.*.userId').isString().withMessage('User ID must be a string').isLength({ max: 50 }).withMessage('User ID too long'),
+    body('users.*.currentSanity').isFloat({ min: 0, max: 100 }).withMessage('Current sanity must be between 0 and 100')
+  ],
+  handleValidationErrors,
+  async (req, res) => {
+    try {
+      const users = await Promise.all(req.body.users.map(async ({ userId, currentSanity }) => {
+        const sanitizedUserId = sanitizeUserId(userId);
+        const sessions = await storage.getUserSessions(sanitizedUserId, 20);
+        return { userId: sanitizedUserId, currentSanity, sessions };
+      }));
+
+      // Users without enough history are reported, not sent to the ML API
+      const eligible = users.filter(u => u.sessions.length >= 5);
+      const skipped = users
+        .filter(u => u.sessions.length < 5)
+        .map(u => ({
+          user_id: u.userId,
+          success: false,
+          error: 'Not enough session data for predictions (need at least 5 sessions)'
+        }));
+
+      if (eligible.length === 0) {
+        return res.json({ success: true, users: skipped, aggregates: null });
+      }
+
+      const prediction = await callMLAPI('/predict/cohort', 'POST', {
+        users: eligible.map(u => ({ user_id: u.userId, ...buildAdvancedRequest(u.sessions, u.currentSanity) }))
+      });
+      if (prediction.success) {
+        prediction.users = prediction.users.concat(skipped);
+      }
+      res.json(prediction);
+
+    } catch (error) {
+      console.error('Error getting cohort predictions:', error);
+      res.status(500).json({ success: false, error: 'Oops! Our AI is taking a sanity break. Please try again!' });
+    }
+  });
+
 // Predict trend
 app.post('/api/ml/predict/trend',
   [
-    body('userId').isString().withMessage('User ID must be a string').isLength({ max: 50 }).withMessage('User ID too long')
+    body('userId').isString().withMessage('User ID must be a string').isLength({ max: 50 }).withMessage('User ID too long'),
+    body('horizon').optional().isInt({ min: 1, max: 60 }).withMessage('Horizon must be between 1 and 60')
   ],
   handleValidationErrors,
   async (req, res) => {
     try {
-      const { userId } = req.body;
+      const { userId, horizon } = req.body;
 
       // Sanitize userId
       const sanitizedUserId = sanitizeUserId(userId);
@@ -657,7 +718,7 @@ app.post('/api/ml/predict/trend',
       }
 
       const history = sessions.reverse().map(s => s.sanity_level);
-      const prediction = await callMLAPI('/predict/trend', 'POST', { history });
+      const prediction = await callMLAPI('/predict/trend', 'POST', horizon ? { history, horizon: Number(horizon) } : { history });
       res.json(prediction);
 
     } catch (error) {
@@ -742,6 +803,7 @@ app.listen(PORT, async () => {
   console.log(`   POST /api/snapshots - Save sanity snapshot (validated)`);
   console.log(`   GET  /api/mood/current - Get current mood`);
   console.log(`   POST /api/ml/predict/advanced - AI predictions (validated)`);
+  console.log(`   POST /api/ml/predict/cohort - Batch AI predictions for many users (validated)`);
   console.log(`   POST /api/ml/predict/trend - Trend predictions (validated)`);
 });
 
@@ -0,0 +1,168 @@
+"""
+Admission Control for the Sanity Orb ML API
+Bounded in-flight requests per route, deadline propagation and overload state
+
+Each guarded route has an in-flight limit. A request that finds its route
+full waits for a slot only as long as its deadline allows, then gets a fast
+503 instead of queueing behind everyone else. Deadlines come from the
+X-Request-Timeout-Ms (remaining budget) or X-Request-Deadline (unix epoch
+ms) headers. Routes can ask whether they should degrade, i.e. skip optional
+work, when they are close to their limit or short on time.
+"""
+
+import functools
+import os
+import threading
+import time
+
+from flask import g, jsonify, request
+
+TIMEOUT_HEADER = 'X-Request-Timeout-Ms'
+DEADLINE_HEADER = 'X-Request-Deadline'
+
+DEFAULT_LIMITS = {'session': 32, 'trend': 32, 'classify': 32, 'advanced': 16, 'cohort': 4, 'explain': 8}
+
+# Longest a request without a deadline waits for a free slot
+MAX_QUEUE_WAIT = 0.05
+
+# Fraction of a route's limit in use above which it degrades
+DEGRADE_AT = 0.75
+
+# Smoothing factor for per-route service-time averages
+EWMA_ALPHA = 0.1
+
+def parse_limits(spec=None):
+    """ML_MAX_INFLIGHT "advanced=8,session=64" -> limits merged over the defaults"""
+    spec = spec if spec is not None else os.environ.get('ML_MAX_INFLIGHT', '')
+    limits = dict(DEFAULT_LIMITS)
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        route, _, value = part.partition('=')
+        if route not in limits:
+            raise ValueError(f"Unknown route in ML_MAX_INFLIGHT: {route}")
+        limits[route] = int(value)
+    return limits
+
+def request_deadline(now=None):
+    """Absolute deadline (time.time() seconds) from the request headers, or None"""
+    now = now or time.time()
+    try:
+        if TIMEOUT_HEADER in request.headers:
+            return now + float(request.headers[TIMEOUT_HEADER]) / 1000
+        if DEADLINE_HEADER in request.headers:
+            return float(request.headers[DEADLINE_HEADER]) / 1000
+    except ValueError:
+        pass
+    return None
+
+def remaining(deadline=None):
+    """Seconds left before the current request's deadline (inf without one)"""
+    deadline = deadline if deadline is not None else g.get('deadline')
+    return float('inf') if deadline is None else deadline - time.time()
+
+class RouteState:
+    def __init__(self, limit):
+        self.limit = limit
+        self.slots = threading.BoundedSemaphore(limit)
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_late = 0
+        self.degraded = 0
+        self.service_time = None
+        self.last_rejected = 0.0
+
+class AdmissionController:
+    def __init__(self, limits=None):
+        self.lock = threading.Lock()
+        self.routes = {name: RouteState(limit) for name, limit in (limits or parse_limits()).items()}
+
+    def _reject(self, state, reason, counter):
+        with self.lock:
+            setattr(state, counter, getattr(state, counter) + 1)
+            state.last_rejected = time.time()
+        response = jsonify({'success': False, 'error': reason})
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+
+    def guard(self, route):
+        """Decorator that admits a request to `route` or answers 503"""
+        state = self.routes[route]
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                deadline = request_deadline()
+                g.deadline = deadline
+                g.route = route
+                budget = remaining(deadline)
+                expected = state.service_time or 0.0
+                if budget <= expected:
+                    return self._reject(state, 'Deadline exceeded before processing', 'rejected_late')
+                if not state.slots.acquire(timeout=min(MAX_QUEUE_WAIT, max(budget - expected, 0))):
+                    return self._reject(state, 'Server overloaded, try again shortly', 'rejected_full')
+                try:
+                    if remaining(deadline) <= 0:
+                        return self._reject(state, 'Deadline exceeded while queued', 'rejected_late')
+                    with self.lock:
+                        state.in_flight += 1
+                        state.admitted += 1
+                    start = time.perf_counter()
+                    try:
+                        return view(*args, **kwargs)
+                    finally:
+                        elapsed = time.perf_counter() - start
+                        with self.lock:
+                            state.in_flight -= 1
+                            state.service_time = elapsed if state.service_time is None else \
+                                (1 - EWMA_ALPHA) * state.service_time + EWMA_ALPHA * elapsed
+                finally:
+                    state.slots.release()
+            return wrapper
+        return decorator
+
+    def reset_counters(self):
+        """Zero the counters and service times, e.g. after cold warmup traffic"""
+        with self.lock:
+            for s in self.routes.values():
+                s.admitted = s.rejected_full = s.rejected_late = s.degraded = 0
+                s.last_rejected = 0.0
+                s.service_time = None
+
+    def should_degrade(self, route):
+        """
+        True when the route should skip optional work for this request
+
+        Either the route is past DEGRADE_AT of its limit, or the remaining
+        deadline is shorter than the route's average service time.
+        """
+        state = self.routes[route]
+        degrade = state.in_flight > state.limit * DEGRADE_AT or \
+            remaining() < (state.service_time or 0.0)
+        if degrade:
+            with self.lock:
+                state.degraded += 1
+        return degrade
+
+    def status(self, window=10.0):
+        """Per-route state for /api/health; overloaded if anything was rejected within `window` seconds"""
+        now = time.time()
+        with self.lock:
+            routes = {
+                name: {
+                    'in_flight': s.in_flight,
+                    'limit': s.limit,
+                    'admitted': s.admitted,
+                    'rejected_full': s.rejected_full,
+                    'rejected_late': s.rejected_late,
+                    'degraded': s.degraded,
+                    'avg_service_ms': round((s.service_time or 0.0) * 1000, 3)
+                }
+                for name, s in self.routes.items()
+            }
+            overloaded = any(now - s.last_rejected < window for s in self.routes.values())
+            saturated = any(s.in_flight > s.limit * DEGRADE_AT for s in self.routes.values())
+        return {
+            'state': 'overloaded' if overloaded else 'degraded' if saturated else 'normal',
+            'routes': routes
+        }
@@ -0,0 +1,129 @@
+"""
+Serving Layout Benchmark for the Sanity Orb ML API
+Measures throughput and tail latency of serve.py for each workers x threads
+layout, against the unpinned single-worker training-default baseline
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime
+
+from load_test import DEFAULT_MIX, HTTPClient, parse_mix, run_load, summarize
+from serve import available_cpus
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = 'ml-model/benchmarks'
+RESULTS_FILE = 'serving_layouts.json'
+
+def default_layouts(cpus):
+    """Every workers x threads split that uses all CPUs exactly"""
+    return [(cpus // t, t) for t in range(1, cpus + 1) if cpus % t == 0]
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _wait_ready(url, workers=1, timeout=60):
+    """Poll /api/ready until each of the workers has answered ready (200) at least once"""
+    deadline = time.time() + timeout
+    ready = set()
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/api/ready", timeout=2) as response:
+                ready.add(json.loads(response.read())['pid'])
+            if len(ready) >= workers:
+                return True
+        except OSError:
+            # Not listening yet, or 503 while loading and warming up
+            pass
+        time.sleep(0.2)
+    return False
+
+@contextmanager
+def serving_process(workers=1, threads=1, inference_threads=None):
+    """Run serve.py on a free local port for the duration of the block, yielding its URL"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ)
+    if inference_threads is not None:
+        env['ML_INFERENCE_THREADS'] = str(inference_threads)
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ML_DIR, 'serve.py'), '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), '--threads', str(threads)],
+        cwd=os.path.dirname(ML_DIR), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not _wait_ready(url, workers):
+            raise RuntimeError(f"Server for layout {workers}x{threads} did not become ready")
+        yield url
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+def run_layout(workers, threads, inference_threads=None, concurrency=16, duration=10.0, mix=DEFAULT_MIX):
+    """Start serve.py with one layout, load it over HTTP and stop it"""
+    with serving_process(workers, threads, inference_threads) as url:
+        run_load(lambda: HTTPClient(url), mix, concurrency, duration=1.0)
+        samples, elapsed = run_load(lambda: HTTPClient(url), mix, concurrency, duration)
+        return summarize(samples, elapsed)['overall']
+
+def main(layouts=None, concurrency=16, duration=10.0, mix=DEFAULT_MIX, baseline=True,
+         output_dir=BENCHMARK_DIR):
+    cpus = len(available_cpus())
+    layouts = layouts or default_layouts(cpus)
+    runs = []
+    if baseline:
+        runs.append(('baseline (1 worker, nthread=-1)', 1, cpus, -1))
+    runs += [(f"{w} x {t}", w, t, None) for w, t in layouts]
+
+    print("\n" + "="*70)
+    print("SANITY ORB - SERVING LAYOUT BENCHMARK")
+    print("="*70)
+    print(f"{cpus} CPUs, concurrency {concurrency}, {duration:.0f}s per layout")
+    print(f"\n  {'layout':32s} {'req/s':>8s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'errs':>5s}")
+
+    results = []
+    for label, workers, threads, nthread in runs:
+        s = run_layout(workers, threads, nthread, concurrency, duration, mix)
+        results.append({'layout': label, 'workers': workers, 'threads': threads,
+                        'inference_threads': nthread if nthread is not None else threads, **s})
+        print(f"  {label:32s} {s['rps']:8.1f} {s['p50_ms']:7.2f}ms {s['p95_ms']:7.2f}ms "
+              f"{s['p99_ms']:7.2f}ms {s['errors']:5d}")
+
+    best = max(results, key=lambda r: r['rps'])
+    print(f"\n✓ Best layout: {best['layout']} at {best['rps']:.1f} req/s")
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, RESULTS_FILE)
+    with open(path, 'w') as f:
+        json.dump({'date': datetime.now().isoformat(), 'cpus': cpus, 'concurrency': concurrency,
+                   'duration_s': duration, 'results': results}, f, indent=2)
+    print(f"✓ Results saved to {path}")
+    return results
+
+if __name__ == '__main__':
+    import argparse
+    from serve import parse_layout
+
+    parser = argparse.ArgumentParser(description='Benchmark ML API throughput per worker/thread layout')
+    parser.add_argument('--layouts', type=parse_layout, nargs='+',
+                        help='workers x threads, e.g. 4x1 2x2 1x4 (default: all exact splits)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per layout')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX)
+    parser.add_argument('--no-baseline', action='store_true')
+    parser.add_argument('--output-dir', default=BENCHMARK_DIR)
+    args = parser.parse_args()
+
+    main(args.layouts, args.concurrency, args.duration, args.mix, not args.no_baseline, args.output_dir)
@@ -0,0 +1,107 @@
+"""
+Cold-Start Benchmark for the Sanity Orb ML API
+Measures import time, model load time and baseline RSS of a fresh worker
+process in the full and lean (ML_LEAN_RUNTIME=1) serving runtimes
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = 'ml-model/benchmarks'
+RESULTS_FILE = 'startup.json'
+
+RUNTIMES = {'full': '0', 'lean': '1'}
+
+# Runs in a fresh interpreter; prints one JSON line
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import ml_api
+imported = time.perf_counter()
+ok = ml_api.load_models()
+loaded = time.perf_counter()
+ml_api.predict('session', [ml_api.session_features(dict.fromkeys(
+    ['hour', 'day_of_week', 'session_duration', 'interactions', 'prev_sanity_1',
+     'prev_sanity_2', 'prev_sanity_3', 'stress_level', 'mood_factor'], 50.0))])
+predicted = time.perf_counter()
+from shared_model_store import process_memory
+print(json.dumps({
+    'ok': ok,
+    'import_s': imported - start,
+    'load_s': loaded - imported,
+    'first_predict_s': predicted - loaded,
+    'memory': process_memory(),
+    'modules': len(sys.modules),
+    'heavy_modules': [m for m in ('pandas', 'sklearn', 'scipy', 'joblib') if sys.modules.get(m) is not None]
+}))
+"""
+
+def probe(lean):
+    """Start one fresh interpreter and measure it"""
+    env = dict(os.environ, ML_LEAN_RUNTIME=RUNTIMES['lean' if lean else 'full'], PYTHONPATH=ML_DIR)
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE], cwd=os.path.dirname(ML_DIR), env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(runs):
+    median = lambda key: statistics.median(r[key] for r in runs)
+    return {
+        'runs': len(runs),
+        'import_s': median('import_s'),
+        'load_s': median('load_s'),
+        'first_predict_s': median('first_predict_s'),
+        'startup_s': statistics.median(r['import_s'] + r['load_s'] + r['first_predict_s'] for r in runs),
+        'rss_mb': statistics.median(r['memory'].get('rss_mb', 0) for r in runs),
+        'private_mb': statistics.median(r['memory'].get('private_mb', 0) for r in runs),
+        'modules': runs[-1]['modules'],
+        'heavy_modules': runs[-1]['heavy_modules']
+    }
+
+def main(repeats=5, output_dir=BENCHMARK_DIR):
+    print("\n" + "="*70)
+    print("SANITY ORB - ML API COLD START")
+    print("="*70)
+
+    results = {}
+    for runtime in RUNTIMES:
+        runs = [probe(runtime == 'lean') for _ in range(repeats)]
+        if not all(r['ok'] for r in runs):
+            print(f"❌ Models failed to load in the {runtime} runtime")
+            return None
+        results[runtime] = summarize(runs)
+
+    print(f"\n  {'runtime':8s} {'import':>8s} {'load':>8s} {'1st pred':>9s} {'total':>8s} "
+          f"{'RSS':>8s} {'private':>8s} {'modules':>8s}  heavy")
+    for runtime, s in results.items():
+        print(f"  {runtime:8s} {s['import_s']:7.2f}s {s['load_s']:7.2f}s {s['first_predict_s']*1000:7.1f}ms "
+              f"{s['startup_s']:7.2f}s {s['rss_mb']:6.1f}MB {s['private_mb']:6.1f}MB {s['modules']:8d}  "
+              f"{', '.join(s['heavy_modules']) or '-'}")
+
+    full, lean = results['full'], results['lean']
+    print(f"\n✓ Lean runtime: {full['startup_s'] / lean['startup_s']:.1f}x faster start, "
+          f"{full['rss_mb'] - lean['rss_mb']:.0f} MB less RSS per worker")
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, RESULTS_FILE)
+    with open(path, 'w') as f:
+        json.dump({'date': datetime.now().isoformat(), 'python': sys.version.split()[0],
+                   'results': results}, f, indent=2)
+    print(f"✓ Results saved to {path}")
+    return results
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure ML API cold start in the full and lean runtimes')
+    parser.add_argument('--repeats', type=int, default=5, help='fresh processes per runtime')
+    parser.add_argument('--output-dir', default=BENCHMARK_DIR)
+    args = parser.parse_args()
+
+    main(args.repeats, args.output_dir)
@@ -0,0 +1,243 @@
+"""
+Training Performance Benchmark for Sanity Orb ML Models
+Times data generation, training, save/load and inference at several dataset
+sizes, keeps a JSON history and flags regressions against a stored baseline
+"""
+
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_DIR = 'ml-model/benchmarks'
+HISTORY_FILE = 'training_history.json'
+BASELINE_FILE = 'training_baseline.json'
+
+DEFAULT_SIZES = [1000, 5000, 20000]
+
+STEPS = ['generate', 'train_session', 'train_trend', 'train_classifier', 'load', 'inference']
+
+# Metrics compared against the baseline; all are "lower is better"
+TRACKED_METRICS = [
+    'wall_time_s', 'peak_rss_mb', 'model_size_kb',
+    'single_row_p50_ms', 'single_row_p99_ms', 'batch_p50_ms', 'batch_p99_ms'
+]
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _latency_percentiles(fn, n_calls):
+    timings = []
+    for _ in range(n_calls):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.percentile(timings, 50)), float(np.percentile(timings, 99))
+
+def _step_inference(work_dir):
+    """Single-row and batch predict latency through the sklearn wrappers, as ml_api.py serves"""
+    import pandas as pd
+    from xgboost_models import MODEL_SPECS, SanityXGBoostModels
+
+    models = SanityXGBoostModels(models_dir=os.path.join(work_dir, 'models'))
+    models.load_models()
+    targets = {
+        'session': models.session_model,
+        'trend_value': models.trend_model['value'],
+        'classifier': models.classification_model
+    }
+    result = {}
+    for key, model in targets.items():
+        spec = MODEL_SPECS[key]
+        df = pd.read_csv(os.path.join(work_dir, 'data', spec['data_file']),
+                         usecols=spec['features'], nrows=1000)
+        rows = [df.iloc[[i]] for i in range(min(len(df), 200))]
+        model.predict(rows[0])
+        calls = itertools.cycle(rows)
+        p50, p99 = _latency_percentiles(lambda: model.predict(next(calls)), len(rows))
+        result[f'{key}_single_row_p50_ms'] = p50
+        result[f'{key}_single_row_p99_ms'] = p99
+        p50, p99 = _latency_percentiles(lambda: model.predict(df), 20)
+        result[f'{key}_batch_p50_ms'] = p50
+        result[f'{key}_batch_p99_ms'] = p99
+    # Headline numbers track the largest model
+    for name in ('single_row_p50_ms', 'single_row_p99_ms', 'batch_p50_ms', 'batch_p99_ms'):
+        result[name] = result[f'session_{name}']
+    result['batch_rows'] = len(df)
+    return result
+
+def _run_step(step, size, work_dir):
+    """Execute one benchmark step; runs in a fresh process so peak RSS is per step"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.join(work_dir, 'data')
+    models_dir = os.path.join(work_dir, 'models')
+    result = {}
+    # Imports happen before the timer so wall_time_s measures only the step itself
+    with contextlib.redirect_stdout(io.StringIO()):
+        if step == 'generate':
+            from data_generator import SanityDataGenerator
+        else:
+            from xgboost_models import SanityXGBoostModels
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if step == 'generate':
+            os.makedirs(data_dir, exist_ok=True)
+            SanityDataGenerator(num_samples=size).save_all_datasets(output_dir=data_dir)
+        elif step.startswith('train_'):
+            models = SanityXGBoostModels(models_dir=models_dir)
+            if step == 'train_session':
+                models.train_session_predictor(os.path.join(data_dir, 'session_data.csv'))
+                files = ['session_predictor.json']
+            elif step == 'train_trend':
+                models.train_trend_predictor(os.path.join(data_dir, 'trend_data.csv'))
+                files = ['trend_value_predictor.json', 'trend_confidence_predictor.json']
+            else:
+                models.train_classifier(os.path.join(data_dir, 'classification_data.csv'))
+                files = ['sanity_classifier.json']
+            result['model_size_kb'] = sum(
+                os.path.getsize(os.path.join(models_dir, f)) for f in files
+            ) / 1024
+        elif step == 'load':
+            SanityXGBoostModels(models_dir=models_dir).load_models()
+        elif step == 'inference':
+            result.update(_step_inference(work_dir))
+    result['wall_time_s'] = time.perf_counter() - start
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+def _step_process(step, size, work_dir, queue):
+    try:
+        queue.put(('ok', _run_step(step, size, work_dir)))
+    except Exception as e:
+        queue.put(('error', f"{type(e).__name__}: {e}"))
+
+def run_benchmark(sizes=DEFAULT_SIZES):
+    """Run every step at every size and return the run record"""
+    ctx = multiprocessing.get_context('spawn')
+    run = {
+        'date': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'results': {}
+    }
+    for size in sizes:
+        print(f"\n>>> Dataset size {size}")
+        work_dir = tempfile.mkdtemp(prefix='sanity_bench_')
+        try:
+            size_results = {}
+            for step in STEPS:
+                queue = ctx.Queue()
+                proc = ctx.Process(target=_step_process, args=(step, size, work_dir, queue))
+                proc.start()
+                status, payload = queue.get()
+                proc.join()
+                if status != 'ok':
+                    raise RuntimeError(f"Step {step} failed at size {size}: {payload}")
+                size_results[step] = payload
+                extra = ''
+                if 'single_row_p50_ms' in payload:
+                    extra = (f", p50 {payload['single_row_p50_ms']:.3f}ms"
+                             f", p99 {payload['single_row_p99_ms']:.3f}ms")
+                elif 'model_size_kb' in payload:
+                    extra = f", {payload['model_size_kb']:.0f} KB"
+                print(f"  {step:18s} {payload['wall_time_s']:8.2f}s "
+                      f"{payload['peak_rss_mb'] or 0:8.1f} MB{extra}")
+            run['results'][str(size)] = size_results
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return run
+
+def find_regressions(run, baseline, threshold):
+    """List every tracked metric that got worse than baseline * (1 + threshold)"""
+    regressions = []
+    for size, steps in run['results'].items():
+        for step, metrics in steps.items():
+            base_metrics = baseline.get('results', {}).get(size, {}).get(step, {})
+            for name in TRACKED_METRICS:
+                current = metrics.get(name)
+                base = base_metrics.get(name)
+                if current is None or not base:
+                    continue
+                change = current / base - 1
+                if change > threshold:
+                    regressions.append({
+                        'size': int(size), 'step': step, 'metric': name,
+                        'baseline': base, 'current': current, 'change': change
+                    })
+    return regressions
+
+def _load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def main(sizes=DEFAULT_SIZES, threshold=0.2, save_baseline=False, output_dir=BENCHMARK_DIR):
+    print("\n" + "="*70)
+    print("SANITY ORB - TRAINING PERFORMANCE BENCHMARK")
+    print("="*70)
+
+    os.makedirs(output_dir, exist_ok=True)
+    run = run_benchmark(sizes)
+
+    baseline_path = os.path.join(output_dir, BASELINE_FILE)
+    baseline = _load_json(baseline_path, None)
+    run['threshold'] = threshold
+    run['regressions'] = find_regressions(run, baseline, threshold) if baseline else []
+
+    history_path = os.path.join(output_dir, HISTORY_FILE)
+    history = _load_json(history_path, [])
+    history.append(run)
+    with open(history_path, 'w') as f:
+        json.dump(history, f, indent=2)
+    print(f"\n✓ Run appended to {history_path}")
+
+    if save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"✓ Baseline saved to {baseline_path}")
+    elif baseline is None:
+        print("  No baseline yet - create one with --save-baseline")
+
+    if run['regressions']:
+        print(f"\n❌ {len(run['regressions'])} regression(s) beyond {threshold:.0%}:")
+        for r in run['regressions']:
+            print(f"  • size {r['size']} {r['step']} {r['metric']}: "
+                  f"{r['baseline']:.3f} -> {r['current']:.3f} (+{r['change']:.0%})")
+        return False
+
+    if baseline is not None:
+        print(f"\n✓ No regressions beyond {threshold:.0%}")
+    return True
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark Sanity Orb model training and inference')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='dataset sizes (samples per dataset)')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown that counts as a regression')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store this run as the baseline for future comparisons')
+    parser.add_argument('--output-dir', default=BENCHMARK_DIR)
+    args = parser.parse_args()
+
+    ok = main(args.sizes, args.threshold, args.save_baseline, args.output_dir)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,172 @@
+"""
+Wire Format Benchmark for the Sanity Orb ML API
+Payload size and end-to-end HTTP latency of JSON vs the binary float32
+format, for single predictions and bulk batches
+
+Binary blocks are built from the same payloads as the JSON requests, and
+every binary response is checked against the JSON responses, so the two
+formats are held to one input contract and one output scale.
+"""
+
+import http.client
+import json
+import os
+import time
+import urllib.request
+from datetime import datetime
+from urllib.parse import urlparse
+
+import numpy as np
+
+from benchmark_serving import serving_process
+from warmup import history_payload, session_payload, stats_payload
+from wire_format import KIND_REQUEST, REQUEST_COLUMNS, RESPONSE_COLUMNS, WIRE_MEDIA_TYPE, decode, encode
+
+BENCHMARK_DIR = 'ml-model/benchmarks'
+RESULTS_FILE = 'wire_format.json'
+
+ROUTES = ('session', 'trend', 'classify')
+PATHS = {'session': '/api/predict/session', 'trend': '/api/predict/trend', 'classify': '/api/predict/classify'}
+
+# JSON responses round to 2 decimals
+JSON_TOLERANCE = 0.01
+
+def json_outputs(route, response):
+    """One JSON response as {response column: value}, for the columns JSON also returns"""
+    if route == 'session':
+        return {'prediction': response['prediction']}
+    if route == 'trend':
+        return {'next_value': response['next_value'], 'confidence': response['confidence']}
+    outputs = {'category_id': response['category_id'], 'confidence': response['confidence']}
+    for name, probability in response['probabilities'].items():
+        outputs[f'p_{name.lower()}'] = probability
+    return outputs
+
+def check_outputs(route, json_responses, binary):
+    """Raise if the binary response disagrees with the JSON responses for the same rows"""
+    columns = RESPONSE_COLUMNS[route]
+    for i, response in enumerate(json_responses):
+        for name, expected in json_outputs(route, response).items():
+            actual = float(binary[i, columns.index(name)])
+            if abs(actual - expected) > JSON_TOLERANCE:
+                raise AssertionError(f"{route} row {i}: binary {name}={actual:.4f}, JSON {expected}")
+
+class RawClient:
+    """Keep-alive connection that returns raw bodies, so both formats are timed the same way"""
+
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+
+    def post(self, path, body, content_type):
+        self.conn.request('POST', path, body=body, headers={'Content-Type': content_type})
+        response = self.conn.getresponse()
+        data = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}: {data[:200]!r}")
+        return data
+
+def make_payloads(route, n, rng):
+    """n JSON bodies for the route and the equivalent binary request block"""
+    if route == 'trend':
+        histories = [history_payload(rng) for _ in range(n)]
+        payloads = [{'history': h} for h in histories]
+        block = histories
+    else:
+        make = session_payload if route == 'session' else stats_payload
+        payloads = [make(rng) for _ in range(n)]
+        block = [[p[name] for name in REQUEST_COLUMNS[route]] for p in payloads]
+    # Send float32-exact values in JSON too, so both formats see the same inputs
+    block = np.array(block, dtype=np.float32)
+    if route == 'trend':
+        payloads = [{'history': row.tolist()} for row in block]
+    else:
+        payloads = [dict(zip(REQUEST_COLUMNS[route], row.tolist())) for row in block]
+    bodies = [json.dumps(p).encode('utf-8') for p in payloads]
+    return bodies, encode(block, KIND_REQUEST)
+
+def measure(client, route, n, rng, repeats):
+    """Median wall time and bytes moved for n predictions, as n JSON calls and as one binary call"""
+    path = PATHS[route]
+    bodies, block = make_payloads(route, n, rng)
+
+    json_times, json_bytes = [], 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        json_bytes, responses = 0, []
+        for body in bodies:
+            responses.append(client.post(path, body, 'application/json'))
+            json_bytes += len(body) + len(responses[-1])
+        json_times.append(time.perf_counter() - start)
+
+    binary_times, binary_bytes = [], 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = client.post(path, block, WIRE_MEDIA_TYPE)
+        binary_times.append(time.perf_counter() - start)
+        binary_bytes = len(block) + len(response)
+    check_outputs(route, [json.loads(r) for r in responses], decode(response, kind=1))
+
+    json_ms = float(np.median(json_times)) * 1000
+    binary_ms = float(np.median(binary_times)) * 1000
+    return {
+        'route': route,
+        'rows': n,
+        'json_bytes': json_bytes,
+        'binary_bytes': binary_bytes,
+        'size_ratio': json_bytes / binary_bytes,
+        'json_ms': json_ms,
+        'binary_ms': binary_ms,
+        'speedup': json_ms / binary_ms
+    }
+
+def run(url, batch_sizes, repeats):
+    with urllib.request.urlopen(f"{url}/api/models/info", timeout=10) as response:
+        wire_format = json.loads(response.read())['wire_format']
+    if wire_format['request_columns'] != {k: list(v) for k, v in REQUEST_COLUMNS.items()}:
+        raise RuntimeError(f"{url} expects different request columns: {wire_format['request_columns']}")
+    client = RawClient(url)
+    rng = np.random.default_rng(0)
+    results = []
+    for route in ROUTES:
+        for n in batch_sizes:
+            # Fewer repeats for large batches sent as n JSON calls
+            results.append(measure(client, route, n, rng, repeats if n <= 100 else max(1, repeats // 5)))
+            r = results[-1]
+            print(f"  {route:9s} {n:6d} {r['json_bytes']:11,d} {r['binary_bytes']:10,d} {r['size_ratio']:6.1f}x "
+                  f"{r['json_ms']:9.2f}ms {r['binary_ms']:9.2f}ms {r['speedup']:7.1f}x")
+    return results
+
+def main(url=None, batch_sizes=(1, 100, 1000), repeats=20, output_dir=BENCHMARK_DIR):
+    print("\n" + "="*70)
+    print("SANITY ORB - WIRE FORMAT BENCHMARK (JSON vs binary float32)")
+    print("="*70)
+    print("JSON sends one request per prediction; binary sends the batch as one block\n")
+    print(f"  {'route':9s} {'rows':>6s} {'JSON bytes':>11s} {'bin bytes':>10s} {'size':>7s} "
+          f"{'JSON':>11s} {'binary':>11s} {'speedup':>8s}")
+
+    if url:
+        results = run(url, batch_sizes, repeats)
+    else:
+        with serving_process() as local_url:
+            results = run(local_url, batch_sizes, repeats)
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, RESULTS_FILE)
+    with open(path, 'w') as f:
+        json.dump({'date': datetime.now().isoformat(), 'url': url or 'serve.py 1x1',
+                   'repeats': repeats, 'results': results}, f, indent=2)
+    print(f"\n✓ Results saved to {path}")
+    return results
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare JSON and binary wire formats over HTTP')
+    parser.add_argument('--url', help='running ML API (default: start serve.py with one worker)')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 1000])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--output-dir', default=BENCHMARK_DIR)
+    args = parser.parse_args()
+
+    main(args.url, args.batch_sizes, args.repeats, args.output_dir)
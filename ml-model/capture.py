@@ -0,0 +1,153 @@
+"""
+Request Capture for the Sanity Orb ML API
+Samples live requests and responses into a compact append-only binary file
+
+File layout:
+    magic (8 bytes) | header length (u32) | header JSON
+    | records: arrival time (f64) | latency ms (f32) | route id (u8)
+      | status (u16) | request length (u32) | response length (u32)
+      | request body | response body
+
+Disk use is bounded: when the active file would pass max_bytes it is
+rotated to <path>.1, <path>.2, ... and only `keep` rotated files are kept.
+replay.py reads these files back.
+"""
+
+import json
+import os
+import random
+import struct
+import threading
+from datetime import datetime
+
+CAPTURE_MAGIC = b'SANITYRC'
+
+_HEADER_LEN = struct.Struct('<I')
+_RECORD = struct.Struct('<dfBHII')
+
+# Captured routes; the ids are part of the file format, append only
+ROUTE_IDS = {
+    '/api/predict/session': 1,
+    '/api/predict/trend': 2,
+    '/api/predict/classify': 3,
+    '/api/predict/advanced': 4,
+    '/api/predict/cohort': 5
+}
+ROUTE_PATHS = {v: k for k, v in ROUTE_IDS.items()}
+
+class CaptureWriter:
+    def __init__(self, path, sample_rate=1.0, max_bytes=64 << 20, keep=3, header=None, seed=None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.header = dict(header or {}, created=datetime.now().isoformat())
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.records = 0
+        self.dropped = 0
+        self.file = None
+        self.size = 0
+        self._open()
+
+    def _open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'ab', buffering=1 << 16)
+        self.size = self.file.tell()
+        if self.size == 0:
+            header = json.dumps(self.header).encode('utf-8')
+            self.file.write(CAPTURE_MAGIC + _HEADER_LEN.pack(len(header)) + header)
+            self.size = self.file.tell()
+
+    def _rotate(self):
+        self.file.close()
+        for i in range(self.keep, 0, -1):
+            source = self.path if i == 1 else f"{self.path}.{i - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i}")
+        if self.keep == 0:
+            os.remove(self.path)
+        self._open()
+
+    def sampled(self):
+        """Decide whether to capture the current request"""
+        return self.sample_rate >= 1.0 or self.rng.random() < self.sample_rate
+
+    def write(self, route, arrival, latency_ms, status, request_body, response_body):
+        route_id = ROUTE_IDS.get(route)
+        if route_id is None:
+            return False
+        record = _RECORD.pack(arrival, latency_ms, route_id, status,
+                              len(request_body), len(response_body)) + request_body + response_body
+        with self.lock:
+            if len(record) > self.max_bytes:
+                self.dropped += 1
+                return False
+            if self.size + len(record) > self.max_bytes:
+                self._rotate()
+            self.file.write(record)
+            self.size += len(record)
+            self.records += 1
+        return True
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'path': self.path,
+                'sample_rate': self.sample_rate,
+                'records': self.records,
+                'dropped': self.dropped,
+                'active_bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'keep': self.keep
+            }
+
+def capture_files(path):
+    """The active file and its rotations, oldest first"""
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        rotated.append(f"{path}.{i}")
+        i += 1
+    files = list(reversed(rotated))
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+def read_capture(path):
+    """
+    Yield (header, record) for every record in one capture file
+
+    record: dict with arrival, latency_ms, route, status, request, response
+    (request/response are raw bytes). A truncated final record is skipped.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"{path} is not a Sanity Orb capture file")
+        header_len, = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+        header = json.loads(f.read(header_len))
+        while True:
+            fixed = f.read(_RECORD.size)
+            if len(fixed) < _RECORD.size:
+                return
+            arrival, latency_ms, route_id, status, req_len, resp_len = _RECORD.unpack(fixed)
+            body = f.read(req_len + resp_len)
+            if len(body) < req_len + resp_len:
+                return
+            yield header, {
+                'arrival': arrival,
+                'latency_ms': latency_ms,
+                'route': ROUTE_PATHS.get(route_id, str(route_id)),
+                'status': status,
+                'request': body[:req_len],
+                'response': body[req_len:]
+            }
@@ -0,0 +1,71 @@
+"""
+In-Flight Request Coalescing for the Sanity Orb ML API
+Concurrent identical predictions share one model evaluation (single-flight)
+
+The first request for a key becomes the leader and computes the result;
+requests arriving with the same key while it runs wait for that result
+instead of evaluating the model again. Nothing is cached once the leader
+finishes, so results are never stale.
+"""
+
+import threading
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.leaders = 0
+        self.suppressed = 0
+
+    def do(self, key, fn):
+        """Return fn(), sharing one in-progress call among concurrent callers with the same key"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.leaders += 1
+            else:
+                call.waiters += 1
+                self.suppressed += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.result
+
+    def reset_counters(self):
+        with self.lock:
+            self.leaders = self.suppressed = 0
+
+    def stats(self):
+        with self.lock:
+            total = self.leaders + self.suppressed
+            return {
+                'requests': total,
+                'evaluations': self.leaders,
+                'suppressed': self.suppressed,
+                'suppression_rate': self.suppressed / total if total else 0.0,
+                'in_flight': len(self.calls)
+            }
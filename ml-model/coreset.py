@@ -0,0 +1,103 @@
+"""
+Stratified Coreset Sampling for Sanity Orb Models
+One streaming pass over a CSV's training split keeps a fixed-size uniform
+sample of every stratum, weighted back up to the stratum's size
+
+Each stratum (a sanity-value bin for the regressors, the category for the
+classifier) gets an equal share of the coreset and its own reservoir
+(Algorithm R), so rare strata are fully represented and memory is bounded
+by the coreset size, not the file. A kept row's weight is the stratum's
+row count divided by its kept count, so weighted sums over the coreset
+are unbiased estimates of sums over the whole training split.
+"""
+
+import numpy as np
+
+from data_streaming import DEFAULT_CHUNK_SIZE, iter_split_chunks
+
+DEFAULT_CORESET_SIZE = 20000
+
+# Sanity values are bucketed into ten bins of width 10
+SANITY_BIN_EDGES = np.arange(10, 100, 10)
+
+def sanity_bins(values):
+    """Sanity values in [0, 100] -> stratum 0..9"""
+    return np.searchsorted(SANITY_BIN_EDGES, values, side='right')
+
+def category_strata(values):
+    return np.asarray(values, dtype=np.int64)
+
+# Strata per label column: (stratum function, number of strata)
+STRATA = {
+    'current_sanity': (sanity_bins, len(SANITY_BIN_EDGES) + 1),
+    'next_value': (sanity_bins, len(SANITY_BIN_EDGES) + 1),
+    'category': (category_strata, 4)
+}
+
+class StratifiedReservoir:
+    """Per-stratum reservoirs of fixed capacity over a stream of row blocks"""
+
+    def __init__(self, n_strata, capacity, n_columns, seed=42):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.rows = np.empty((n_strata, capacity, n_columns), dtype=np.float64)
+        self.seen = np.zeros(n_strata, dtype=np.int64)
+
+    def add(self, strata, block):
+        """Offer one block of rows, each tagged with its stratum"""
+        for s in np.unique(strata):
+            rows = block[strata == s]
+            seen = self.seen[s]
+            # Fill the free slots first
+            free = max(min(self.capacity - seen, len(rows)), 0)
+            self.rows[s, seen:seen + free] = rows[:free]
+            rest = rows[free:]
+            if len(rest):
+                # Row i (1-based, over the whole stream) replaces slot j ~ U[0, i) when j < capacity
+                positions = np.arange(seen + free + 1, seen + len(rows) + 1)
+                slots = (self.rng.random(len(rest)) * positions).astype(np.int64)
+                kept = slots < self.capacity
+                slots, rest = slots[kept], rest[kept]
+                # Later rows win a contested slot, as in the sequential algorithm
+                _, last = np.unique(slots[::-1], return_index=True)
+                last = len(slots) - 1 - last
+                self.rows[s, slots[last]] = rest[last]
+            self.seen[s] += len(rows)
+
+    def sample(self):
+        """(rows, weights, strata) of everything kept"""
+        kept = np.minimum(self.seen, self.capacity)
+        rows = np.concatenate([self.rows[s, :k] for s, k in enumerate(kept)])
+        strata = np.repeat(np.arange(len(kept)), kept)
+        weights = (self.seen / np.maximum(kept, 1))[strata]
+        return rows, weights, strata
+
+def build_coreset(data_path, feature_columns, label_columns, size=DEFAULT_CORESET_SIZE,
+                  stratify=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """
+    Stratified coreset of a CSV's training split (the holdout_mask split)
+
+    Strata come from STRATA[stratify], by default the first label column.
+    Returns (X, {label: y}, weights, info) with float32 X and labels.
+    """
+    stratify = stratify or label_columns[0]
+    stratum_of, n_strata = STRATA[stratify]
+    columns = list(feature_columns) + [c for c in label_columns if c not in feature_columns]
+    reservoir = StratifiedReservoir(n_strata, max(size // n_strata, 1), len(columns), seed)
+    for chunk in iter_split_chunks(data_path, list(dict.fromkeys(columns + [stratify])),
+                                   'train', chunk_size=chunk_size):
+        reservoir.add(stratum_of(chunk[stratify].to_numpy()), chunk[columns].to_numpy(dtype=np.float64))
+
+    rows, weights, _ = reservoir.sample()
+    n_features = len(feature_columns)
+    X = rows[:, :n_features].astype(np.float32)
+    ys = {label: rows[:, columns.index(label)].astype(np.float32) for label in label_columns}
+    kept = np.minimum(reservoir.seen, reservoir.capacity)
+    info = {
+        'stratified_by': stratify,
+        'rows_seen': int(reservoir.seen.sum()),
+        'rows_kept': int(kept.sum()),
+        'strata': {str(s): {'seen': int(seen), 'kept': int(k)}
+                   for s, (seen, k) in enumerate(zip(reservoir.seen, kept)) if seen}
+    }
+    return X, ys, weights.astype(np.float32), info
@@ -7,6 +7,7 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import json
+import os
 
 class SanityDataGenerator:
     def __init__(self, num_samples=5000):
@@ -83,30 +84,34 @@ class SanityDataGenerator:
             
         return pd.DataFrame(data)
     
+    def generate_history(self, length=10):
+        """Generate one sanity history with an increasing, decreasing or stable trend"""
+        # Time series features
+        time_index = np.arange(length)
+        
+        # Generate a sequence with trend
+        trend = np.random.choice(['increasing', 'decreasing', 'stable'])
+        
+        if trend == 'increasing':
+            slope = np.random.uniform(0.5, 3)
+            base_values = 40 + time_index * slope
+        elif trend == 'decreasing':
+            slope = np.random.uniform(-3, -0.5)
+            base_values = 60 + time_index * slope
+        else:
+            slope = np.random.uniform(-0.5, 0.5)
+            base_values = 50 + time_index * slope
+        
+        # Add noise
+        sequence = base_values + np.random.normal(0, 3, length)
+        return np.clip(sequence, 0, 100)
+    
     def generate_trend_data(self):
         """Generate data for trend prediction"""
         data = []
         
         for i in range(self.num_samples):
-            # Time series features
-            time_index = np.arange(10)
-            
-            # Generate a sequence with trend
-            trend = np.random.choice(['increasing', 'decreasing', 'stable'])
-            
-            if trend == 'increasing':
-                slope = np.random.uniform(0.5, 3)
-                base_values = 40 + time_index * slope
-            elif trend == 'decreasing':
-                slope = np.random.uniform(-3, -0.5)
-                base_values = 60 + time_index * slope
-            else:
-                slope = np.random.uniform(-0.5, 0.5)
-                base_values = 50 + time_index * slope
-            
-            # Add noise
-            sequence = base_values + np.random.normal(0, 3, 10)
-            sequence = np.clip(sequence, 0, 100)
+            sequence = self.generate_history()
             
             # Calculate features
             mean_val = np.mean(sequence)
@@ -176,21 +181,21 @@ class SanityDataGenerator:
             
         return pd.DataFrame(data)
     
-    def save_all_datasets(self):
+    def save_all_datasets(self, output_dir='ml-model/data'):
         """Generate and save all datasets"""
         print("Generating session prediction data...")
         session_df = self.generate_session_data()
-        session_df.to_csv('ml-model/data/session_data.csv', index=False)
+        session_df.to_csv(os.path.join(output_dir, 'session_data.csv'), index=False)
         print(f"✓ Saved {len(session_df)} session records")
         
         print("\nGenerating trend prediction data...")
         trend_df = self.generate_trend_data()
-        trend_df.to_csv('ml-model/data/trend_data.csv', index=False)
+        trend_df.to_csv(os.path.join(output_dir, 'trend_data.csv'), index=False)
         print(f"✓ Saved {len(trend_df)} trend records")
         
         print("\nGenerating classification data...")
         classification_df = self.generate_classification_data()
-        classification_df.to_csv('ml-model/data/classification_data.csv', index=False)
+        classification_df.to_csv(os.path.join(output_dir, 'classification_data.csv'), index=False)
         print(f"✓ Saved {len(classification_df)} classification records")
         
         # Generate summary statistics
@@ -216,7 +221,7 @@ class SanityDataGenerator:
             }
         }
         
-        with open('ml-model/data/data_stats.json', 'w') as f:
+        with open(os.path.join(output_dir, 'data_stats.json'), 'w') as f:
             json.dump(stats, f, indent=2)
         
         print("\n✓ Data generation complete!")
@@ -226,7 +231,6 @@ class SanityDataGenerator:
 
 if __name__ == '__main__':
     # Create data directory
-    import os
     os.makedirs('ml-model/data', exist_ok=True)
     
     # Generate data
@@ -0,0 +1,105 @@
+"""
+Streaming Data Utilities for Sanity Orb ML Models
+Reads training CSVs in chunks so models can be trained and evaluated out-of-core
+"""
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+
+DEFAULT_CHUNK_SIZE = 50000
+
+def holdout_mask(start, n_rows, test_size=0.2, seed=42):
+    """
+    Deterministic train/test assignment for rows [start, start + n_rows)
+
+    Each row is hashed from its absolute position in the file, so the split
+    is identical on every pass and does not depend on the chunk size.
+    Returns a boolean array that is True for test rows.
+    """
+    rows = np.arange(start, start + n_rows, dtype=np.uint64) + np.uint64(seed)
+    # splitmix64 finalizer
+    with np.errstate(over='ignore'):
+        z = rows * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53) < test_size
+
+def training_holdout(data_path, training_mode, stratify=None, test_size=0.2, seed=42):
+    """
+    The test rows a model trained on data_path in training_mode held out
+
+    The streaming and coreset modes hold out rows by holdout_mask; in_memory
+    training used train_test_split (stratified on the `stratify` column), whose
+    test rows are recovered from the row count and that column alone.
+    Returns a function (start, n_rows) -> boolean array, True for test rows.
+    """
+    if training_mode == 'in_memory':
+        column = pd.read_csv(data_path, usecols=[stratify] if stratify else [0]).iloc[:, 0]
+        _, test_rows = train_test_split(np.arange(len(column)), test_size=test_size, random_state=seed,
+                                        stratify=column if stratify else None)
+        is_test = np.zeros(len(column), dtype=bool)
+        is_test[test_rows] = True
+        return lambda start, n_rows: is_test[start:start + n_rows]
+    return lambda start, n_rows: holdout_mask(start, n_rows, test_size, seed)
+
+def iter_csv_chunks(data_path, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (start_row, DataFrame) chunks from a CSV file"""
+    start = 0
+    for chunk in pd.read_csv(data_path, usecols=columns, chunksize=chunk_size):
+        yield start, chunk
+        start += len(chunk)
+
+def iter_split_chunks(data_path, columns=None, subset='train', test_size=0.2,
+                      chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """Yield only the rows of each chunk that belong to the requested split"""
+    for start, chunk in iter_csv_chunks(data_path, columns, chunk_size):
+        is_test = holdout_mask(start, len(chunk), test_size, seed)
+        keep = is_test if subset == 'test' else ~is_test
+        if keep.any():
+            yield chunk[keep]
+
+class CSVChunkIterator(xgb.DataIter):
+    """
+    XGBoost data iterator over one split of a CSV file
+
+    Feeds QuantileDMatrix (data quantized in memory, raw rows never held)
+    or, when cache_prefix is given, an external-memory DMatrix that pages
+    its quantized batches to disk.
+    """
+
+    def __init__(self, data_path, feature_columns, label_column, subset='train',
+                 test_size=0.2, chunk_size=DEFAULT_CHUNK_SIZE, cache_prefix=None):
+        self.data_path = data_path
+        self.feature_columns = list(feature_columns)
+        self.label_column = label_column
+        self.subset = subset
+        self.test_size = test_size
+        self.chunk_size = chunk_size
+        self.n_rows = 0
+        self._chunks = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def reset(self):
+        """Rewind to the start of the file"""
+        self._chunks = None
+
+    def next(self, input_data):
+        """Pass the next chunk to XGBoost, return 0 when the file is exhausted"""
+        if self._chunks is None:
+            self.n_rows = 0
+            self._chunks = iter_split_chunks(
+                self.data_path,
+                self.feature_columns + [self.label_column],
+                self.subset,
+                self.test_size,
+                self.chunk_size
+            )
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return 0
+        self.n_rows += len(chunk)
+        input_data(data=chunk[self.feature_columns], label=chunk[self.label_column])
+        return 1
@@ -0,0 +1,199 @@
+"""
+Feature Drift Monitoring for the Sanity Orb ML API
+Fixed-memory streaming sketches of live features compared against
+training-time reference sketches
+
+At training time every model input gets a reference sketch: decile bin
+edges, the share of training rows in each bin, and mean/std. At serving
+time each feature keeps a histogram over the same bins, plus Welford
+running moments, so memory is constant whatever the traffic. Requests
+only append their feature row to a small buffer; the buffer is folded
+into the sketches in one vectorized step every FLUSH_ROWS rows.
+Drift per feature is the population stability index (PSI) between the
+live and reference bin shares.
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+
+DRIFT_REFERENCE_FILE = 'drift_reference.json'
+
+# Model inputs monitored, keyed like the API's schemas
+MONITORED = ('session', 'trend_value', 'classifier')
+
+REFERENCE_BINS = 10
+FLUSH_ROWS = 256
+MIN_SAMPLES = 100
+
+# Conventional PSI bands: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+_EPS = 1e-4
+
+def reference_sketch(X, features, bins=REFERENCE_BINS):
+    """Reference sketch of a training matrix (rows x features)"""
+    X = np.asarray(X, dtype=np.float64)
+    sketch = {'n': int(len(X)), 'feature_order': list(features), 'features': {}}
+    for j, name in enumerate(features):
+        column = X[:, j]
+        column = column[~np.isnan(column)]
+        edges = np.unique(np.quantile(column, np.linspace(0, 1, bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, column, side='right'), minlength=len(edges) + 1)
+        sketch['features'][name] = {
+            'edges': edges.tolist(),
+            'proportions': (counts / max(len(column), 1)).tolist(),
+            'mean': float(column.mean()),
+            'std': float(column.std()),
+            'min': float(column.min()),
+            'max': float(column.max())
+        }
+    return sketch
+
+def psi(live, reference):
+    """Population stability index between two bin-share vectors"""
+    live = np.clip(np.asarray(live, dtype=np.float64), _EPS, None)
+    reference = np.clip(np.asarray(reference, dtype=np.float64), _EPS, None)
+    return float(np.sum((live - reference) * np.log(live / reference)))
+
+def drift_status(score):
+    if score >= PSI_SIGNIFICANT:
+        return 'significant'
+    if score >= PSI_MODERATE:
+        return 'moderate'
+    return 'stable'
+
+class FeatureGroupSketch:
+    """Live histograms and moments for one model's features"""
+
+    def __init__(self, features, reference):
+        self.features = features
+        self.edges = [np.asarray(reference['features'][f]['edges']) for f in features]
+        self.reference = reference
+        self.reset()
+
+    def reset(self):
+        self.counts = [np.zeros(len(e) + 1, dtype=np.int64) for e in self.edges]
+        self.n = 0
+        self.missing = np.zeros(len(self.features), dtype=np.int64)
+        self.mean = np.zeros(len(self.features))
+        self.m2 = np.zeros(len(self.features))
+        self.min = np.full(len(self.features), np.inf)
+        self.max = np.full(len(self.features), -np.inf)
+
+    def update(self, X):
+        """Fold a batch of rows into the sketch (Chan et al. parallel Welford merge)"""
+        X = np.asarray(X, dtype=np.float64)
+        missing = np.isnan(X)
+        self.missing += missing.sum(axis=0)
+        for j, edges in enumerate(self.edges):
+            column = X[:, j][~missing[:, j]]
+            self.counts[j] += np.bincount(np.searchsorted(edges, column, side='right'),
+                                          minlength=len(edges) + 1)
+        n_b = len(X)
+        mean_b = np.nanmean(X, axis=0)
+        m2_b = np.nansum((X - mean_b) ** 2, axis=0)
+        total = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * n_b / total
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * n_b / total
+        self.min = np.fmin(self.min, np.nanmin(X, axis=0))
+        self.max = np.fmax(self.max, np.nanmax(X, axis=0))
+        self.n = total
+
+    def report(self):
+        features = {}
+        for j, name in enumerate(self.features):
+            ref = self.reference['features'][name]
+            observed = self.counts[j].sum()
+            share = self.counts[j] / max(observed, 1)
+            score = psi(share, ref['proportions']) if observed >= MIN_SAMPLES else None
+            std = np.sqrt(self.m2[j] / self.n) if self.n else 0.0
+            features[name] = {
+                'psi': round(score, 4) if score is not None else None,
+                'status': drift_status(score) if score is not None else 'insufficient_data',
+                'mean': float(self.mean[j]) if self.n else None,
+                'reference_mean': ref['mean'],
+                'mean_shift_std': float((self.mean[j] - ref['mean']) / ref['std']) if self.n and ref['std'] else None,
+                'std': float(std),
+                'reference_std': ref['std'],
+                'min': float(self.min[j]) if self.n else None,
+                'max': float(self.max[j]) if self.n else None,
+                'missing_rate': float(self.missing[j] / self.n) if self.n else 0.0
+            }
+        scores = [f['psi'] for f in features.values() if f['psi'] is not None]
+        worst = max(scores) if scores else None
+        return {
+            'samples': int(self.n),
+            'max_psi': worst,
+            'status': drift_status(worst) if worst is not None else 'insufficient_data',
+            'features': features
+        }
+
+class DriftMonitor:
+    """
+    Buffered drift sketches for every monitored model
+
+    observe() is the only call on the request path: it appends one row
+    under a lock and, every FLUSH_ROWS rows, folds the buffer into the
+    sketches.
+    """
+
+    def __init__(self, reference, flush_rows=FLUSH_ROWS):
+        self.reference = reference
+        self.flush_rows = flush_rows
+        self.lock = threading.Lock()
+        self.groups = {
+            key: FeatureGroupSketch(ref['feature_order'], ref)
+            for key, ref in reference['models'].items()
+        }
+        self.buffers = {key: [] for key in self.groups}
+
+    @classmethod
+    def load(cls, models_dir):
+        """The saved reference, or None if it has not been built"""
+        path = os.path.join(models_dir, DRIFT_REFERENCE_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def observe(self, model_key, X):
+        """Record the feature rows of one prediction call"""
+        if model_key not in self.groups:
+            return
+        with self.lock:
+            buffer = self.buffers[model_key]
+            buffer.extend(X)
+            if len(buffer) >= self.flush_rows:
+                self.groups[model_key].update(np.vstack(buffer))
+                buffer.clear()
+
+    def flush(self):
+        with self.lock:
+            for key, buffer in self.buffers.items():
+                if buffer:
+                    self.groups[key].update(np.vstack(buffer))
+                    buffer.clear()
+
+    def reset(self):
+        with self.lock:
+            for key, group in self.groups.items():
+                group.reset()
+                self.buffers[key].clear()
+
+    def report(self):
+        self.flush()
+        with self.lock:
+            models = {key: group.report() for key, group in self.groups.items()}
+        scores = [m['max_psi'] for m in models.values() if m['max_psi'] is not None]
+        worst = max(scores) if scores else None
+        return {
+            'reference_created': self.reference.get('created'),
+            'status': drift_status(worst) if worst is not None else 'insufficient_data',
+            'thresholds': {'moderate': PSI_MODERATE, 'significant': PSI_SIGNIFICANT},
+            'models': models
+        }
@@ -0,0 +1,356 @@
+"""
+Streaming Evaluation of Saved Sanity Orb Models
+Scores arbitrarily large labeled CSVs in chunks and reports overall and
+per-segment metrics, comparable across model versions
+
+Chunks are read sequentially and scored by a pool of threads (inplace
+prediction and the numpy accumulators release the GIL). Every chunk
+folds into fixed-size accumulators: error sums per segment for the
+regressors, confusion matrices per segment for the classifier. Memory
+stays at a few chunks whatever the file size, and the metrics equal
+those of a single pass over the whole file.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import xgboost as xgb
+
+from data_streaming import DEFAULT_CHUNK_SIZE, iter_csv_chunks, training_holdout
+from model_bundle import BUNDLE_FILE, ModelBundle
+from xgboost_models import MODEL_SPECS, file_sha256
+
+CATEGORIES = ['Critical', 'Unstable', 'Stable', 'Optimal']
+
+# Sanity level bands used by data_generator.py for the category label
+CATEGORY_EDGES = [25, 50, 75]
+
+# Segment columns per model: raw columns, or ('level', column) for the
+# sanity band of a level column
+SEGMENTS = {
+    'session': {'hour': 'hour', 'day_of_week': 'day_of_week', 'category': ('level', 'current_sanity')},
+    'trend_value': {'category': ('level', 'last_3_avg')},
+    'trend_confidence': {'category': ('level', 'last_3_avg')},
+    'classifier': {'category': 'category'}
+}
+SEGMENT_SIZES = {'hour': 24, 'day_of_week': 7, 'category': len(CATEGORIES)}
+
+# Column train_test_split stratified on when a model was trained in_memory
+HOLDOUT_STRATIFY = {'classifier': 'category'}
+
+class RegressionAccumulator:
+    """Error sums for one regressor, overall (segment 0) or per segment value"""
+
+    def __init__(self, size=1):
+        self.size = size
+        self.n = np.zeros(size)
+        self.sum_err = np.zeros(size)
+        self.sse = np.zeros(size)
+        self.sae = np.zeros(size)
+        self.sum_y = np.zeros(size)
+        self.sum_y2 = np.zeros(size)
+        self.max_abs = np.zeros(size)
+
+    def update(self, y, pred, ids=None):
+        ids = np.zeros(len(y), dtype=np.int64) if ids is None else ids
+        err = pred.astype(np.float64) - y
+        for name, weights in (('n', None), ('sum_err', err), ('sse', err ** 2), ('sae', np.abs(err)),
+                              ('sum_y', y), ('sum_y2', y ** 2)):
+            getattr(self, name)[:] += np.bincount(ids, weights=weights, minlength=self.size)
+        np.maximum.at(self.max_abs, ids, np.abs(err))
+
+    def merge(self, other):
+        for name in ('n', 'sum_err', 'sse', 'sae', 'sum_y', 'sum_y2'):
+            getattr(self, name)[:] += getattr(other, name)
+        np.maximum(self.max_abs, other.max_abs, out=self.max_abs)
+
+    def metrics(self, i=0):
+        n = self.n[i]
+        if not n:
+            return {'n': 0}
+        variance = self.sum_y2[i] / n - (self.sum_y[i] / n) ** 2
+        mse = self.sse[i] / n
+        return {
+            'n': int(n),
+            'rmse': float(np.sqrt(mse)),
+            'mae': float(self.sae[i] / n),
+            'bias': float(self.sum_err[i] / n),
+            'max_abs_error': float(self.max_abs[i]),
+            'r2': float(1 - mse / variance) if variance > 0 else None
+        }
+
+class ClassificationAccumulator:
+    """Confusion matrices for the classifier, overall (segment 0) or per segment value"""
+
+    def __init__(self, size=1, classes=len(CATEGORIES)):
+        self.size = size
+        self.classes = classes
+        self.confusion = np.zeros((size, classes, classes), dtype=np.int64)
+
+    def update(self, y, pred, ids=None):
+        ids = np.zeros(len(y), dtype=np.int64) if ids is None else ids
+        c = self.classes
+        flat = (ids * c + y.astype(np.int64)) * c + pred.astype(np.int64)
+        self.confusion += np.bincount(flat, minlength=self.size * c * c).reshape(self.size, c, c)
+
+    def merge(self, other):
+        self.confusion += other.confusion
+
+    def metrics(self, i=0):
+        confusion = self.confusion[i]
+        n = int(confusion.sum())
+        if not n:
+            return {'n': 0}
+        correct = np.diag(confusion)
+        actual = confusion.sum(axis=1)
+        predicted = confusion.sum(axis=0)
+        return {
+            'n': n,
+            'accuracy': float(correct.sum() / n),
+            'per_class': {
+                CATEGORIES[k]: {
+                    'support': int(actual[k]),
+                    'precision': float(correct[k] / predicted[k]) if predicted[k] else None,
+                    'recall': float(correct[k] / actual[k]) if actual[k] else None
+                }
+                for k in range(self.classes)
+            },
+            'confusion_matrix': confusion.tolist()
+        }
+
+class ModelEvaluation:
+    """Overall and per-segment accumulators for one model"""
+
+    def __init__(self, key):
+        self.key = key
+        make = ClassificationAccumulator if key == 'classifier' else RegressionAccumulator
+        self.overall = make()
+        self.segments = {name: make(SEGMENT_SIZES[name]) for name in SEGMENTS[key]}
+
+    def score_chunk(self, booster, chunk):
+        """Accumulators for one chunk (merged into the totals by the caller)"""
+        spec = MODEL_SPECS[self.key]
+        X = chunk[spec['features']].to_numpy(dtype=np.float32)
+        y = chunk[spec['label']].to_numpy(dtype=np.float64)
+        pred = booster.inplace_predict(X)
+        partial = ModelEvaluation(self.key)
+        partial.overall.update(y, pred)
+        for name, source in SEGMENTS[self.key].items():
+            if isinstance(source, tuple):
+                ids = np.searchsorted(CATEGORY_EDGES, chunk[source[1]].to_numpy(), side='right')
+            else:
+                ids = np.clip(chunk[source].to_numpy().astype(np.int64), 0, SEGMENT_SIZES[name] - 1)
+            partial.segments[name].update(y, pred, ids)
+        return partial
+
+    def merge(self, other):
+        self.overall.merge(other.overall)
+        for name, acc in self.segments.items():
+            acc.merge(other.segments[name])
+
+    def report(self):
+        def label(name, i):
+            return CATEGORIES[i] if name == 'category' else str(i)
+
+        segments = {}
+        for name, acc in self.segments.items():
+            metrics = (acc.metrics(i) for i in range(acc.size))
+            segments[name] = {label(name, i): m for i, m in enumerate(metrics) if m['n']}
+        return {'overall': self.overall.metrics(), 'segments': segments}
+
+def load_boosters(models_dir, threads=1):
+    """Saved boosters keyed like MODEL_SPECS, from the bundle or the loose files"""
+    bundle_path = os.path.join(models_dir, BUNDLE_FILE)
+    if os.path.exists(bundle_path):
+        bundle = ModelBundle(bundle_path)
+        boosters, version = dict(bundle.boosters), bundle.version_id
+    else:
+        boosters, version = {}, None
+        for key, spec in MODEL_SPECS.items():
+            path = os.path.join(models_dir, spec['model_file'])
+            if os.path.exists(path):
+                boosters[key] = xgb.Booster(model_file=path)
+    for booster in boosters.values():
+        booster.set_param({'nthread': threads})
+    return boosters, version
+
+def training_modes(models_dir):
+    """Training mode of each model from its metadata (in_memory when not recorded)"""
+    modes = {}
+    for key, spec in MODEL_SPECS.items():
+        path = os.path.join(models_dir, spec['metadata_file'])
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                modes[key] = json.load(f).get('training_mode', 'in_memory')
+        else:
+            modes[key] = 'in_memory'
+    return modes
+
+def model_versions(models_dir):
+    """Training dates from the metadata files, to tell reports of different models apart"""
+    versions = {}
+    for key, spec in MODEL_SPECS.items():
+        path = os.path.join(models_dir, spec['metadata_file'])
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                versions[key] = json.load(f).get('trained_date')
+    return versions
+
+def evaluate_file(keys, boosters, data_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=4, split='all',
+                  training_mode='in_memory'):
+    """
+    Stream one labeled CSV through every model in `keys`
+
+    split: 'all' rows, or the 'train'/'test' side of the holdout the models
+    were trained with (data_streaming.training_holdout for training_mode).
+    Returns ({key: ModelEvaluation}, rows).
+    """
+    totals = {key: ModelEvaluation(key) for key in keys}
+    if split != 'all':
+        holdout = training_holdout(data_path, training_mode, HOLDOUT_STRATIFY.get(keys[0]))
+    lock = threading.Lock()
+    rows = [0]
+
+    def score(start, chunk):
+        if split != 'all':
+            is_test = holdout(start, len(chunk))
+            chunk = chunk[is_test if split == 'test' else ~is_test]
+        partials = {key: totals[key].score_chunk(boosters[key], chunk) for key in keys}
+        with lock:
+            for key, partial in partials.items():
+                totals[key].merge(partial)
+            rows[0] += len(chunk)
+
+    columns = sorted({c for key in keys for c in MODEL_SPECS[key]['features'] + [MODEL_SPECS[key]['label']]}
+                     | {s if isinstance(s, str) else s[1] for key in keys for s in SEGMENTS[key].values()})
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for start, chunk in iter_csv_chunks(data_path, columns, chunk_size):
+            pending.append(pool.submit(score, start, chunk))
+            # At most two chunks per worker in memory
+            if len(pending) >= 2 * workers:
+                pending.pop(0).result()
+        for future in pending:
+            future.result()
+    return totals, rows[0]
+
+def evaluate(models_dir='ml-model/trained_models', data_dir='ml-model/data', data_files=None,
+             chunk_size=DEFAULT_CHUNK_SIZE, workers=4, split='all'):
+    """Evaluate every saved model on its labeled file; returns the report dict"""
+    boosters, bundle_version = load_boosters(models_dir)
+    modes = training_modes(models_dir)
+    files = {}
+    for key, spec in MODEL_SPECS.items():
+        if key in boosters:
+            path = (data_files or {}).get(key) or os.path.join(data_dir, spec['data_file'])
+            files.setdefault(path, []).append(key)
+
+    report = {
+        'date': datetime.now().isoformat(),
+        'models_dir': models_dir,
+        'bundle_version': bundle_version,
+        'trained': model_versions(models_dir),
+        'split': split,
+        'training_modes': {key: modes[key] for key in boosters},
+        'chunk_size': chunk_size,
+        'workers': workers,
+        'data': {},
+        'models': {}
+    }
+    for path, keys in files.items():
+        start = time.perf_counter()
+        # Models sharing a data file share a metadata file, so one mode covers them all
+        totals, rows = evaluate_file(keys, boosters, path, chunk_size, workers, split, modes[keys[0]])
+        elapsed = time.perf_counter() - start
+        report['data'][path] = {
+            'sha256': file_sha256(path),
+            'rows': rows,
+            'models': keys,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(rows / elapsed) if elapsed else None
+        }
+        for key in keys:
+            report['models'][key] = totals[key].report()
+            print_model(key, report['models'][key])
+    return report
+
+def headline(metrics):
+    """The metric used to compare versions: accuracy for the classifier, else RMSE"""
+    return ('accuracy', metrics['accuracy']) if 'accuracy' in metrics else ('rmse', metrics['rmse'])
+
+def print_model(key, result):
+    name, value = headline(result['overall'])
+    print(f"\n{key}: {name} {value:.4f} on {result['overall']['n']:,} rows")
+    for segment, values in result['segments'].items():
+        parts = [f"{label}={headline(m)[1]:.3f}" for label, m in values.items()]
+        print(f"  by {segment}: " + ', '.join(parts))
+
+def compare(report, baseline):
+    """Headline metric deltas against a previous report, overall and per segment"""
+    comparison = {}
+    for key, result in report['models'].items():
+        if key not in baseline.get('models', {}):
+            continue
+        old = baseline['models'][key]
+        name, value = headline(result['overall'])
+        _, previous = headline(old['overall'])
+        segments = {}
+        for segment, values in result['segments'].items():
+            for label, metrics in values.items():
+                before = old['segments'].get(segment, {}).get(label)
+                if before and before['n']:
+                    segments[f"{segment}={label}"] = headline(metrics)[1] - headline(before)[1]
+        comparison[key] = {'metric': name, 'before': previous, 'after': value, 'delta': value - previous,
+                           'segment_deltas': segments}
+    return comparison
+
+def print_comparison(comparison, baseline):
+    print(f"\nCompared with {baseline.get('models_dir')} ({baseline.get('date')}):")
+    for key, c in comparison.items():
+        # Higher accuracy is better, lower RMSE is better
+        better = c['delta'] > 0 if c['metric'] == 'accuracy' else c['delta'] < 0
+        marker = '✓' if better or c['delta'] == 0 else '❌'
+        print(f"  {marker} {key:16s} {c['metric']} {c['before']:.4f} -> {c['after']:.4f} ({c['delta']:+.4f})")
+        worst = sorted(c['segment_deltas'].items(),
+                       key=lambda kv: kv[1] if c['metric'] == 'accuracy' else -kv[1])[:3]
+        if worst:
+            print("      most changed segments: " + ', '.join(f"{s} {d:+.4f}" for s, d in worst))
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stream labeled data through the saved models and report metrics')
+    parser.add_argument('--models-dir', default='ml-model/trained_models')
+    parser.add_argument('--data-dir', default='ml-model/data')
+    for key in MODEL_SPECS:
+        parser.add_argument(f"--{key.replace('_', '-')}-data", metavar='CSV',
+                            help=f"labeled file for {key} (default: {MODEL_SPECS[key]['data_file']} in --data-dir)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='chunks scored in parallel')
+    parser.add_argument('--split', choices=('all', 'train', 'test'), default='all',
+                        help="rows to score (train/test follow each model's training-mode holdout)")
+    parser.add_argument('--output', default='ml-model/benchmarks/evaluation.json')
+    parser.add_argument('--compare', metavar='REPORT', help='previous report to compare against')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("SANITY ORB - STREAMING MODEL EVALUATION")
+    print("="*70)
+    data_files = {key: getattr(args, f"{key}_data") for key in MODEL_SPECS}
+    report = evaluate(args.models_dir, args.data_dir, data_files, args.chunk_size, args.workers, args.split)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        report['comparison'] = compare(report, baseline)
+        print_comparison(report['comparison'], baseline)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Report saved to {args.output}")
@@ -0,0 +1,91 @@
+"""
+Multi-Step Trend Forecasting for the Sanity Orb ML API
+Recursive roll-forward of the trend model with incrementally updated features
+
+The trend model predicts one step from summary statistics of the whole
+history. A forecast appends each prediction to the history and predicts
+again. Recomputing the statistics costs O(length) per step, so the
+history is instead kept as running sums (values, squares, index-weighted
+values, successive differences) and every statistic is updated in O(1).
+"""
+
+import math
+
+import numpy as np
+
+MAX_HORIZON = 60
+
+class RollingTrendFeatures:
+    """The trend model's inputs for a history that only grows at the end"""
+
+    def __init__(self, history):
+        history = np.asarray(history, dtype=np.float64)
+        diffs = np.diff(history)
+        self.n = len(history)
+        self.total = float(history.sum())
+        self.total_sq = float(np.dot(history, history))
+        self.weighted = float(np.dot(np.arange(self.n), history))
+        self.low = float(history.min())
+        self.high = float(history.max())
+        self.first_3 = float(history[:3].mean())
+        self.tail = [float(v) for v in history[-3:]]
+        self.diff_total = float(diffs.sum())
+        self.diff_total_sq = float(np.dot(diffs, diffs))
+
+    def append(self, value):
+        value = float(value)
+        diff = value - self.tail[-1]
+        self.weighted += self.n * value
+        self.n += 1
+        self.total += value
+        self.total_sq += value * value
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+        self.tail = self.tail[1:] + [value] if len(self.tail) == 3 else self.tail + [value]
+        self.diff_total += diff
+        self.diff_total_sq += diff * diff
+
+    @staticmethod
+    def _std(total, total_sq, n):
+        mean = total / n
+        return math.sqrt(max(total_sq / n - mean * mean, 0.0))
+
+    def slope(self):
+        """Least-squares slope against the index, as np.polyfit(x, history, 1)[0]"""
+        n = self.n
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self.weighted - sum_x * self.total) / (n * sum_xx - sum_x * sum_x)
+
+    def features(self):
+        return {
+            'mean': self.total / self.n,
+            'std': self._std(self.total, self.total_sq, self.n),
+            'min': self.low,
+            'max': self.high,
+            'range': self.high - self.low,
+            'slope': self.slope(),
+            'last_3_avg': sum(self.tail) / len(self.tail),
+            'first_3_avg': self.first_3,
+            'volatility': self._std(self.diff_total, self.diff_total_sq, self.n - 1)
+        }
+
+def roll_forward(history, horizon, predict_next, first=None):
+    """
+    Predict `horizon` values ahead, feeding each prediction back as history
+
+    predict_next(features) returns the next value for one feature dict;
+    `first` optionally supplies the already computed first-step value.
+    Predictions are clipped to the 0-100 sanity range before being fed
+    back. Returns (values, per-step input feature dicts).
+    """
+    state = RollingTrendFeatures(history)
+    values, rows = [], []
+    for step in range(horizon):
+        features = state.features()
+        value = first if step == 0 and first is not None else predict_next(features)
+        value = float(np.clip(value, 0, 100))
+        values.append(value)
+        rows.append(features)
+        state.append(value)
+    return values, rows
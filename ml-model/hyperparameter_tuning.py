@@ -0,0 +1,277 @@
+"""
+Hyperparameter Tuning for Sanity Orb XGBoost Models
+Random search with successive halving, early stopping and parallel trials
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+
+from training_cache import DEFAULT_CACHE_DIR, TrainingMatrixCache
+from xgboost_models import MODEL_PARAMS, MODEL_SPECS, TUNING_FILE, native_params
+
+# Which model spec each tunable parameter set is searched on. The trend
+# value and confidence models share one parameter set, tuned on next_value.
+TUNING_TARGETS = {
+    'session': 'session',
+    'trend': 'trend_value',
+    'classifier': 'classifier'
+}
+
+SEARCH_SPACE = {
+    'max_depth': (3, 10),
+    'learning_rate': (0.02, 0.3),
+    'subsample': (0.5, 1.0),
+    'colsample_bytree': (0.5, 1.0)
+}
+
+EARLY_STOPPING_ROUNDS = 20
+
+# Per-worker dataset cache, filled by _init_worker
+_WORKER_DATA = {}
+
+def sample_configs(n_configs, seed=42):
+    """Draw configurations from SEARCH_SPACE (log-uniform learning rate)"""
+    rng = np.random.default_rng(seed)
+    lo, hi = SEARCH_SPACE['learning_rate']
+    configs = []
+    for _ in range(n_configs):
+        configs.append({
+            'max_depth': int(rng.integers(SEARCH_SPACE['max_depth'][0], SEARCH_SPACE['max_depth'][1] + 1)),
+            'learning_rate': float(np.exp(rng.uniform(np.log(lo), np.log(hi)))),
+            'subsample': float(rng.uniform(*SEARCH_SPACE['subsample'])),
+            'colsample_bytree': float(rng.uniform(*SEARCH_SPACE['colsample_bytree']))
+        })
+    return configs
+
+def load_split(data_path, model_key, matrix_cache_dir=None):
+    """
+    Train/validation/test split for tuning
+
+    The test split matches train_* (test_size=0.2, random_state=42) so it is
+    never seen during the search; validation is carved out of the train split.
+    With matrix_cache_dir the outer split is shared with training runs.
+    """
+    spec = MODEL_SPECS[model_key]
+    stratify = spec['label'] if model_key == 'classifier' else None
+    if matrix_cache_dir:
+        splits, _ = TrainingMatrixCache(matrix_cache_dir, verbose=False).split(
+            data_path, spec['features'], [spec['label']], stratify=stratify
+        )
+        (X_train, y_train), (X_test, y_test) = splits['train'], splits['test']
+        y_train, y_test = y_train[spec['label']], y_test[spec['label']]
+    else:
+        df = pd.read_csv(data_path, usecols=spec['features'] + [spec['label']])
+        X = df[spec['features']]
+        y = df[spec['label']]
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y if stratify else None
+        )
+    stratify = y_train if model_key == 'classifier' else None
+    X_fit, X_valid, y_fit, y_valid = train_test_split(
+        X_train, y_train, test_size=0.2, random_state=42, stratify=stratify
+    )
+    return {
+        'fit': xgb.DMatrix(X_fit, label=y_fit),
+        'valid': xgb.DMatrix(X_valid, label=y_valid),
+        'test': (X_test.to_numpy(dtype=np.float32), y_test.to_numpy())
+    }
+
+def _init_worker(data_path, model_key, matrix_cache_dir=None):
+    _WORKER_DATA.update(load_split(data_path, model_key, matrix_cache_dir))
+
+def _run_trial(args):
+    """Train one configuration for a given round budget with early stopping"""
+    trial_id, params_key, config, budget, nthread = args
+    params = dict(MODEL_PARAMS[params_key], **config)
+    params['n_estimators'] = budget
+    params['n_jobs'] = nthread
+    native, num_boost_round = native_params(params)
+    native['eval_metric'] = 'mlogloss' if params_key == 'classifier' else 'rmse'
+    if params_key == 'classifier':
+        # Softprob so the validation loss is a smooth ranking signal
+        native['objective'] = 'multi:softprob'
+
+    start = time.perf_counter()
+    evals_result = {}
+    booster = xgb.train(
+        native, _WORKER_DATA['fit'], num_boost_round=num_boost_round,
+        evals=[(_WORKER_DATA['valid'], 'valid')],
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        evals_result=evals_result, verbose_eval=False
+    )
+    train_time = time.perf_counter() - start
+    history = evals_result['valid'][native['eval_metric']]
+    return {
+        'trial_id': trial_id,
+        'config': config,
+        'budget': budget,
+        'score': float(history[booster.best_iteration]),
+        'best_iteration': int(booster.best_iteration),
+        'train_time_s': train_time
+    }
+
+def measure_latency(booster, X, n_calls=200):
+    """p50/p99 single-row and full-batch inplace_predict latency in milliseconds"""
+    booster.set_param({'nthread': 1})
+    row = X[:1]
+    for _ in range(10):
+        booster.inplace_predict(row)
+    single = []
+    for i in range(n_calls):
+        row = X[i % len(X):i % len(X) + 1]
+        start = time.perf_counter()
+        booster.inplace_predict(row)
+        single.append((time.perf_counter() - start) * 1000)
+    start = time.perf_counter()
+    booster.inplace_predict(X)
+    batch = (time.perf_counter() - start) * 1000
+    return {
+        'single_row_p50_ms': float(np.percentile(single, 50)),
+        'single_row_p99_ms': float(np.percentile(single, 99)),
+        'batch_ms': batch,
+        'batch_rows': len(X)
+    }
+
+def successive_halving(params_key, data_path, n_configs=27, min_rounds=25,
+                       max_rounds=400, reduction=3, n_workers=None, seed=42,
+                       matrix_cache_dir=None):
+    """
+    Search one model's hyperparameters
+
+    All configurations start with min_rounds boosting rounds; after each rung
+    the best 1/reduction survive and their budget is multiplied by
+    reduction, until max_rounds (the last survivor alone if the configs run
+    out first). Each trial early-stops on the validation split, and trials
+    within a rung run in parallel processes.
+    """
+    model_key = TUNING_TARGETS[params_key]
+    n_workers = n_workers or os.cpu_count() or 1
+    nthread = max(1, (os.cpu_count() or 1) // n_workers)
+    configs = sample_configs(n_configs, seed)
+    if matrix_cache_dir:
+        # Parse and split once here; every worker then loads the cached arrays
+        load_split(data_path, model_key, matrix_cache_dir)
+    survivors = list(enumerate(configs))
+    budget = min_rounds
+    rungs = []
+
+    print(f"\n>>> Tuning {params_key}: {n_configs} configs, "
+          f"{min_rounds}-{max_rounds} rounds, {n_workers} workers")
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(data_path, model_key, matrix_cache_dir)) as pool:
+        while True:
+            trials = list(pool.map(_run_trial, [
+                (trial_id, params_key, config, budget, nthread)
+                for trial_id, config in survivors
+            ]))
+            trials.sort(key=lambda t: t['score'])
+            rungs.append({'budget': budget, 'trials': trials})
+            print(f"  rung budget={budget:4d}: {len(trials):2d} trials, "
+                  f"best {trials[0]['score']:.4f}")
+            # A lone survivor keeps climbing so the winner always gets max_rounds
+            if budget >= max_rounds:
+                break
+            keep = max(1, len(trials) // reduction)
+            survivors = [(t['trial_id'], t['config']) for t in trials[:keep]]
+            budget = min(budget * reduction, max_rounds)
+
+    best = rungs[-1]['trials'][0]
+    best_params = dict(MODEL_PARAMS[params_key], **best['config'])
+    best_params['n_estimators'] = best['best_iteration'] + 1
+
+    # Refit the winner once to measure training time and inference latency
+    split = load_split(data_path, model_key, matrix_cache_dir)
+    native, num_boost_round = native_params(best_params)
+    start = time.perf_counter()
+    booster = xgb.train(native, split['fit'], num_boost_round=num_boost_round)
+    train_time = time.perf_counter() - start
+    X_test, y_test = split['test']
+    pred = booster.inplace_predict(X_test)
+    if params_key == 'classifier':
+        test_metric = {'test_accuracy': float(np.mean(pred == y_test))}
+    else:
+        test_metric = {'test_rmse': float(np.sqrt(np.mean((pred - y_test) ** 2)))}
+
+    return {
+        'params': best_params,
+        'validation_score': best['score'],
+        'test_metrics': test_metric,
+        'train_time_s': train_time,
+        'inference_latency': measure_latency(booster, X_test),
+        'n_trials': sum(len(r['trials']) for r in rungs),
+        'rungs': [
+            {'budget': r['budget'], 'scores': [t['score'] for t in r['trials']]}
+            for r in rungs
+        ]
+    }
+
+def tune_all_models(data_dir='ml-model/data', models_dir='ml-model/trained_models',
+                    targets=None, **search_kwargs):
+    """Tune each model and store the results alongside the model metadata"""
+    print("\n" + "="*70)
+    print("SANITY ORB - XGBoost HYPERPARAMETER TUNING")
+    print("="*70)
+
+    path = os.path.join(models_dir, TUNING_FILE)
+    results = {'models': {}}
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            results = json.load(f)
+
+    for params_key in targets or TUNING_TARGETS:
+        spec = MODEL_SPECS[TUNING_TARGETS[params_key]]
+        data_path = os.path.join(data_dir, spec['data_file'])
+        result = successive_halving(params_key, data_path, **search_kwargs)
+        result['tuned_date'] = datetime.now().isoformat()
+        results['models'][params_key] = result
+
+        # Surface the winner in the model's own metadata file too
+        metadata_path = os.path.join(models_dir, spec['metadata_file'])
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+            metadata['tuning'] = {
+                k: result[k] for k in ('params', 'validation_score', 'test_metrics',
+                                       'train_time_s', 'inference_latency', 'tuned_date')
+            }
+            with open(metadata_path, 'w') as f:
+                json.dump(metadata, f, indent=2)
+
+        latency = result['inference_latency']
+        print(f"✓ {params_key}: {result['test_metrics']}, "
+              f"trained in {result['train_time_s']:.2f}s, "
+              f"p50 {latency['single_row_p50_ms']:.3f}ms/row")
+
+    results['updated_date'] = datetime.now().isoformat()
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Tuning results saved to {path}")
+    print("  Train with them: python ml-model/xgboost_models.py --use-tuned\n")
+    return results
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tune Sanity Orb XGBoost hyperparameters')
+    parser.add_argument('--models', nargs='+', choices=list(TUNING_TARGETS),
+                        help='parameter sets to tune (default: all)')
+    parser.add_argument('--configs', type=int, default=27, help='configurations in the first rung')
+    parser.add_argument('--min-rounds', type=int, default=25)
+    parser.add_argument('--max-rounds', type=int, default=400)
+    parser.add_argument('--reduction', type=int, default=3, help='halving factor between rungs')
+    parser.add_argument('--workers', type=int, default=None, help='parallel trial processes')
+    parser.add_argument('--matrix-cache', metavar='DIR', nargs='?', const=DEFAULT_CACHE_DIR,
+                        help='load the train/test split from the training matrix cache in DIR')
+    args = parser.parse_args()
+
+    tune_all_models(targets=args.models, n_configs=args.configs, min_rounds=args.min_rounds,
+                    max_rounds=args.max_rounds, reduction=args.reduction,
+                    n_workers=args.workers, matrix_cache_dir=args.matrix_cache)
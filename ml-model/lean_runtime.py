@@ -0,0 +1,40 @@
+"""
+Lean Serving Runtime for the Sanity Orb ML API
+Keeps pandas and scikit-learn out of the serving import graph
+
+xgboost imports pandas and sklearn whenever they are installed, only to
+support DataFrame inputs and the sklearn wrappers. Serving uses raw
+Boosters on numpy arrays, so neither is needed. Marking them unimportable
+before xgboost loads makes xgboost take its "not installed" fallbacks,
+which cuts startup time and per-worker RSS. scipy.sparse stays: xgboost's
+core imports it unconditionally.
+Enabled with ML_LEAN_RUNTIME=1; must run before xgboost is imported.
+"""
+
+import os
+import sys
+
+LEAN_ENV = 'ML_LEAN_RUNTIME'
+
+BLOCKED_MODULES = ('pandas', 'sklearn', 'joblib', 'matplotlib')
+
+def requested():
+    return os.environ.get(LEAN_ENV, '').lower() in ('1', 'true', 'yes')
+
+def enable():
+    """
+    Block the heavy modules that are not yet imported
+
+    Returns the names that were blocked; modules some other code already
+    imported are left alone.
+    """
+    blocked = []
+    for name in BLOCKED_MODULES:
+        if name not in sys.modules:
+            sys.modules[name] = None
+            blocked.append(name)
+    return blocked
+
+def is_lean():
+    """True if none of the heavy modules are loaded in this process"""
+    return not any(sys.modules.get(name) is not None for name in BLOCKED_MODULES)
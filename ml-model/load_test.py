@@ -0,0 +1,271 @@
+"""
+Load Testing for the Sanity Orb ML API
+Drives every ml_api.py route with configurable concurrency and request mix,
+reporting throughput and tail latency; runs in-process or against a server
+"""
+
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+from data_generator import SanityDataGenerator
+
+# route name -> (method, path)
+ROUTES = {
+    'session': ('POST', '/api/predict/session'),
+    'trend': ('POST', '/api/predict/trend'),
+    'classify': ('POST', '/api/predict/classify'),
+    'advanced': ('POST', '/api/predict/advanced'),
+    'info': ('GET', '/api/models/info'),
+    'health': ('GET', '/api/health')
+}
+
+DEFAULT_MIX = {'session': 3, 'trend': 3, 'classify': 3, 'advanced': 2, 'info': 0.2, 'health': 0.2}
+
+class PayloadFactory:
+    """
+    Realistic request bodies drawn from SanityDataGenerator
+
+    A pool of rows is generated up front so payload construction does not
+    show up in the measured latency.
+    """
+
+    def __init__(self, pool_size=2000, seed=42):
+        generator = SanityDataGenerator(num_samples=pool_size)
+        self.sessions = generator.generate_session_data().drop(
+            columns=['timestamp', 'avg_prev_sanity', 'current_sanity']
+        ).to_dict('records')
+        self.stats = generator.generate_classification_data().drop(
+            columns=['category']
+        ).to_dict('records')
+        self.histories = [
+            [round(float(v), 2) for v in generator.generate_history(length)]
+            for length in np.random.randint(5, 21, size=pool_size)
+        ]
+        self.rng = random.Random(seed)
+
+    def session(self):
+        return {k: float(v) for k, v in self.rng.choice(self.sessions).items()}
+
+    def trend(self):
+        return {'history': self.rng.choice(self.histories)}
+
+    def classify(self):
+        return {k: float(v) for k, v in self.rng.choice(self.stats).items()}
+
+    def advanced(self):
+        session = self.session()
+        stats = self.classify()
+        return {
+            'current_sanity': stats.pop('current_sanity'),
+            'history': self.rng.choice(self.histories),
+            'session_data': {k: session[k] for k in (
+                'hour', 'day_of_week', 'session_duration', 'interactions',
+                'stress_level', 'mood_factor'
+            )},
+            'user_stats': stats
+        }
+
+    def build(self, route):
+        if ROUTES[route][0] == 'GET':
+            return None
+        return getattr(self, route)()
+
+class InProcessClient:
+    """Calls the Flask app directly through its test client - no network"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body):
+        if method == 'GET':
+            response = self.client.get(path)
+        else:
+            response = self.client.post(path, json=body)
+        return response.status_code, response.get_json()
+
+class HTTPClient:
+    """Keep-alive HTTP connection to a running server"""
+
+    def __init__(self, base_url):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def request(self, method, path, body):
+        headers = {'Content-Type': 'application/json'}
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            raise
+        return response.status, json.loads(data) if data else None
+
+def parse_mix(spec):
+    """'session=3,trend=1' -> {'session': 3.0, 'trend': 1.0}"""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ROUTES:
+            raise ValueError(f"Unknown route in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def make_client_factory(url=None):
+    """Client constructor for the in-process app or a server URL"""
+    if url:
+        return lambda: HTTPClient(url)
+    import ml_api
+    if not any(ml_api.models.values()):
+        ml_api.load_models()
+    return lambda: InProcessClient(ml_api.app)
+
+def run_load(client_factory, mix=DEFAULT_MIX, concurrency=8, duration=10.0,
+             max_requests=None, pool_size=2000, seed=42):
+    """
+    Drive the API from `concurrency` threads for `duration` seconds
+
+    Returns a list of (route, latency_ms, status, ok) samples and the
+    measured wall time.
+    """
+    factory = PayloadFactory(pool_size, seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    samples = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    issued = [0]
+
+    def worker(worker_id):
+        client = client_factory()
+        rng = random.Random(seed + worker_id)
+        local = []
+        while not stop.is_set():
+            if max_requests is not None:
+                with lock:
+                    if issued[0] >= max_requests:
+                        break
+                    issued[0] += 1
+            route = rng.choices(names, weights)[0]
+            method, path = ROUTES[route]
+            body = factory.build(route)
+            start = time.perf_counter()
+            try:
+                status, data = client.request(method, path, body)
+                ok = status == 200 and (data or {}).get('success', True) is not False
+            except Exception:
+                status, ok = 0, False
+            local.append((route, (time.perf_counter() - start) * 1000, status, ok))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    if max_requests is None:
+        time.sleep(duration)
+        stop.set()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start
+
+def summarize(samples, elapsed):
+    """Requests/sec and latency percentiles overall and per route"""
+    def stats(rows):
+        latencies = np.array([r[1] for r in rows])
+        return {
+            'requests': len(rows),
+            'errors': sum(1 for r in rows if not r[3]),
+            'rps': len(rows) / elapsed if elapsed else 0.0,
+            'mean_ms': float(latencies.mean()),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'p99_ms': float(np.percentile(latencies, 99))
+        }
+
+    report = {'elapsed_s': elapsed, 'overall': stats(samples) if samples else None, 'routes': {}}
+    for route in ROUTES:
+        rows = [s for s in samples if s[0] == route]
+        if rows:
+            report['routes'][route] = stats(rows)
+    return report
+
+def print_report(report):
+    print(f"\n{'route':10s} {'reqs':>7s} {'errs':>5s} {'req/s':>8s} "
+          f"{'mean':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s}")
+    rows = list(report['routes'].items()) + [('TOTAL', report['overall'])]
+    for name, s in rows:
+        if s is None:
+            continue
+        print(f"{name:10s} {s['requests']:7d} {s['errors']:5d} {s['rps']:8.1f} "
+              f"{s['mean_ms']:7.2f}ms {s['p50_ms']:7.2f}ms {s['p95_ms']:7.2f}ms {s['p99_ms']:7.2f}ms")
+
+def smoke_test(client_factory):
+    """One request per route, checking each succeeds"""
+    client = client_factory()
+    factory = PayloadFactory(pool_size=50)
+    ok = True
+    for route, (method, path) in ROUTES.items():
+        try:
+            status, data = client.request(method, path, factory.build(route))
+            passed = status == 200 and (data or {}).get('success', True) is not False
+        except Exception as e:
+            status, data, passed = 0, {'error': str(e)}, False
+        ok &= passed
+        print(f"  {'✓' if passed else '❌'} {method:4s} {path:24s} {status}")
+        if not passed:
+            print(f"     {data}")
+    return ok
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Load test the Sanity Orb ML API')
+    parser.add_argument('--url', help='server base URL, e.g. http://localhost:5001 '
+                                      '(default: in-process app, no network)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds to run')
+    parser.add_argument('--requests', type=int, default=None,
+                        help='stop after this many requests instead of --duration')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='route weights, e.g. session=3,trend=3,classify=3,advanced=2,info=0.2')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--smoke', action='store_true', help='one request per route, then exit')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("SANITY ORB ML API - LOAD TEST")
+    print("="*70)
+    print(f"Target: {args.url or 'in-process app'}")
+    client_factory = make_client_factory(args.url)
+
+    if args.smoke:
+        sys.exit(0 if smoke_test(client_factory) else 1)
+
+    print(f"Concurrency {args.concurrency}, "
+          f"{f'{args.requests} requests' if args.requests else f'{args.duration:.0f}s'}, "
+          f"mix {args.mix}")
+    samples, elapsed = run_load(client_factory, args.mix, args.concurrency,
+                                args.duration, args.requests, seed=args.seed)
+    report = summarize(samples, elapsed)
+    report['config'] = {'url': args.url, 'concurrency': args.concurrency, 'mix': args.mix}
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report saved to {args.json}")
+    sys.exit(0 if report['overall'] and report['overall']['errors'] == 0 else 1)
@@ -0,0 +1,46 @@
+"""
+Distilled Lookup-Table Classifier for the Sanity Orb ML API
+Serves sanity categories from per-bin probability tables built by
+SanityXGBoostModels.distill_classifier, falling back to the ensemble
+"""
+
+import json
+import os
+
+import numpy as np
+
+LOOKUP_TABLE_FILE = 'sanity_classifier_lut.json'
+
+class LookupTable:
+    """Binned probabilities over the classifier's dominant feature"""
+
+    def __init__(self, table):
+        self.table = table
+        self.features = table['features']
+        self.feature = table['feature']
+        self.feature_index = self.features.index(self.feature)
+        self.edges = np.asarray(table['edges'], dtype=np.float32)
+        self.probabilities = np.asarray(table['probabilities'], dtype=np.float64)
+        self.served = np.asarray(table['agreement']) >= table['min_agreement']
+
+    @classmethod
+    def load(cls, models_dir):
+        """The saved table, or None if distill_classifier has not been run"""
+        path = os.path.join(models_dir, LOOKUP_TABLE_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def lookup(self, X):
+        """
+        Probabilities per row of a float32 matrix in schema order
+
+        Returns (probabilities, hit) where hit marks rows whose bin agrees
+        with the ensemble well enough to be served from the table; the
+        other rows' probabilities are meaningless and must be recomputed.
+        """
+        x = X[:, self.feature_index]
+        bins = np.searchsorted(self.edges, x, side='right')
+        hit = self.served[bins] & ~np.isnan(x)
+        return self.probabilities[bins], hit
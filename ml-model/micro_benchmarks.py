@@ -0,0 +1,199 @@
+"""
+Micro-Benchmarks for Sanity Orb ML API Hot Paths
+Times each serving stage (feature building, slope extraction, predict,
+predict_proba, recommendations, jsonify) at several batch sizes
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import ml_api
+from load_test import PayloadFactory
+
+BENCHMARK_DIR = 'ml-model/benchmarks'
+BASELINE_FILE = 'micro_baseline.json'
+
+BATCH_SIZES = [1, 64, 4096]
+
+def measure(fn, warmup=5, repeats=30, min_time=0.2):
+    """
+    Time fn() after warmup calls
+
+    Runs at least `repeats` timed calls and keeps going until `min_time`
+    seconds have been spent, so fast stages get enough samples.
+    """
+    for _ in range(warmup):
+        fn()
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < repeats or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def describe(timings, batch_size):
+    """Summary statistics in microseconds, with a 95% confidence interval of the mean"""
+    us = [t * 1e6 for t in timings]
+    mean = statistics.fmean(us)
+    stdev = statistics.stdev(us) if len(us) > 1 else 0.0
+    half_width = 1.96 * stdev / np.sqrt(len(us))
+    return {
+        'samples': len(us),
+        'mean_us': mean,
+        'stdev_us': stdev,
+        'ci95_us': [mean - half_width, mean + half_width],
+        'median_us': statistics.median(us),
+        'p95_us': float(np.percentile(us, 95)),
+        'min_us': min(us),
+        'per_row_us': statistics.median(us) / batch_size
+    }
+
+def build_stages(batch_size, factory):
+    """Name -> zero-argument callable for every stage at one batch size"""
+    import pandas as pd
+
+    sessions = [ml_api.session_features(factory.session()) for _ in range(batch_size)]
+    histories = [factory.trend()['history'] for _ in range(batch_size)]
+    stats = [factory.classify() for _ in range(batch_size)]
+    trends = [ml_api.trend_features(h) for h in histories]
+
+    session_X = ml_api.feature_matrix(sessions, ml_api.schemas['session'])
+    trend_X = ml_api.feature_matrix(trends, ml_api.schemas['trend_value'])
+    class_X = ml_api.feature_matrix(stats, ml_api.schemas['classifier'])
+
+    results = [{
+        'trend_prediction': {'trend': ml_api.trend_label(t['slope'])},
+        'classification': {'category': ml_api.CATEGORIES[i % 4]}
+    } for i, t in enumerate(trends)]
+    responses = [{
+        'success': True,
+        'prediction': 61.23,
+        'confidence': 88.5,
+        'model': 'XGBoost Regressor',
+        'timestamp': datetime.now().isoformat()
+    } for _ in range(batch_size)]
+
+    def jsonify_all():
+        with ml_api.app.app_context():
+            for response in responses:
+                ml_api.jsonify(response)
+
+    # Stages call the models and the lookup table directly: the ml_api
+    # wrappers also feed the drift monitor and the coalescer
+    stages = {
+        'build_dataframe': lambda: pd.DataFrame(sessions),
+        'build_feature_matrix': lambda: ml_api.feature_matrix(sessions, ml_api.schemas['session']),
+        'session_features': lambda: [ml_api.session_features(s) for s in sessions],
+        'polyfit_slope': lambda: [
+            np.polyfit(np.arange(len(h)), h, 1)[0] for h in histories
+        ],
+        'trend_features': lambda: [ml_api.trend_features(h) for h in histories],
+        'predict_session': lambda: ml_api.models['session'].inplace_predict(session_X),
+        'predict_trend_value': lambda: ml_api.models['trend_value'].inplace_predict(trend_X),
+        'predict_trend_confidence': lambda: ml_api.models['trend_confidence'].inplace_predict(trend_X),
+        'predict_classifier': lambda: ml_api.models['classifier'].inplace_predict(class_X),
+        'predict_proba_classifier': lambda: ml_api._softmax_proba(ml_api.models['classifier'], class_X),
+        'generate_recommendations': lambda: [
+            ml_api.generate_recommendations(r, {'current_sanity': 25}) for r in results
+        ],
+        'jsonify': jsonify_all
+    }
+    if ml_api.lookup_table is not None:
+        stages['classify_lookup_table'] = lambda: ml_api.lookup_table.lookup(class_X)
+    return stages
+
+def run_suite(batch_sizes=BATCH_SIZES, stages=None, warmup=5, repeats=30, min_time=0.2):
+    if not any(ml_api.models.values()):
+        ml_api.load_models()
+    factory = PayloadFactory(pool_size=2000)
+    results = {}
+    for batch_size in batch_sizes:
+        print(f"\n>>> Batch size {batch_size}")
+        print(f"  {'stage':26s} {'median':>12s} {'p95':>12s} {'±ci95':>10s} {'per row':>10s}")
+        for name, fn in build_stages(batch_size, factory).items():
+            if stages and name not in stages:
+                continue
+            s = describe(measure(fn, warmup, repeats, min_time), batch_size)
+            results.setdefault(name, {})[str(batch_size)] = s
+            ci = (s['ci95_us'][1] - s['ci95_us'][0]) / 2
+            print(f"  {name:26s} {s['median_us']:10.1f}us {s['p95_us']:10.1f}us "
+                  f"{ci:8.1f}us {s['per_row_us']:8.2f}us")
+    return results
+
+def compare(results, baseline, threshold):
+    """Stages whose median moved more than threshold relative to the baseline"""
+    changes = []
+    for name, sizes in results.items():
+        for size, s in sizes.items():
+            base = baseline.get('results', {}).get(name, {}).get(size)
+            if not base:
+                continue
+            change = s['median_us'] / base['median_us'] - 1
+            if abs(change) > threshold:
+                changes.append((name, int(size), base['median_us'], s['median_us'], change))
+    return changes
+
+def main(batch_sizes=BATCH_SIZES, stages=None, threshold=0.1, save_baseline=False,
+         output_dir=BENCHMARK_DIR, **measure_kwargs):
+    print("\n" + "="*70)
+    print("SANITY ORB - ML API MICRO-BENCHMARKS")
+    print("="*70)
+
+    run = {
+        'date': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'bundle_version': None,
+        'results': run_suite(batch_sizes, stages, **measure_kwargs)
+    }
+    run['bundle_version'] = ml_api.model_source['bundle_version']
+
+    os.makedirs(output_dir, exist_ok=True)
+    baseline_path = os.path.join(output_dir, BASELINE_FILE)
+    if save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"\n✓ Baseline saved to {baseline_path}")
+        return True
+    if not os.path.exists(baseline_path):
+        print("\n  No baseline yet - create one with --save-baseline")
+        return True
+
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    changes = compare(run['results'], baseline, threshold)
+    if not changes:
+        print(f"\n✓ All stages within {threshold:.0%} of baseline ({baseline['date']})")
+        return True
+    print(f"\nChanges beyond {threshold:.0%} vs baseline ({baseline['date']}):")
+    regressed = False
+    for name, size, base, current, change in changes:
+        marker = '❌' if change > 0 else '✓'
+        regressed |= change > 0
+        print(f"  {marker} {name} @ {size}: {base:.1f}us -> {current:.1f}us ({change:+.0%})")
+    return not regressed
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Micro-benchmark the ML API hot paths')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=BATCH_SIZES)
+    parser.add_argument('--stages', nargs='+', help='only run these stages')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=30, help='minimum timed calls per stage')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per stage')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative median change reported against the baseline')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--output-dir', default=BENCHMARK_DIR)
+    args = parser.parse_args()
+
+    ok = main(args.batch_sizes, args.stages, args.threshold, args.save_baseline, args.output_dir,
+              warmup=args.warmup, repeats=args.repeats, min_time=args.min_time)
+    sys.exit(0 if ok else 1)
@@ -3,19 +3,57 @@ Flask API Server for XGBoost ML Models
 Provides REST endpoints for sanity predictions
 """
 
-from flask import Flask, request, jsonify
+import lean_runtime
+if lean_runtime.requested():
+    lean_runtime.enable()
+
+from flask import Flask, g, request, jsonify
 from flask_cors import CORS
 import xgboost as xgb
 import numpy as np
-import pandas as pd
+import atexit
+import functools
 import json
 import os
+import threading
+import time
 from datetime import datetime
 
+from admission import AdmissionController
+from capture import ROUTE_IDS, CaptureWriter
+from coalescing import SingleFlight
+from drift import DriftMonitor
+from explanations import DEFAULT_QUANTUM, EXPLAIN_MODES, Explainer, describe
+from forecasting import MAX_HORIZON, roll_forward
+from lookup_table import LookupTable
+from model_bundle import BUNDLE_FILE, BundleError, ModelBundle, booster_sha256, feature_matrix
+from shadow import DEFAULT_QUEUE_SIZE, DEFAULT_SAMPLE_RATE, ShadowScorer
+from shared_model_store import DEFAULT_STORE_PATH, SharedModelStore, build_lock, build_store, process_memory, read_store_header
+from wire_format import REQUEST_COLUMNS, RESPONSE_COLUMNS, WIRE_MEDIA_TYPE, WireFormatError, decode, encode, wants_binary
+from warmup import WARMUP_BATCH_SIZES, WARMUP_HEADER, Readiness, history_payload, route_requests, session_payload, stats_payload
+
 app = Flask(__name__)
 CORS(app)
 
-# Global models
+# Per-route in-flight limits (ML_MAX_INFLIGHT) and deadline handling
+admission = AdmissionController()
+
+# Not ready for traffic until warmup() has run every model and route once
+readiness = Readiness()
+
+# Sampled request/response capture for replay.py, enabled by ML_CAPTURE=<path>
+# ("{pid}" in the path gives each worker process its own file)
+capture = None
+
+# Candidate model set scored off the response path on sampled traffic, enabled by
+# ML_SHADOW_MODELS=<models dir> (ML_SHADOW_SAMPLE, ML_SHADOW_QUEUE)
+shadow = None
+
+# Concurrent single-row predictions with identical features share one evaluation
+coalescer = SingleFlight()
+COALESCE = os.environ.get('ML_COALESCE', '1').lower() not in ('0', 'false', 'no')
+
+# Global models (raw xgb.Booster objects, or SharedForest views of the shared store)
 models = {
     'session': None,
     'trend_value': None,
@@ -23,46 +61,642 @@ models = {
     'classifier': None
 }
 
-def load_models():
-    """Load all trained XGBoost models"""
-    import os
-    # Handle both running from root and from ml-model directory
+# Ordered feature names per model, taken from the bundle or the saved boosters
+schemas = {}
+
+# Distilled classifier (xgboost_models.py --distill); None serves everything from the ensemble
+lookup_table = None
+
+# Live feature sketches compared against the training reference; None if no reference was saved
+drift_monitor = None
+
+# Cached per-feature contributions for /api/explain (ML_EXPLAIN_QUANTUM sets the cache grid)
+explainer = Explainer(lambda key: private_booster(key),
+                      quantum=float(os.environ.get('ML_EXPLAIN_QUANTUM', DEFAULT_QUANTUM)))
+
+# Boosters loaded on demand, when serving from the shared store, for explanations
+# and for batches of at least ML_STORE_BOOSTER_ROWS rows
+_private_boosters = {}
+_private_lock = threading.Lock()
+
+# Where the models came from and their training metadata
+model_source = {
+    'models_dir': None,
+    'bundle_version': None,
+    'metadata': {},
+    'model_sha256': {},
+    'model_store': None
+}
+
+# Set to 1 (default path) or a file path to serve from the shared-memory model store
+SHARED_STORE_ENV = 'ML_SHARED_MODEL_STORE'
+
+# SharedForest's numpy traversal is 5-18x slower than a Booster on batches, so
+# on the shared store batches this large (cohort, binary) use a private Booster;
+# 0 keeps every call on the store
+STORE_BOOSTER_ROWS = int(os.environ.get('ML_STORE_BOOSTER_ROWS', '64'))
+
+# OpenMP threads per predict call: "2", or per model as "session=2,classifier=1".
+# Saved models carry the training-time n_jobs=-1, which for single-row requests
+# only spins up a thread team per call and oversubscribes under Flask threads.
+INFERENCE_THREADS_ENV = 'ML_INFERENCE_THREADS'
+DEFAULT_INFERENCE_THREADS = 1
+
+# nthread applied to each loaded model
+inference_threads = {}
+
+CATEGORIES = ['Critical', 'Unstable', 'Stable', 'Optimal']
+
+# Largest cohort accepted by /api/predict/cohort in one request
+MAX_COHORT = 1000
+
+# Largest batch accepted by /api/explain in one request
+MAX_EXPLAIN_ROWS = 500
+
+# Shortest history the trend features are defined for
+MIN_HISTORY = 5
+
+# Loose model files, used when no bundle has been exported
+MODEL_FILES = {
+    'session': 'session_predictor.json',
+    'trend_value': 'trend_value_predictor.json',
+    'trend_confidence': 'trend_confidence_predictor.json',
+    'classifier': 'sanity_classifier.json'
+}
+
+METADATA_FILES = [
+    'session_predictor_metadata.json',
+    'trend_predictor_metadata.json',
+    'sanity_classifier_metadata.json',
+    'training_summary.json'
+]
+
+def find_models_dir():
+    """Handle both running from root and from ml-model directory"""
     if os.path.exists('ml-model/trained_models'):
-        models_dir = 'ml-model/trained_models'
+        return 'ml-model/trained_models'
+    return 'trained_models'
+
+def shared_store_path():
+    """Store path from ML_SHARED_MODEL_STORE, or None when the store is disabled"""
+    value = os.environ.get(SHARED_STORE_ENV, '')
+    if value.lower() in ('', '0', 'false', 'no'):
+        return None
+    return DEFAULT_STORE_PATH if value.lower() in ('1', 'true', 'yes') else value
+
+def source_fingerprint(models_dir):
+    """Size and mtime of every model source file, so a retrained model invalidates the store"""
+    names = [BUNDLE_FILE] + list(MODEL_FILES.values()) + METADATA_FILES
+    fingerprint = {}
+    for name in names:
+        path = os.path.join(models_dir, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            fingerprint[name] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprint
+
+def attach_shared_store(store_path, models_dir):
+    """
+    Attach to the shared model store, building it first if missing or stale
+
+    One worker compiles the boosters into the store under build_lock;
+    workers starting at the same time wait for it, and every worker then
+    maps the same file read-only without loading a booster.
+    """
+    fingerprint = source_fingerprint(models_dir)
+
+    def current():
+        if not os.path.exists(store_path):
+            return False
+        try:
+            return read_store_header(store_path)['extra'].get('fingerprint') == fingerprint
+        except (ValueError, OSError):
+            return False
+
+    if not current():
+        with build_lock(store_path):
+            # Another worker may have built it while this one waited
+            if not current():
+                if not load_models(models_dir, use_store=False):
+                    return False
+                build_store(store_path, {k: m for k, m in models.items() if m is not None}, extra={
+                    'fingerprint': fingerprint,
+                    'schemas': schemas,
+                    'bundle_version': model_source['bundle_version'],
+                    'metadata': model_source['metadata'],
+                    'model_sha256': model_source['model_sha256']
+                })
+                print(f"✓ Shared model store written to {store_path}")
+
+    store = SharedModelStore(store_path)
+    for key in models:
+        models[key] = store.forests.get(key)
+    schemas.clear()
+    schemas.update(store.extra['schemas'])
+    model_source['bundle_version'] = store.extra['bundle_version']
+    model_source['metadata'] = store.extra['metadata']
+    model_source['model_sha256'] = store.extra.get('model_sha256', {})
+    model_source['model_store'] = store_path
+    print(f"✓ Attached to shared model store {store_path}")
+    return True
+
+def parse_inference_threads(spec=None):
+    """ML_INFERENCE_THREADS -> {model_key: nthread}"""
+    spec = spec if spec is not None else os.environ.get(INFERENCE_THREADS_ENV, '')
+    threads = dict.fromkeys(models, DEFAULT_INFERENCE_THREADS)
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        key, sep, value = part.rpartition('=')
+        if not sep:
+            threads = dict.fromkeys(models, int(value))
+        elif key in threads:
+            threads[key] = int(value)
+        else:
+            raise ValueError(f"Unknown model in {INFERENCE_THREADS_ENV}: {key}")
+    return threads
+
+def configure_threads(threads=None):
+    """Set the serving-side nthread of every loaded model"""
+    threads = threads or parse_inference_threads()
+    for key, model in models.items():
+        if model is not None:
+            model.set_param({'nthread': threads[key]})
+    inference_threads.clear()
+    inference_threads.update(threads)
+
+def private_booster(model_key):
+    """
+    An xgb.Booster for pred_contribs and large batches: the served model
+    itself, or, when serving SharedForest views of the shared store, the
+    same models loaded from models_dir on first use
+    """
+    model = models[model_key]
+    if isinstance(model, xgb.Booster):
+        return model
+    with _private_lock:
+        if not _private_boosters:
+            models_dir = model_source['models_dir']
+            _private_boosters.update(read_models(models_dir, verbose=False)['boosters'])
+            for key, booster in _private_boosters.items():
+                booster.set_param({'nthread': inference_threads.get(key, DEFAULT_INFERENCE_THREADS)})
+            print(f"✓ Loaded private boosters from {models_dir}")
+        return _private_boosters[model_key]
+
+def batch_model(model_key, n_rows):
+    """The model to evaluate n_rows with: the served model, or a private Booster for large batches"""
+    model = models[model_key]
+    if STORE_BOOSTER_ROWS and n_rows >= STORE_BOOSTER_ROWS and not isinstance(model, xgb.Booster):
+        return private_booster(model_key)
+    return model
+
+def load_lookup_table(models_dir):
+    """Load the distilled classifier if it was built from the loaded classifier"""
+    global lookup_table
+    lookup_table = LookupTable.load(models_dir)
+    if lookup_table is None:
+        return
+    source = model_source['model_sha256'].get('classifier')
+    if lookup_table.table.get('source_sha256') != source or lookup_table.features != schemas.get('classifier'):
+        print("  Lookup table is stale (classifier retrained) - serving from the ensemble")
+        lookup_table = None
     else:
-        models_dir = 'trained_models'
+        print(f"✓ Distilled lookup table loaded ({lookup_table.served.sum()}/{len(lookup_table.served)} bins)")
+
+def load_drift_reference(models_dir):
+    global drift_monitor
+    drift_monitor = DriftMonitor.load(models_dir)
+    if drift_monitor is not None:
+        print("✓ Drift reference loaded")
+
+def read_models(models_dir, verbose=True):
+    """
+    Boosters, schemas, bundle version, metadata and per-model SHA-256
+    (booster_sha256) from a models directory, preferring the single-file
+    bundle over loose model files
+    """
+    bundle_path = os.path.join(models_dir, BUNDLE_FILE)
+    if os.path.exists(bundle_path):
+        bundle = ModelBundle(bundle_path)
+        if verbose:
+            print(f"✓ Model bundle {bundle.version_id} loaded")
+        return {
+            'boosters': dict(bundle.boosters),
+            'schemas': {key: bundle.schema(key) for key in bundle.boosters},
+            'bundle_version': bundle.version_id,
+            'metadata': bundle.metadata,
+            'model_sha256': {key: entry['sha256'] for key, entry in bundle.header['models'].items()}
+        }
+
+    boosters, metadata = {}, {}
+    for key, filename in MODEL_FILES.items():
+        path = os.path.join(models_dir, filename)
+        if os.path.exists(path):
+            boosters[key] = xgb.Booster(model_file=path)
+            if verbose:
+                print(f"✓ {filename} loaded")
+    for filename in METADATA_FILES:
+        path = os.path.join(models_dir, filename)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                key = filename.replace('_metadata.json', '').replace('.json', '')
+                metadata[key] = json.load(f)
+    return {
+        'boosters': boosters,
+        'schemas': {key: list(booster.feature_names) for key, booster in boosters.items()},
+        'bundle_version': None,
+        'metadata': metadata,
+        'model_sha256': {key: booster_sha256(booster) for key, booster in boosters.items()}
+    }
+
+def load_models(models_dir=None, use_store=True):
+    """Load all trained XGBoost models, preferring the single-file bundle"""
+    models_dir = models_dir or find_models_dir()
+    model_source['models_dir'] = models_dir
+    model_source['model_store'] = None
+    explainer.cache.clear()
+    _private_boosters.clear()
+
+    store_path = shared_store_path() if use_store else None
+    if store_path:
+        try:
+            if not attach_shared_store(store_path, models_dir):
+                return False
+            configure_threads()
+            load_lookup_table(models_dir)
+            load_drift_reference(models_dir)
+            return True
+        except (ValueError, OSError) as e:
+            print(f"Error attaching shared model store: {e}")
+            return False
     
     try:
-        # Load session predictor
-        session_path = os.path.join(models_dir, 'session_predictor.json')
-        if os.path.exists(session_path):
-            models['session'] = xgb.XGBRegressor()
-            models['session'].load_model(session_path)
-            print("✓ Session predictor loaded")
-        
-        # Load trend predictors
-        value_path = os.path.join(models_dir, 'trend_value_predictor.json')
-        conf_path = os.path.join(models_dir, 'trend_confidence_predictor.json')
-        if os.path.exists(value_path) and os.path.exists(conf_path):
-            models['trend_value'] = xgb.XGBRegressor()
-            models['trend_value'].load_model(value_path)
-            models['trend_confidence'] = xgb.XGBRegressor()
-            models['trend_confidence'].load_model(conf_path)
-            print("✓ Trend predictors loaded")
-        
-        # Load classifier
-        classifier_path = os.path.join(models_dir, 'sanity_classifier.json')
-        if os.path.exists(classifier_path):
-            models['classifier'] = xgb.XGBClassifier()
-            models['classifier'].load_model(classifier_path)
-            print("✓ Sanity classifier loaded")
+        loaded = read_models(models_dir)
+        for key in models:
+            models[key] = loaded['boosters'].get(key)
+        schemas.update(loaded['schemas'])
+        model_source['bundle_version'] = loaded['bundle_version']
+        model_source['metadata'] = loaded['metadata']
+        model_source['model_sha256'] = loaded['model_sha256']
         
+        configure_threads()
+        load_lookup_table(models_dir)
+        load_drift_reference(models_dir)
         print("\n✓ All ML models loaded successfully!")
         return True
-    except Exception as e:
+    except (BundleError, xgb.core.XGBoostError, OSError, ValueError) as e:
         print(f"Error loading models: {e}")
         return False
 
+def _coalesced(kind, model_key, X, fn):
+    """
+    Evaluate fn(X), coalescing concurrent single-row calls
+
+    The key is the float32 feature vector in schema order, so payloads that
+    differ only in key order or int/float spelling still share a result.
+    Shared results are read-only.
+    """
+    if not COALESCE or X.shape[0] != 1:
+        return fn(X)
+    result = coalescer.do((kind, model_key, X.tobytes()), lambda: fn(X))
+    result.flags.writeable = False
+    return result
+
+def predict(model_key, rows):
+    """Run one model over a list of feature dicts, returning a 1-D array"""
+    return predict_matrix(model_key, feature_matrix(rows, schemas[model_key]))
+
+def predict_matrix(model_key, X):
+    """Run one model over a float32 matrix in schema order"""
+    if drift_monitor is not None:
+        drift_monitor.observe(model_key, X)
+    start = time.perf_counter()
+    result = _coalesced('value', model_key, X, batch_model(model_key, len(X)).inplace_predict)
+    # Classifier labels are not comparable to the candidate's probabilities;
+    # classify_proba_matrix shadows the classifier
+    if shadow is not None and model_key != 'classifier':
+        shadow.submit(model_key, X, result, (time.perf_counter() - start) * 1000)
+    return result
+
+def _softmax_proba(model, X):
+    margin = model.inplace_predict(X, predict_type='margin')
+    margin = margin - margin.max(axis=1, keepdims=True)
+    exp = np.exp(margin)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def predict_proba(model_key, rows):
+    """Class probabilities for a softmax classifier (as XGBClassifier.predict_proba)"""
+    return predict_proba_matrix(model_key, feature_matrix(rows, schemas[model_key]))
+
+def predict_proba_matrix(model_key, X):
+    return _coalesced('proba', model_key, X, lambda X: _softmax_proba(batch_model(model_key, len(X)), X))
+
+def classify_proba(rows):
+    """
+    Classifier probabilities, from the distilled lookup table where its bin
+    agrees with the ensemble and from the ensemble elsewhere
+
+    Returns (probabilities, served_by_table) with one flag per row.
+    """
+    return classify_proba_matrix(feature_matrix(rows, schemas['classifier']))
+
+def classify_proba_matrix(X):
+    if drift_monitor is not None:
+        drift_monitor.observe('classifier', X)
+    start = time.perf_counter()
+    if lookup_table is None:
+        probabilities, hit = predict_proba_matrix('classifier', X), np.zeros(len(X), dtype=bool)
+    else:
+        probabilities, hit = lookup_table.lookup(X)
+        if not hit.all():
+            probabilities = probabilities.copy()
+            probabilities[~hit] = predict_proba_matrix('classifier', X[~hit])
+    if shadow is not None:
+        shadow.submit('classifier', X, probabilities, (time.perf_counter() - start) * 1000)
+    return probabilities, hit
+
+def session_features(data):
+    """Session model inputs, with avg_prev_sanity derived from the last three levels"""
+    features = dict(data)
+    features['avg_prev_sanity'] = (
+        data['prev_sanity_1'] +
+        data['prev_sanity_2'] +
+        data['prev_sanity_3']
+    ) / 3
+    return features
+
+def parse_history(history):
+    """A request's sanity history as a float array; ValueError with the client-facing message if unusable"""
+    if not isinstance(history, list) or not all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in history
+    ):
+        raise ValueError('history must be a list of numbers')
+    if len(history) < MIN_HISTORY:
+        raise ValueError(f'At least {MIN_HISTORY} data points required')
+    history = np.asarray(history, dtype=np.float64)
+    if not np.isfinite(history).all():
+        raise ValueError('history must contain only finite numbers')
+    return history
+
+def trend_features(history):
+    """Summary statistics of a sanity history, as used by the trend models"""
+    history = np.asarray(history, dtype=np.float64)
+    x = np.arange(len(history))
+    return {
+        'mean': np.mean(history),
+        'std': np.std(history),
+        'min': np.min(history),
+        'max': np.max(history),
+        'range': np.max(history) - np.min(history),
+        'slope': np.polyfit(x, history, 1)[0],
+        'last_3_avg': np.mean(history[-3:]),
+        'first_3_avg': np.mean(history[:3]),
+        'volatility': np.std(np.diff(history))
+    }
+
+def trend_feature_block(histories):
+    """trend_features() for every row of a (users, length) history matrix, in schema order"""
+    H = np.asarray(histories, dtype=np.float64)
+    n = H.shape[1]
+    x = np.arange(n) - (n - 1) / 2
+    columns = {
+        'mean': H.mean(axis=1),
+        'std': H.std(axis=1),
+        'min': H.min(axis=1),
+        'max': H.max(axis=1),
+        'range': H.max(axis=1) - H.min(axis=1),
+        'slope': H @ x / (x @ x),
+        'last_3_avg': H[:, -3:].mean(axis=1),
+        'first_3_avg': H[:, :3].mean(axis=1),
+        'volatility': np.diff(H, axis=1).std(axis=1)
+    }
+    return np.column_stack([columns[name] for name in schemas['trend_value']]).astype(np.float32)
+
+def forecast_trend(history, horizon, next_value):
+    """
+    Recursive multi-step forecast: one single-row trend_value call per step
+    on incrementally updated features, then one batched confidence call
+    over all steps (confidence is not fed back, so it need not be sequential)
+    """
+    value_model = models['trend_value']
+    values, rows = roll_forward(
+        history, horizon,
+        lambda features: value_model.inplace_predict(feature_matrix([features], schemas['trend_value']))[0],
+        first=next_value
+    )
+    confidences = np.clip(predict('trend_confidence', rows), 50, 98)
+    return [
+        {
+            'step': step + 1,
+            'value': round(value, 2),
+            'confidence': round(float(conf), 2),
+            'trend': trend_label(features['slope'])
+        }
+        for step, (value, conf, features) in enumerate(zip(values, confidences, rows))
+    ]
+
+def trend_label(slope):
+    if slope > 0.5:
+        return 'improving'
+    if slope < -0.5:
+        return 'declining'
+    return 'stable'
+
+# /api/explain model names -> (model key, predict payload -> model input dict)
+EXPLAINED_MODELS = {
+    'session': ('session', session_features),
+    'trend': ('trend_value', lambda row: trend_features(parse_history(row['history']))),
+    'classify': ('classifier', lambda row: row)
+}
+
+def start_shadow(models_dir=None):
+    """
+    Load the candidate model set from ML_SHADOW_MODELS and start scoring
+    ML_SHADOW_SAMPLE (default 0.1) of live model calls with it
+
+    Candidate models see the primary's feature matrix, reordered when the
+    candidate was trained with the same features in another order; models
+    whose features differ are not shadowed.
+    """
+    global shadow
+    models_dir = models_dir or os.environ.get('ML_SHADOW_MODELS')
+    if not models_dir:
+        return None
+    loaded = read_models(models_dir, verbose=False)
+    candidates, columns = {}, {}
+    for key, booster in loaded['boosters'].items():
+        primary = schemas.get(key)
+        candidate = loaded['schemas'][key]
+        if primary is None or sorted(primary) != sorted(candidate):
+            print(f"⚠️  Not shadowing {key}: candidate features differ from the served model")
+            continue
+        booster.set_param({'nthread': 1})
+        candidates[key] = booster
+        columns[key] = None if candidate == primary else [primary.index(name) for name in candidate]
+
+    def score(key, X):
+        if columns[key] is not None:
+            X = X[:, columns[key]]
+        if key == 'classifier':
+            return _softmax_proba(candidates[key], X)
+        return candidates[key].inplace_predict(X)
+
+    shadow = ShadowScorer(
+        score, list(candidates), classifiers=('classifier',),
+        sample_rate=float(os.environ.get('ML_SHADOW_SAMPLE', DEFAULT_SAMPLE_RATE)),
+        queue_size=int(os.environ.get('ML_SHADOW_QUEUE', DEFAULT_QUEUE_SIZE)),
+        info={
+            'candidate_dir': models_dir,
+            'candidate_bundle_version': loaded['bundle_version'],
+            'primary_bundle_version': model_source['bundle_version'],
+            'candidate_trained': {k: m.get('trained_date') for k, m in loaded['metadata'].items()
+                                  if isinstance(m, dict) and 'trained_date' in m}
+        }
+    )
+    print(f"✓ Shadow scoring {shadow.sample_rate:.0%} of model calls with {models_dir}")
+    return shadow
+
+def start_capture(path=None):
+    """Open the capture file from ML_CAPTURE / ML_CAPTURE_SAMPLE / ML_CAPTURE_MAX_MB / ML_CAPTURE_KEEP"""
+    global capture
+    path = path or os.environ.get('ML_CAPTURE')
+    if not path:
+        return None
+    capture = CaptureWriter(
+        path.replace('{pid}', str(os.getpid())),
+        sample_rate=float(os.environ.get('ML_CAPTURE_SAMPLE', '0.1')),
+        max_bytes=int(float(os.environ.get('ML_CAPTURE_MAX_MB', '64')) * (1 << 20)),
+        keep=int(os.environ.get('ML_CAPTURE_KEEP', '3')),
+        header={'bundle_version': model_source['bundle_version'], 'models_dir': model_source['models_dir']}
+    )
+    atexit.register(capture.close)
+    print(f"✓ Capturing {capture.sample_rate:.0%} of predict requests to {capture.path}")
+    return capture
+
+@app.before_request
+def _capture_start():
+    if capture is not None and request.path in ROUTE_IDS and WARMUP_HEADER not in request.headers \
+            and request.mimetype != WIRE_MEDIA_TYPE and capture.sampled():
+        g.capture_arrival = time.time()
+        g.capture_start = time.perf_counter()
+
+@app.after_request
+def _capture_finish(response):
+    if 'capture_start' in g:
+        latency_ms = (time.perf_counter() - g.capture_start) * 1000
+        capture.write(request.path, g.capture_arrival, latency_ms, response.status_code,
+                      request.get_data(), response.get_data())
+    return response
+
+def warmup(rounds=3, seed=0):
+    """
+    Push synthetic traffic through every model and route
+
+    Each model sees every batch size in WARMUP_BATCH_SIZES directly, then
+    every predict route is called `rounds` times through the Flask test
+    client so routing, feature building and JSON encoding are warm too.
+    Counters touched by warmup traffic are reset afterwards.
+    """
+    rng = np.random.default_rng(seed)
+    for size in WARMUP_BATCH_SIZES:
+        predict('session', [session_features(session_payload(rng)) for _ in range(size)])
+        trends = [trend_features(history_payload(rng)) for _ in range(size)]
+        predict('trend_value', trends)
+        predict('trend_confidence', trends)
+        stats = [stats_payload(rng) for _ in range(size)]
+        predict('classifier', stats)
+        predict_proba('classifier', stats)
+        classify_proba(stats)
+
+    client = app.test_client()
+    requests = 0
+    for _ in range(rounds):
+        for path, body in route_requests(rng):
+            response = client.post(path, json=body, headers={WARMUP_HEADER: '1'})
+            requests += 1
+            if response.status_code != 200:
+                raise RuntimeError(f"Warmup request to {path} failed: {response.get_json()}")
+        for path in ('/api/health', '/api/models/info'):
+            client.get(path)
+            requests += 1
+    admission.reset_counters()
+    coalescer.reset_counters()
+    if drift_monitor is not None:
+        drift_monitor.reset()
+    if shadow is not None:
+        shadow.reset()
+    return requests
+
+def start_warmup(background=True):
+    """Run warmup (in a thread by default) and flip /api/ready when it succeeds"""
+    return readiness.run(warmup, background=background)
+
+def wire_features(route, model_key, body):
+    """
+    Decode a block of REQUEST_COLUMNS rows into the model's feature matrix
+
+    Features are derived from the columns exactly as the JSON route derives
+    them from its fields, then ordered by the model's schema.
+    """
+    columns = REQUEST_COLUMNS[route]
+    fields = dict(zip(columns, decode(body, columns=len(columns)).astype(np.float64).T))
+    if route == 'session':
+        fields = session_features(fields)
+    return np.column_stack([fields[name] for name in schemas[model_key]]).astype(np.float32)
+
+def wire_predict(route, body):
+    """Decode a binary request block, predict, and return the RESPONSE_COLUMNS matrix"""
+    if route == 'session':
+        X = wire_features('session', 'session', body)
+        return np.clip(predict_matrix('session', X), 0, 100)[:, None]
+    if route == 'trend':
+        X = trend_feature_block(decode(body, min_columns=MIN_HISTORY))
+        schema = schemas['trend_value']
+        return np.column_stack([
+            np.clip(predict_matrix('trend_value', X), 0, 100),
+            np.clip(predict_matrix('trend_confidence', X), 50, 98),
+            X[:, schema.index('slope')],
+            X[:, schema.index('volatility')]
+        ])
+    probabilities, _ = classify_proba_matrix(wire_features('classify', 'classifier', body))
+    probabilities = probabilities * 100
+    return np.column_stack([probabilities.argmax(axis=1), probabilities.max(axis=1), probabilities])
+
+def wire_capable(route):
+    """
+    Serve WIRE_MEDIA_TYPE request bodies from a binary block of rows
+
+    JSON requests go to the route unchanged. Binary requests are answered
+    in binary unless the client accepts only JSON.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.mimetype != WIRE_MEDIA_TYPE:
+                return view(*args, **kwargs)
+            try:
+                outputs = wire_predict(route, request.get_data())
+            except WireFormatError as e:
+                # Malformed blocks are the client's error; anything else is a 500
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+            columns = RESPONSE_COLUMNS[route]
+            if not wants_binary(request):
+                return jsonify({'success': True, 'columns': columns, 'rows': outputs.tolist()})
+            response = app.response_class(encode(outputs), mimetype=WIRE_MEDIA_TYPE)
+            response.headers['X-Wire-Columns'] = ','.join(columns)
+            return response
+        return wrapper
+    return decorator
+
+@app.route('/api/ready', methods=['GET'])
+def ready_check():
+    """Readiness endpoint: 503 until models are loaded and warmup has finished"""
+    models_loaded = all(model is not None for model in models.values())
+    status = readiness.status()
+    ready = models_loaded and status['ready']
+    return jsonify(dict(status, ready=ready, models_loaded=models_loaded, pid=os.getpid())), 200 if ready else 503
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -70,10 +704,17 @@ def health_check():
     return jsonify({
         'status': 'healthy' if models_loaded else 'degraded',
         'models_loaded': models_loaded,
+        'ready': readiness.status()['ready'],
+        'model_store': model_source['model_store'] or 'private',
+        'runtime': 'lean' if lean_runtime.is_lean() else 'full',
+        'admission': admission.status(),
+        'memory': process_memory(),
         'timestamp': datetime.now().isoformat()
     })
 
 @app.route('/api/predict/session', methods=['POST'])
+@admission.guard('session')
+@wire_capable('session')
 def predict_session():
     """
     Predict next sanity level based on session data
@@ -94,29 +735,8 @@ def predict_session():
     try:
         data = request.json
         
-        # Calculate avg_prev_sanity
-        avg_prev_sanity = (
-            data['prev_sanity_1'] + 
-            data['prev_sanity_2'] + 
-            data['prev_sanity_3']
-        ) / 3
-        
-        # Prepare features
-        features = pd.DataFrame([{
-            'hour': data['hour'],
-            'day_of_week': data['day_of_week'],
-            'session_duration': data['session_duration'],
-            'interactions': data['interactions'],
-            'prev_sanity_1': data['prev_sanity_1'],
-            'prev_sanity_2': data['prev_sanity_2'],
-            'prev_sanity_3': data['prev_sanity_3'],
-            'avg_prev_sanity': avg_prev_sanity,
-            'stress_level': data['stress_level'],
-            'mood_factor': data['mood_factor']
-        }])
-        
         # Predict
-        prediction = models['session'].predict(features)[0]
+        prediction = predict('session', [session_features(data)])[0]
         prediction = float(np.clip(prediction, 0, 100))
         
         # Calculate confidence based on feature consistency
@@ -138,68 +758,51 @@ def predict_session():
         }), 400
 
 @app.route('/api/predict/trend', methods=['POST'])
+@admission.guard('trend')
+@wire_capable('trend')
 def predict_trend():
     """
     Predict future trend based on historical data
     
     Expected input:
     {
-        "history": [45.0, 47.0, 50.0, 48.0, 52.0, 55.0, 53.0, 56.0, 58.0, 60.0]
+        "history": [45.0, 47.0, 50.0, 48.0, 52.0, 55.0, 53.0, 56.0, 58.0, 60.0],
+        "horizon": 30  (optional, default 1: adds a "forecast" of that many steps)
     }
     """
     try:
         data = request.json
-        history = np.array(data['history'])
+        horizon = int(data.get('horizon', 1))
         
-        if len(history) < 5:
+        try:
+            history = parse_history(data['history'])
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        if not 1 <= horizon <= MAX_HORIZON:
             return jsonify({
                 'success': False,
-                'error': 'At least 5 data points required'
+                'error': f'horizon must be between 1 and {MAX_HORIZON}'
             }), 400
         
         # Calculate features
-        mean_val = np.mean(history)
-        std_val = np.std(history)
-        min_val = np.min(history)
-        max_val = np.max(history)
-        range_val = max_val - min_val
-        
-        # Calculate slope
-        x = np.arange(len(history))
-        slope = np.polyfit(x, history, 1)[0]
-        
-        last_3_avg = np.mean(history[-3:])
-        first_3_avg = np.mean(history[:3])
-        volatility = np.std(np.diff(history))
-        
-        features = pd.DataFrame([{
-            'mean': mean_val,
-            'std': std_val,
-            'min': min_val,
-            'max': max_val,
-            'range': range_val,
-            'slope': slope,
-            'last_3_avg': last_3_avg,
-            'first_3_avg': first_3_avg,
-            'volatility': volatility
-        }])
+        features = trend_features(history)
+        slope = features['slope']
+        volatility = features['volatility']
         
         # Predict
-        next_value = models['trend_value'].predict(features)[0]
-        confidence = models['trend_confidence'].predict(features)[0]
+        next_value = predict('trend_value', [features])[0]
+        confidence = predict('trend_confidence', [features])[0]
         
         next_value = float(np.clip(next_value, 0, 100))
         confidence = float(np.clip(confidence, 50, 98))
         
         # Determine trend
-        if slope > 0.5:
-            trend = 'improving'
-        elif slope < -0.5:
-            trend = 'declining'
-        else:
-            trend = 'stable'
+        trend = trend_label(slope)
         
-        return jsonify({
+        result = {
             'success': True,
             'next_value': round(next_value, 2),
             'confidence': round(confidence, 2),
@@ -208,7 +811,11 @@ def predict_trend():
             'volatility': round(float(volatility), 2),
             'model': 'XGBoost Regressor',
             'timestamp': datetime.now().isoformat()
-        })
+        }
+        if horizon > 1:
+            result['forecast'] = forecast_trend(history, horizon, next_value)
+        
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({
@@ -217,6 +824,8 @@ def predict_trend():
         }), 400
 
 @app.route('/api/predict/classify', methods=['POST'])
+@admission.guard('classify')
+@wire_capable('classify')
 def classify_sanity():
     """
     Classify sanity level category
@@ -233,24 +842,16 @@ def classify_sanity():
     try:
         data = request.json
         
-        features = pd.DataFrame([{
-            'current_sanity': data['current_sanity'],
-            'session_count': data['session_count'],
-            'avg_duration': data['avg_duration'],
-            'interaction_rate': data['interaction_rate'],
-            'consistency': data['consistency']
-        }])
-        
         # Predict
-        category_id = models['classifier'].predict(features)[0]
-        probabilities = models['classifier'].predict_proba(features)[0]
+        probabilities, from_table = classify_proba([data])
+        probabilities = probabilities[0]
+        category_id = int(np.argmax(probabilities))
         
-        categories = ['Critical', 'Unstable', 'Stable', 'Optimal']
-        category_name = categories[int(category_id)]
+        category_name = CATEGORIES[category_id]
         
         # Get probability distribution
         category_probs = {
-            categories[i]: round(float(prob) * 100, 2)
+            CATEGORIES[i]: round(float(prob) * 100, 2)
             for i, prob in enumerate(probabilities)
         }
         
@@ -260,7 +861,7 @@ def classify_sanity():
             'category_id': int(category_id),
             'probabilities': category_probs,
             'confidence': round(float(max(probabilities)) * 100, 2),
-            'model': 'XGBoost Classifier',
+            'model': 'Distilled Lookup Table' if from_table[0] else 'XGBoost Classifier',
             'timestamp': datetime.now().isoformat()
         })
         
@@ -271,6 +872,7 @@ def classify_sanity():
         }), 400
 
 @app.route('/api/predict/advanced', methods=['POST'])
+@admission.guard('advanced')
 def advanced_prediction():
     """
     Advanced prediction combining all models
@@ -298,96 +900,144 @@ def advanced_prediction():
     try:
         data = request.json
         
-        # Get predictions from all models
-        results = {}
+        # Session prediction is optional; skipped under overload or a tight deadline
+        skip_session = 'session_data' in data and admission.should_degrade('advanced')
+        outcome = advanced_predictions([data], skip_session)[0]
+        if 'error' in outcome:
+            return jsonify({
+                'success': False,
+                'error': outcome['error']
+            }), 400
         
-        # Session prediction
-        if 'session_data' in data and len(data['history']) >= 3:
-            session_data = data['session_data']
-            session_data['prev_sanity_1'] = data['history'][-1]
-            session_data['prev_sanity_2'] = data['history'][-2]
-            session_data['prev_sanity_3'] = data['history'][-3]
-            
-            avg_prev = (
-                session_data['prev_sanity_1'] +
-                session_data['prev_sanity_2'] +
-                session_data['prev_sanity_3']
-            ) / 3
-            
-            session_features = pd.DataFrame([{
-                'hour': session_data['hour'],
-                'day_of_week': session_data['day_of_week'],
-                'session_duration': session_data['session_duration'],
-                'interactions': session_data['interactions'],
-                'prev_sanity_1': session_data['prev_sanity_1'],
-                'prev_sanity_2': session_data['prev_sanity_2'],
-                'prev_sanity_3': session_data['prev_sanity_3'],
-                'avg_prev_sanity': avg_prev,
-                'stress_level': session_data['stress_level'],
-                'mood_factor': session_data['mood_factor']
-            }])
-            
-            session_pred = models['session'].predict(session_features)[0]
-            results['session_prediction'] = float(np.clip(session_pred, 0, 100))
-        
-        # Trend prediction
-        if 'history' in data and len(data['history']) >= 5:
-            history = np.array(data['history'])
-            mean_val = np.mean(history)
-            std_val = np.std(history)
-            x = np.arange(len(history))
-            slope = np.polyfit(x, history, 1)[0]
-            
-            trend_features = pd.DataFrame([{
-                'mean': mean_val,
-                'std': std_val,
-                'min': np.min(history),
-                'max': np.max(history),
-                'range': np.max(history) - np.min(history),
-                'slope': slope,
-                'last_3_avg': np.mean(history[-3:]),
-                'first_3_avg': np.mean(history[:3]),
-                'volatility': np.std(np.diff(history))
-            }])
-            
-            trend_value = models['trend_value'].predict(trend_features)[0]
-            trend_conf = models['trend_confidence'].predict(trend_features)[0]
-            
-            results['trend_prediction'] = {
-                'next_value': float(np.clip(trend_value, 0, 100)),
-                'confidence': float(np.clip(trend_conf, 50, 98)),
-                'trend': 'improving' if slope > 0.5 else 'declining' if slope < -0.5 else 'stable',
-                'slope': float(slope)
-            }
+        return jsonify({
+            'success': True,
+            'results': outcome['results'],
+            'recommendations': outcome['recommendations'],
+            'degraded': ['session_prediction'] if skip_session else [],
+            'timestamp': datetime.now().isoformat()
+        })
         
-        # Classification
-        if 'user_stats' in data:
-            stats = data['user_stats']
-            class_features = pd.DataFrame([{
-                'current_sanity': data['current_sanity'],
-                'session_count': stats['session_count'],
-                'avg_duration': stats['avg_duration'],
-                'interaction_rate': stats['interaction_rate'],
-                'consistency': stats['consistency']
-            }])
-            
-            category_id = models['classifier'].predict(class_features)[0]
-            probabilities = models['classifier'].predict_proba(class_features)[0]
-            
-            categories = ['Critical', 'Unstable', 'Stable', 'Optimal']
-            
-            results['classification'] = {
-                'category': categories[int(category_id)],
-                'confidence': float(max(probabilities)) * 100
-            }
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/api/predict/cohort', methods=['POST'])
+@admission.guard('cohort')
+def cohort_prediction():
+    """
+    Advanced predictions for many users at once
+    
+    Expected input:
+    {
+        "users": [
+            {"user_id": "alice", <advanced prediction payload>},
+            ...
+        ]
+    }
+    
+    Each model runs once over the whole cohort. Invalid entries get a
+    per-user error instead of failing the request.
+    """
+    try:
+        users = request.json['users']
+        
+        if not isinstance(users, list) or not 1 <= len(users) <= MAX_COHORT:
+            return jsonify({
+                'success': False,
+                'error': f'users must be a list of 1 to {MAX_COHORT} payloads'
+            }), 400
+        
+        skip_session = admission.should_degrade('cohort')
+        outcomes = advanced_predictions(users, skip_session)
+        
+        per_user = []
+        for payload, outcome in zip(users, outcomes):
+            entry = {'user_id': payload.get('user_id') if isinstance(payload, dict) else None}
+            if 'error' in outcome:
+                entry.update(success=False, error=outcome['error'])
+            else:
+                entry.update(success=True, **outcome)
+            per_user.append(entry)
+        
+        return jsonify({
+            'success': True,
+            'users': per_user,
+            'aggregates': cohort_aggregates(outcomes),
+            'degraded': ['session_prediction'] if skip_session else [],
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/api/explain', methods=['POST'])
+@admission.guard('explain')
+def explain_predictions():
+    """
+    Per-feature contributions behind session, trend or classifier predictions
+    
+    Expected input:
+    {
+        "model": "trend",           (session | trend | classify)
+        "rows": [{"history": [...]}, ...],   (the predict route's payloads)
+        "mode": "exact",            (optional: exact | approx)
+        "top": 3                    (optional)
+    }
+    
+    Rows are explained together in one call; repeated (quantized) rows are
+    served from the explanation cache.
+    """
+    try:
+        data = request.json
+        model_name = data.get('model')
+        rows = data.get('rows')
+        mode = data.get('mode', 'exact')
+        top = int(data.get('top', 3))
+        
+        if model_name not in EXPLAINED_MODELS:
+            return jsonify({
+                'success': False,
+                'error': f"model must be one of {', '.join(EXPLAINED_MODELS)}"
+            }), 400
+        if mode not in EXPLAIN_MODES:
+            return jsonify({
+                'success': False,
+                'error': f"mode must be one of {', '.join(EXPLAIN_MODES)}"
+            }), 400
+        if not isinstance(rows, list) or not 1 <= len(rows) <= MAX_EXPLAIN_ROWS:
+            return jsonify({
+                'success': False,
+                'error': f'rows must be a list of 1 to {MAX_EXPLAIN_ROWS} payloads'
+            }), 400
+        
+        model_key, build_row = EXPLAINED_MODELS[model_name]
+        features = schemas[model_key]
+        X = feature_matrix([_model_row(model_key, build_row(row)) for row in rows], features)
+        X, contributions = explainer.contributions(model_key, X, features, mode)
         
-        # Generate recommendations
-        recommendations = generate_recommendations(results, data)
+        explanations = []
+        for x, contrib in zip(X, contributions):
+            if contrib.ndim == 2:
+                # Classifier: explain the margin of the predicted class
+                class_id = int(np.argmax(contrib.sum(axis=1)))
+                explanation = dict(describe(contrib[class_id], features, top), category=CATEGORIES[class_id])
+            else:
+                explanation = describe(contrib, features, top)
+                explanation['prediction'] = round(explanation['margin'], 4)
+            explanation['inputs'] = {name: round(float(v), 4) for name, v in zip(features, x)}
+            explanations.append(explanation)
         
         return jsonify({
             'success': True,
-            'results': results,
-            'recommendations': recommendations,
+            'model': model_key,
+            'mode': mode,
+            'quantum': explainer.quantum,
+            'explanations': explanations,
             'timestamp': datetime.now().isoformat()
         })
         
@@ -397,6 +1047,110 @@ def advanced_prediction():
             'error': str(e)
         }), 400
 
+def _model_row(model_key, values):
+    """A model's input row with every schema field present and numeric"""
+    return {name: float(values[name]) for name in schemas[model_key]}
+
+def advanced_predictions(payloads, skip_session=False):
+    """
+    Results and recommendations for a list of advanced payloads
+    
+    Features are extracted per user, then session, trend and classifier
+    each run once over every user that has their inputs. Returns one dict
+    per payload: {'results', 'recommendations'} or {'error'}.
+    """
+    outcomes = [{'results': {}} for _ in payloads]
+    session_rows, session_users = [], []
+    trend_rows, trend_users = [], []
+    class_rows, class_users = [], []
+    
+    for i, data in enumerate(payloads):
+        if not isinstance(data, dict):
+            outcomes[i] = {'error': 'payload must be an object'}
+            continue
+        try:
+            if 'session_data' in data and not skip_session and len(data['history']) >= 3:
+                session_data = dict(data['session_data'])
+                session_data['prev_sanity_1'] = data['history'][-1]
+                session_data['prev_sanity_2'] = data['history'][-2]
+                session_data['prev_sanity_3'] = data['history'][-3]
+                session_row = _model_row('session', session_features(session_data))
+            else:
+                session_row = None
+            
+            if 'history' in data and len(data['history']) >= MIN_HISTORY:
+                trend_row = _model_row('trend_value', trend_features(parse_history(data['history'])))
+            else:
+                trend_row = None
+            
+            if 'user_stats' in data:
+                class_row = _model_row('classifier', dict(data['user_stats'], current_sanity=data['current_sanity']))
+            else:
+                class_row = None
+        except (KeyError, TypeError, ValueError) as e:
+            outcomes[i] = {'error': str(e)}
+            continue
+        
+        for row, rows, users in ((session_row, session_rows, session_users),
+                                 (trend_row, trend_rows, trend_users),
+                                 (class_row, class_rows, class_users)):
+            if row is not None:
+                rows.append(row)
+                users.append(i)
+    
+    if session_rows:
+        for i, value in zip(session_users, predict('session', session_rows)):
+            outcomes[i]['results']['session_prediction'] = float(np.clip(value, 0, 100))
+    
+    if trend_rows:
+        values = predict('trend_value', trend_rows)
+        confidences = predict('trend_confidence', trend_rows)
+        for i, row, value, conf in zip(trend_users, trend_rows, values, confidences):
+            outcomes[i]['results']['trend_prediction'] = {
+                'next_value': float(np.clip(value, 0, 100)),
+                'confidence': float(np.clip(conf, 50, 98)),
+                'trend': trend_label(row['slope']),
+                'slope': row['slope']
+            }
+    
+    if class_rows:
+        probabilities, _ = classify_proba(class_rows)
+        for i, probs in zip(class_users, probabilities):
+            outcomes[i]['results']['classification'] = {
+                'category': CATEGORIES[int(np.argmax(probs))],
+                'confidence': float(max(probs)) * 100
+            }
+    
+    for data, outcome in zip(payloads, outcomes):
+        if 'results' in outcome:
+            outcome['recommendations'] = generate_recommendations(outcome['results'], data)
+    return outcomes
+
+def cohort_aggregates(outcomes):
+    """Cohort-level summary of advanced_predictions() outcomes"""
+    succeeded = [o for o in outcomes if 'results' in o]
+    sessions = [o['results']['session_prediction'] for o in succeeded if 'session_prediction' in o['results']]
+    trends = [o['results']['trend_prediction'] for o in succeeded if 'trend_prediction' in o['results']]
+    classes = [o['results']['classification'] for o in succeeded if 'classification' in o['results']]
+    priorities = [r['priority'] for o in succeeded for r in o['recommendations']]
+    
+    def counts(values, keys):
+        return {key: values.count(key) for key in keys}
+    
+    return {
+        'users': len(outcomes),
+        'succeeded': len(succeeded),
+        'failed': len(outcomes) - len(succeeded),
+        'mean_session_prediction': float(np.mean(sessions)) if sessions else None,
+        'mean_next_value': float(np.mean([t['next_value'] for t in trends])) if trends else None,
+        'trends': counts([t['trend'] for t in trends], ('improving', 'stable', 'declining')),
+        'categories': counts([c['category'] for c in classes], CATEGORIES),
+        'recommendation_priorities': counts(priorities, ('critical', 'high', 'low')),
+        'users_needing_attention': sum(
+            1 for o in succeeded if any(r['priority'] in ('critical', 'high') for r in o['recommendations'])
+        )
+    }
+
 def generate_recommendations(results, data):
     """Generate AI recommendations based on predictions"""
     recommendations = []
@@ -440,31 +1194,54 @@ def generate_recommendations(results, data):
     
     return recommendations
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Serving counters: coalescing, capture, explanation cache and admission control"""
+    return jsonify({
+        'success': True,
+        'coalescing': dict(coalescer.stats(), enabled=COALESCE),
+        'capture': capture.stats() if capture is not None else None,
+        'explanation_cache': explainer.cache.stats(),
+        'admission': admission.status(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@app.route('/api/drift', methods=['GET'])
+def drift_report():
+    """PSI drift of live model inputs against the training-time reference"""
+    if drift_monitor is None:
+        return jsonify({
+            'success': False,
+            'error': 'No drift reference - run xgboost_models.py --drift-reference'
+        }), 404
+    return jsonify(dict(drift_monitor.report(), success=True, timestamp=datetime.now().isoformat()))
+
+@app.route('/api/shadow', methods=['GET'])
+def shadow_report():
+    """How the candidate model set differs from the served one on live traffic"""
+    if shadow is None:
+        return jsonify({
+            'success': False,
+            'error': 'No candidate models - set ML_SHADOW_MODELS to a models directory'
+        }), 404
+    return jsonify(dict(shadow.report(), success=True, timestamp=datetime.now().isoformat()))
+
 @app.route('/api/models/info', methods=['GET'])
 def models_info():
     """Get information about loaded models"""
     try:
-        info = {}
-        
-        # Load metadata files
-        models_dir = 'trained_models'
-        metadata_files = [
-            'session_predictor_metadata.json',
-            'trend_predictor_metadata.json',
-            'sanity_classifier_metadata.json',
-            'training_summary.json'
-        ]
-        
-        for filename in metadata_files:
-            filepath = os.path.join(models_dir, filename)
-            if os.path.exists(filepath):
-                with open(filepath, 'r') as f:
-                    key = filename.replace('_metadata.json', '').replace('.json', '')
-                    info[key] = json.load(f)
-        
         return jsonify({
             'success': True,
-            'info': info,
+            'info': model_source['metadata'],
+            'bundle_version': model_source['bundle_version'],
+            'schemas': schemas,
+            'inference_threads': inference_threads,
+            'wire_format': {
+                'media_type': WIRE_MEDIA_TYPE,
+                'request_columns': REQUEST_COLUMNS,
+                'response_columns': RESPONSE_COLUMNS
+            },
+            'lookup_table': lookup_table.table['validation'] if lookup_table else None,
             'models_loaded': {
                 'session': models['session'] is not None,
                 'trend_value': models['trend_value'] is not None,
@@ -486,6 +1263,9 @@ if __name__ == '__main__':
     print("\nLoading XGBoost models...")
     
     if load_models():
+        start_shadow()
+        start_warmup()
+        start_capture()
         print("\n✓ Server ready!")
         print("  API endpoint: http://localhost:5001")
         print("\nAvailable endpoints:")
@@ -493,8 +1273,14 @@ if __name__ == '__main__':
         print("  • POST /api/predict/trend")
         print("  • POST /api/predict/classify")
         print("  • POST /api/predict/advanced")
+        print("  • POST /api/predict/cohort")
+        print("  • POST /api/explain")
         print("  • GET  /api/models/info")
+        print("  • GET  /api/metrics")
+        print("  • GET  /api/drift")
+        print("  • GET  /api/shadow")
         print("  • GET  /api/health")
+        print("  • GET  /api/ready")
         print("\n" + "="*70 + "\n")
         
         app.run(host='0.0.0.0', port=5001, debug=True)
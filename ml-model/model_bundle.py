@@ -0,0 +1,153 @@
+"""
+Versioned Model Bundle for Sanity Orb ML Models
+One checksummed file holding every booster, its feature schema and metadata
+
+Layout:
+    magic (8 bytes) | format version (u32) | header length (u64) | header JSON
+    | padding to 64 bytes | booster blobs (UBJSON, each 64-byte aligned)
+    | SHA-256 of everything before it (32 bytes)
+
+The header records, per model, the blob offset/length/SHA-256, the
+ordered feature names and types, and the training metadata. Only numpy,
+xgboost and the standard library are imported so the API can use this
+module without pulling in the training stack.
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+from datetime import datetime
+
+import numpy as np
+import xgboost as xgb
+
+BUNDLE_FILE = 'sanity_models.bundle'
+BUNDLE_MAGIC = b'SANITYMB'
+BUNDLE_FORMAT = 1
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<8sIQ')
+_DIGEST_SIZE = 32
+
+class BundleError(Exception):
+    """Raised when a bundle is malformed, corrupt or inconsistent"""
+
+def _pad(size):
+    return (-size) % ALIGNMENT
+
+def booster_sha256(booster):
+    """
+    SHA-256 of a booster's binary (UBJSON) form
+
+    Equal to the model's blob checksum in a bundle, whether the booster was
+    loaded from the bundle or from its JSON model file.
+    """
+    return hashlib.sha256(bytes(booster.save_raw('ubj'))).hexdigest()
+
+def pack_bundle(path, boosters, schemas, metadata):
+    """
+    Write a bundle file
+
+    boosters: {model_key: xgb.Booster}
+    schemas:  {model_key: {'features': [...], 'feature_types': [...], ...}}
+    metadata: free-form JSON-serializable training metadata
+    Returns the header that was written.
+    """
+    blobs = {key: bytes(booster.save_raw('ubj')) for key, booster in boosters.items()}
+    payload_digest = hashlib.sha256()
+    models = {}
+    offset = 0
+    for key, blob in blobs.items():
+        models[key] = dict(
+            schemas[key],
+            offset=offset,
+            length=len(blob),
+            sha256=hashlib.sha256(blob).hexdigest()
+        )
+        payload_digest.update(blob)
+        offset += len(blob) + _pad(len(blob))
+
+    payload_sha256 = payload_digest.hexdigest()
+    header = {
+        'format': BUNDLE_FORMAT,
+        'version_id': payload_sha256[:12],
+        'created': datetime.now().isoformat(),
+        'payload_sha256': payload_sha256,
+        'models': models,
+        'metadata': metadata
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    preamble = _PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_FORMAT, len(header_bytes))
+    data_start = _PREAMBLE.size + len(header_bytes)
+    data_start += _pad(data_start)
+
+    file_digest = hashlib.sha256()
+    with open(path, 'wb') as f:
+        def write(chunk):
+            file_digest.update(chunk)
+            f.write(chunk)
+
+        write(preamble)
+        write(header_bytes)
+        write(b'\0' * (data_start - _PREAMBLE.size - len(header_bytes)))
+        for blob in blobs.values():
+            write(blob)
+            write(b'\0' * _pad(len(blob)))
+        f.write(file_digest.digest())
+    return header
+
+class ModelBundle:
+    """
+    Memory-mapped, checksum-verified bundle
+
+    Boosters are deserialized straight from the mapped pages; the mapping is
+    closed once they are loaded.
+    """
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if len(mm) < _PREAMBLE.size + _DIGEST_SIZE:
+                    raise BundleError(f"{path} is too small to be a model bundle")
+                magic, fmt, header_len = _PREAMBLE.unpack_from(mm, 0)
+                if magic != BUNDLE_MAGIC:
+                    raise BundleError(f"{path} is not a Sanity Orb model bundle")
+                if fmt != BUNDLE_FORMAT:
+                    raise BundleError(f"Unsupported bundle format {fmt}")
+                body_end = len(mm) - _DIGEST_SIZE
+                if verify and hashlib.sha256(memoryview(mm)[:body_end]).digest() != mm[body_end:]:
+                    raise BundleError(f"Checksum mismatch in {path}")
+
+                self.header = json.loads(mm[_PREAMBLE.size:_PREAMBLE.size + header_len])
+                data_start = _PREAMBLE.size + header_len
+                data_start += _pad(data_start)
+
+                self.boosters = {}
+                for key, entry in self.header['models'].items():
+                    start = data_start + entry['offset']
+                    blob = mm[start:start + entry['length']]
+                    if verify and hashlib.sha256(blob).hexdigest() != entry['sha256']:
+                        raise BundleError(f"Checksum mismatch for model {key}")
+                    booster = xgb.Booster()
+                    booster.load_model(bytearray(blob))
+                    if booster.feature_names and list(booster.feature_names) != entry['features']:
+                        raise BundleError(f"Feature order of {key} does not match its schema")
+                    self.boosters[key] = booster
+
+    @property
+    def version_id(self):
+        return self.header['version_id']
+
+    @property
+    def metadata(self):
+        return self.header['metadata']
+
+    def schema(self, key):
+        """Ordered feature names for one model"""
+        return self.header['models'][key]['features']
+
+def feature_matrix(rows, features):
+    """float32 matrix with one row per dict, columns in schema order"""
+    return np.array([[row[name] for name in features] for row in rows], dtype=np.float32)
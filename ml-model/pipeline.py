@@ -0,0 +1,293 @@
+"""
+Cached Training Pipeline for Sanity Orb ML Models
+Runs generate -> per-model train -> export as a dependency graph, skipping
+steps whose inputs (code, params, data) hash to an already-built output
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+ML_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = '.pipeline_cache.json'
+
+DEFAULT_CONFIG = {
+    'num_samples': 5000,
+    'data_dir': os.path.join(ML_DIR, 'data'),
+    'models_dir': os.path.join(ML_DIR, 'trained_models'),
+    'training_mode': 'in_memory',
+    'use_tuned': False
+}
+
+DATA_FILES = ['session_data.csv', 'trend_data.csv', 'classification_data.csv', 'data_stats.json']
+
+TRAINING_CODE = ['xgboost_models.py', 'data_streaming.py', 'training_cache.py', 'coreset.py']
+
+EXPORT_INPUTS = [
+    'session_predictor.json', 'session_predictor_metadata.json',
+    'trend_value_predictor.json', 'trend_confidence_predictor.json', 'trend_predictor_metadata.json',
+    'sanity_classifier.json', 'sanity_classifier_metadata.json'
+]
+
+def _generate(config):
+    from data_generator import SanityDataGenerator
+    os.makedirs(config['data_dir'], exist_ok=True)
+    SanityDataGenerator(num_samples=config['num_samples']).save_all_datasets(
+        output_dir=config['data_dir']
+    )
+
+def _trainer(config):
+    from xgboost_models import SanityXGBoostModels, load_tuned_params
+    params = load_tuned_params(config['models_dir']) if config['use_tuned'] else None
+    return SanityXGBoostModels(models_dir=config['models_dir'],
+                               training_mode=config['training_mode'], params=params)
+
+def _train_session(config):
+    _trainer(config).train_session_predictor(os.path.join(config['data_dir'], 'session_data.csv'))
+
+def _train_trend(config):
+    _trainer(config).train_trend_predictor(os.path.join(config['data_dir'], 'trend_data.csv'))
+
+def _train_classifier(config):
+    _trainer(config).train_classifier(os.path.join(config['data_dir'], 'classification_data.csv'))
+
+def _distill(config):
+    from xgboost_models import SanityXGBoostModels
+    SanityXGBoostModels(models_dir=config['models_dir']).distill_classifier(
+        os.path.join(config['data_dir'], 'classification_data.csv')
+    )
+
+def _drift_reference(config):
+    from xgboost_models import SanityXGBoostModels
+    SanityXGBoostModels(models_dir=config['models_dir']).save_drift_reference(config['data_dir'])
+
+def _export(config):
+    from xgboost_models import SanityXGBoostModels, write_training_summary
+    write_training_summary(config['models_dir'])
+    SanityXGBoostModels(models_dir=config['models_dir']).export_bundle()
+
+def _tuned_params_file(config):
+    return [('models', 'tuning_results.json')] if config['use_tuned'] else []
+
+# Each step lists the source files it depends on, the params that affect it,
+# its input files and output files. Files are (directory key, name) pairs;
+# any output of a dependency that a step reads must appear in its inputs.
+STEPS = {
+    'generate': {
+        'deps': [],
+        'code': ['data_generator.py'],
+        'params': lambda c: {'num_samples': c['num_samples']},
+        'inputs': lambda c: [],
+        'outputs': [('data', f) for f in DATA_FILES],
+        'run': _generate
+    },
+    'train_session': {
+        'deps': ['generate'],
+        'code': TRAINING_CODE,
+        'params': lambda c: {'training_mode': c['training_mode'], 'use_tuned': c['use_tuned']},
+        'inputs': lambda c: [('data', 'session_data.csv')] + _tuned_params_file(c),
+        'outputs': [('models', 'session_predictor.json'),
+                    ('models', 'session_predictor_metadata.json')],
+        'run': _train_session
+    },
+    'train_trend': {
+        'deps': ['generate'],
+        'code': TRAINING_CODE,
+        'params': lambda c: {'training_mode': c['training_mode'], 'use_tuned': c['use_tuned']},
+        'inputs': lambda c: [('data', 'trend_data.csv')] + _tuned_params_file(c),
+        'outputs': [('models', 'trend_value_predictor.json'),
+                    ('models', 'trend_confidence_predictor.json'),
+                    ('models', 'trend_predictor_metadata.json')],
+        'run': _train_trend
+    },
+    'train_classifier': {
+        'deps': ['generate'],
+        'code': TRAINING_CODE,
+        'params': lambda c: {'training_mode': c['training_mode'], 'use_tuned': c['use_tuned']},
+        'inputs': lambda c: [('data', 'classification_data.csv')] + _tuned_params_file(c),
+        'outputs': [('models', 'sanity_classifier.json'),
+                    ('models', 'sanity_classifier_metadata.json')],
+        'run': _train_classifier
+    },
+    'distill': {
+        'deps': ['train_classifier'],
+        'code': ['xgboost_models.py', 'lookup_table.py'],
+        'params': lambda c: {},
+        'inputs': lambda c: [('data', 'classification_data.csv'),
+                             ('models', 'sanity_classifier.json'),
+                             ('models', 'sanity_classifier_metadata.json')],
+        'outputs': [('models', 'sanity_classifier_lut.json')],
+        'run': _distill
+    },
+    'drift_reference': {
+        'deps': ['generate'],
+        'code': ['xgboost_models.py', 'drift.py'],
+        'params': lambda c: {},
+        'inputs': lambda c: [('data', f) for f in DATA_FILES[:3]],
+        'outputs': [('models', 'drift_reference.json')],
+        'run': _drift_reference
+    },
+    'export': {
+        'deps': ['train_session', 'train_trend', 'train_classifier'],
+        'code': ['xgboost_models.py', 'model_bundle.py'],
+        'params': lambda c: {},
+        'inputs': lambda c: [('models', f) for f in EXPORT_INPUTS],
+        'outputs': [('models', 'training_summary.json'), ('models', 'sanity_models.bundle')],
+        'run': _export
+    }
+}
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _resolve(config, ref):
+    directory, name = ref
+    return os.path.join(config['data_dir'] if directory == 'data' else config['models_dir'], name)
+
+def step_key(name, config):
+    """Hash of everything a step's outputs depend on"""
+    step = STEPS[name]
+    digest = hashlib.sha256(name.encode())
+    for code_file in step['code']:
+        digest.update(file_hash(os.path.join(ML_DIR, code_file)).encode())
+    digest.update(json.dumps(step['params'](config), sort_keys=True).encode())
+    for ref in step['inputs'](config):
+        path = _resolve(config, ref)
+        digest.update(ref[1].encode())
+        digest.update(file_hash(path).encode() if os.path.exists(path) else b'missing')
+    return digest.hexdigest()
+
+def is_cached(name, config, cache):
+    """True if the step's recorded key matches and its outputs are untouched"""
+    entry = cache.get(name)
+    if not entry or entry['key'] != step_key(name, config):
+        return False
+    for ref in STEPS[name]['outputs']:
+        path = _resolve(config, ref)
+        if not os.path.exists(path) or file_hash(path) != entry['outputs'].get(ref[1]):
+            return False
+    return True
+
+def _execute(name, config):
+    """Run one step in a worker process, capturing its console output"""
+    sys.path.insert(0, ML_DIR)
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            STEPS[name]['run'](config)
+    except Exception as e:
+        return name, False, time.perf_counter() - start, f"{output.getvalue()}\n{type(e).__name__}: {e}"
+    return name, True, time.perf_counter() - start, output.getvalue()
+
+def _load_cache(config):
+    path = os.path.join(config['models_dir'], CACHE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _save_cache(config, cache):
+    path = os.path.join(config['models_dir'], CACHE_FILE)
+    with open(path, 'w') as f:
+        json.dump(cache, f, indent=2)
+
+def run_pipeline(config=None, force=False, workers=None, verbose=False):
+    """
+    Build every step in dependency order
+
+    A step is submitted once all its dependencies are done; independent
+    steps (the three trainers) run in parallel worker processes. Steps
+    whose key and outputs match the cache are skipped.
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    os.makedirs(config['data_dir'], exist_ok=True)
+    os.makedirs(config['models_dir'], exist_ok=True)
+    cache = {} if force else _load_cache(config)
+    done, failed = set(), set()
+    pending = dict.fromkeys(STEPS)
+    running = {}
+    start = time.perf_counter()
+
+    print("\n" + "="*70)
+    print("SANITY ORB - ML PIPELINE")
+    print("="*70)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in list(pending):
+                deps = STEPS[name]['deps']
+                if any(d in failed for d in deps):
+                    print(f"  - {name:18s} skipped (dependency failed)")
+                    failed.add(name)
+                    del pending[name]
+                elif all(d in done for d in deps):
+                    del pending[name]
+                    if is_cached(name, config, cache):
+                        print(f"  ✓ {name:18s} cached")
+                        done.add(name)
+                    else:
+                        running[pool.submit(_execute, name, config)] = name
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                del running[future]
+                name, ok, elapsed, output = future.result()
+                if verbose or not ok:
+                    print(output)
+                if not ok:
+                    print(f"  ❌ {name:18s} failed after {elapsed:.1f}s")
+                    failed.add(name)
+                    continue
+                cache[name] = {
+                    'key': step_key(name, config),
+                    'outputs': {ref[1]: file_hash(_resolve(config, ref))
+                                for ref in STEPS[name]['outputs']},
+                    'built': datetime.now().isoformat(),
+                    'duration_s': elapsed
+                }
+                _save_cache(config, cache)
+                print(f"  ✓ {name:18s} built in {elapsed:.1f}s")
+                done.add(name)
+
+    print(f"\nPipeline finished in {time.perf_counter() - start:.1f}s")
+    if failed:
+        print(f"❌ Failed: {', '.join(sorted(failed))}")
+        return False
+    print(f"✓ Models in {config['models_dir']}\n")
+    return True
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate data and train Sanity Orb models, with caching')
+    parser.add_argument('--samples', type=int, default=DEFAULT_CONFIG['num_samples'])
+    parser.add_argument('--data-dir', default=DEFAULT_CONFIG['data_dir'])
+    parser.add_argument('--models-dir', default=DEFAULT_CONFIG['models_dir'])
+    parser.add_argument('--mode', default='in_memory', help='training mode passed to SanityXGBoostModels')
+    parser.add_argument('--use-tuned', action='store_true')
+    parser.add_argument('--force', action='store_true', help='ignore the cache and rebuild every step')
+    parser.add_argument('--workers', type=int, default=None, help='parallel step processes')
+    parser.add_argument('--verbose', action='store_true', help='print each step\'s output')
+    args = parser.parse_args()
+
+    ok = run_pipeline({
+        'num_samples': args.samples,
+        'data_dir': args.data_dir,
+        'models_dir': args.models_dir,
+        'training_mode': args.mode,
+        'use_tuned': args.use_tuned
+    }, force=args.force, workers=args.workers, verbose=args.verbose)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,188 @@
+"""
+Deterministic Replay of Captured ML API Traffic
+Re-issues requests from capture files at the original or an accelerated
+pace and reports latency plus output differences against the captured
+responses, i.e. between the capturing and the replayed model versions
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from capture import capture_files, read_capture
+from load_test import HTTPClient, InProcessClient
+
+# Response fields that legitimately differ between runs
+IGNORED_FIELDS = {'timestamp'}
+
+# predict_session's confidence is random noise, not a model output
+NOISY_FIELDS = {('/api/predict/session', 'confidence')}
+
+def load_records(path, limit=None):
+    """All records from a capture path and its rotations, ordered by arrival"""
+    header, records = None, []
+    for file_path in capture_files(path):
+        for header, record in read_capture(file_path):
+            records.append(record)
+    records.sort(key=lambda r: r['arrival'])
+    return header, records[:limit] if limit else records
+
+def flatten(value, prefix=''):
+    """Nested JSON -> {'a.b.0': leaf}"""
+    if isinstance(value, dict):
+        items = {}
+        for key, item in value.items():
+            items.update(flatten(item, f"{prefix}{key}."))
+        return items
+    if isinstance(value, list):
+        items = {}
+        for i, item in enumerate(value):
+            items.update(flatten(item, f"{prefix}{i}."))
+        return items
+    return {prefix[:-1]: value}
+
+def diff_responses(route, before, after, tolerance):
+    """Fields whose values differ: {field: abs difference, or None for non-numeric changes}"""
+    before, after = flatten(before or {}), flatten(after or {})
+    changes = {}
+    for field in before.keys() | after.keys():
+        if field.split('.')[-1] in IGNORED_FIELDS or (route, field) in NOISY_FIELDS:
+            continue
+        a, b = before.get(field), after.get(field)
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)) and \
+                not isinstance(a, bool) and not isinstance(b, bool):
+            if abs(a - b) > tolerance:
+                changes[field] = abs(a - b)
+        elif a != b:
+            changes[field] = None
+    return changes
+
+def replay(records, client_factory, speed=1.0, concurrency=8, tolerance=0.01):
+    """
+    Issue every record and compare the response with the captured one
+
+    speed=1 keeps the original inter-arrival gaps, speed=10 replays ten
+    times faster, speed=0 sends as fast as `concurrency` threads allow.
+    """
+    local = threading.local()
+    results = [None] * len(records)
+
+    def issue(i):
+        if not hasattr(local, 'client'):
+            local.client = client_factory()
+        record = records[i]
+        body = json.loads(record['request']) if record['request'] else None
+        start = time.perf_counter()
+        try:
+            status, data = local.client.request('POST', record['route'], body)
+        except Exception as e:
+            status, data = 0, {'error': str(e)}
+        latency_ms = (time.perf_counter() - start) * 1000
+        captured = json.loads(record['response']) if record['response'] else None
+        results[i] = {
+            'route': record['route'],
+            'status': status,
+            'captured_status': record['status'],
+            'latency_ms': latency_ms,
+            'captured_latency_ms': record['latency_ms'],
+            'changes': diff_responses(record['route'], captured, data, tolerance)
+        }
+
+    start = time.perf_counter()
+    first_arrival = records[0]['arrival'] if records else 0.0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i, record in enumerate(records):
+            if speed > 0:
+                delay = (record['arrival'] - first_arrival) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(issue, i)
+    return results, time.perf_counter() - start
+
+def summarize(results, elapsed):
+    def latency_stats(values):
+        values = np.array(values)
+        return {
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'p99_ms': float(np.percentile(values, 99))
+        }
+
+    report = {'elapsed_s': elapsed, 'requests': len(results), 'routes': {}}
+    for route in sorted({r['route'] for r in results}):
+        rows = [r for r in results if r['route'] == route]
+        fields = {}
+        for r in rows:
+            for field, delta in r['changes'].items():
+                entry = fields.setdefault(field, {'changed': 0, 'max_abs_diff': 0.0})
+                entry['changed'] += 1
+                if delta is not None:
+                    entry['max_abs_diff'] = max(entry['max_abs_diff'], delta)
+        report['routes'][route] = {
+            'requests': len(rows),
+            'status_changes': sum(1 for r in rows if r['status'] != r['captured_status']),
+            'responses_changed': sum(1 for r in rows if r['changes']),
+            'replayed': latency_stats([r['latency_ms'] for r in rows]),
+            'captured': latency_stats([r['captured_latency_ms'] for r in rows]),
+            'fields': dict(sorted(fields.items(), key=lambda kv: -kv[1]['changed']))
+        }
+    return report
+
+def print_report(report, header):
+    print(f"\nCaptured with bundle {header.get('bundle_version') or 'loose files'} "
+          f"({header.get('created')}); replayed {report['requests']} requests in {report['elapsed_s']:.1f}s")
+    print(f"\n  {'route':24s} {'reqs':>6s} {'changed':>8s} {'status':>7s} "
+          f"{'p50 then':>9s} {'p50 now':>9s} {'p99 then':>9s} {'p99 now':>9s}")
+    for route, s in report['routes'].items():
+        print(f"  {route:24s} {s['requests']:6d} {s['responses_changed']:8d} {s['status_changes']:7d} "
+              f"{s['captured']['p50_ms']:7.2f}ms {s['replayed']['p50_ms']:7.2f}ms "
+              f"{s['captured']['p99_ms']:7.2f}ms {s['replayed']['p99_ms']:7.2f}ms")
+        for field, entry in list(s['fields'].items())[:5]:
+            print(f"      {field:30s} changed in {entry['changed']} responses, "
+                  f"max |diff| {entry['max_abs_diff']:.4f}")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay captured ML API traffic and diff the outputs')
+    parser.add_argument('capture', help='capture file written with ML_CAPTURE (rotations are included)')
+    parser.add_argument('--url', help='server base URL (default: in-process app)')
+    parser.add_argument('--models-dir', help='models for the in-process app, e.g. a candidate version')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='pace multiplier: 1 = original, 10 = 10x faster, 0 = as fast as possible')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help='numeric differences up to this are not counted as changes')
+    parser.add_argument('--limit', type=int, help='replay only the first N records')
+    parser.add_argument('--json', help='write the report to this file')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("SANITY ORB ML API - TRAFFIC REPLAY")
+    print("="*70)
+    header, records = load_records(args.capture, args.limit)
+    if not records:
+        print(f"❌ No records in {args.capture}")
+        sys.exit(1)
+
+    if args.url:
+        client_factory = lambda: HTTPClient(args.url)
+    else:
+        import ml_api
+        if not ml_api.load_models(args.models_dir):
+            sys.exit(1)
+        ml_api.start_warmup(background=False)
+        client_factory = lambda: InProcessClient(ml_api.app)
+
+    results, elapsed = replay(records, client_factory, args.speed, args.concurrency, args.tolerance)
+    report = summarize(results, elapsed)
+    print_report(report, header)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(dict(report, capture_header=header), f, indent=2)
+        print(f"\n✓ Report saved to {args.json}")
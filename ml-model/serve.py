@@ -0,0 +1,124 @@
+"""
+Multi-Process Server for the Sanity Orb ML API
+Runs ml_api.py as workers x threads, each worker pinned to its own CPUs
+
+The parent binds the listening socket and forks the workers, which accept
+on the shared socket. Worker i is pinned to `threads` consecutive CPUs and
+its models predict with nthread=threads, so workers never compete for the
+same cores and a predict never starts more OpenMP threads than it has CPUs.
+"""
+
+import os
+import signal
+import socket
+import sys
+
+def available_cpus():
+    """CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def plan_layout(workers, threads, cpus=None):
+    """
+    CPU set for each worker
+
+    Workers get consecutive, non-overlapping blocks of `threads` CPUs while
+    they last; beyond that blocks wrap around and are shared.
+    """
+    cpus = cpus or available_cpus()
+    return [
+        [cpus[(w * threads + t) % len(cpus)] for t in range(threads)]
+        for w in range(workers)
+    ]
+
+def parse_layout(spec):
+    """'4x2' -> (4 workers, 2 threads each)"""
+    workers, _, threads = spec.lower().partition('x')
+    return int(workers), int(threads or 1)
+
+def _run_worker(sock, cpu_set, threads, models_dir, request_threads):
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpu_set)
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ.setdefault('ML_INFERENCE_THREADS', str(threads))
+    os.environ.setdefault('ML_LEAN_RUNTIME', '1')
+
+    from werkzeug.serving import make_server
+    import ml_api
+
+    if not ml_api.load_models(models_dir):
+        os._exit(1)
+    ml_api.start_shadow()
+    ml_api.start_warmup()
+    ml_api.start_capture()
+    server = make_server(sock.getsockname()[0], sock.getsockname()[1], ml_api.app,
+                         threaded=request_threads, fd=sock.fileno())
+    print(f"  worker {os.getpid()} on CPUs {cpu_set}, nthread={ml_api.inference_threads}")
+    sys.stdout.flush()
+    server.serve_forever()
+    os._exit(0)
+
+def serve(host='0.0.0.0', port=5001, workers=1, threads=1, models_dir=None, request_threads=True):
+    """Fork the workers and wait; SIGINT/SIGTERM stops all of them"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    layout = plan_layout(workers, threads)
+    print("\n" + "="*70)
+    print("SANITY ORB - ML API SERVER")
+    print("="*70)
+    print(f"Listening on http://{host}:{port} with {workers} worker(s) x {threads} thread(s)")
+    sys.stdout.flush()
+
+    children = []
+    for cpu_set in layout:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            _run_worker(sock, cpu_set, threads, models_dir, request_threads)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    failed = False
+    for pid in children:
+        while True:
+            try:
+                _, status = os.waitpid(pid, 0)
+                break
+            except InterruptedError:
+                continue
+        failed |= os.WIFEXITED(status) and os.WEXITSTATUS(status) != 0
+    sock.close()
+    return not failed
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve the ML API from pinned worker processes')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--layout', type=parse_layout, default=None,
+                        help='workers x threads per worker, e.g. 4x1 or 2x2')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=1, help='CPUs and nthread per worker')
+    parser.add_argument('--models-dir', default=None)
+    parser.add_argument('--no-request-threads', action='store_true',
+                        help='handle one request at a time per worker')
+    args = parser.parse_args()
+
+    workers, threads = args.layout or (args.workers, args.threads)
+    ok = serve(args.host, args.port, workers, threads, args.models_dir, not args.no_request_threads)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,175 @@
+"""
+Shadow Scoring for the Sanity Orb ML API
+Scores a sample of live requests with a candidate model set, off the
+response path, and aggregates how it differs from the served models
+
+The request thread only samples and does a non-blocking put of the
+already built feature matrix and the served output onto a bounded queue;
+when the queue is full the item is dropped and counted. One background
+thread, at lower OS priority, runs the candidate models and folds the
+deltas and latencies into fixed-size aggregates.
+"""
+
+import math
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_QUEUE_SIZE = 1000
+
+# Latency samples kept per model and version for percentiles
+LATENCY_WINDOW = 2048
+
+# Added niceness of the shadow thread, so it yields CPU to request threads
+SHADOW_NICE = 10
+
+class ModelComparison:
+    """Running delta and latency aggregates for one model"""
+
+    def __init__(self, classifier=False):
+        self.classifier = classifier
+        self.rows = 0
+        self.sum_delta = 0.0
+        self.sum_abs_delta = 0.0
+        self.sum_sq_delta = 0.0
+        self.max_abs_delta = 0.0
+        self.agreements = 0
+        self.primary_ms = deque(maxlen=LATENCY_WINDOW)
+        self.candidate_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def update(self, primary, candidate, primary_ms, candidate_ms):
+        """
+        Fold one call: outputs are 1-D values, or (rows, classes) probabilities
+        whose delta is the total variation distance between the two rows
+        """
+        if self.classifier:
+            self.agreements += int((primary.argmax(axis=1) == candidate.argmax(axis=1)).sum())
+            delta = 0.5 * np.abs(candidate - primary).sum(axis=1)
+        else:
+            delta = candidate - primary
+        delta = np.asarray(delta, dtype=np.float64)
+        self.rows += len(delta)
+        self.sum_delta += float(delta.sum())
+        self.sum_abs_delta += float(np.abs(delta).sum())
+        self.sum_sq_delta += float((delta ** 2).sum())
+        self.max_abs_delta = max(self.max_abs_delta, float(np.abs(delta).max()))
+        self.primary_ms.append(primary_ms)
+        self.candidate_ms.append(candidate_ms)
+
+    def report(self):
+        def percentiles(values):
+            if not values:
+                return None
+            values = np.asarray(values)
+            return {
+                'p50_ms': round(float(np.percentile(values, 50)), 4),
+                'p99_ms': round(float(np.percentile(values, 99)), 4)
+            }
+
+        n = self.rows
+        report = {
+            'rows': n,
+            'mean_delta': self.sum_delta / n if n else None,
+            'mean_abs_delta': self.sum_abs_delta / n if n else None,
+            'rmse_delta': math.sqrt(self.sum_sq_delta / n) if n else None,
+            'max_abs_delta': self.max_abs_delta if n else None,
+            'primary_latency': percentiles(self.primary_ms),
+            'candidate_latency': percentiles(self.candidate_ms)
+        }
+        if self.classifier:
+            report['agreement_rate'] = self.agreements / n if n else None
+        return report
+
+class ShadowScorer:
+    """
+    Candidate models scored asynchronously on sampled live inputs
+
+    candidate(model_key, X) returns the candidate's output for a feature
+    matrix in the primary schema order, in the same form as the served
+    output (values, or class probabilities for the classifier).
+    """
+
+    def __init__(self, candidate, model_keys, classifiers=(), sample_rate=DEFAULT_SAMPLE_RATE,
+                 queue_size=DEFAULT_QUEUE_SIZE, info=None, seed=None):
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.info = info or {}
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.comparisons = {key: ModelComparison(key in classifiers) for key in model_keys}
+        self.enqueued = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self.thread = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+        self.thread.start()
+
+    def submit(self, model_key, X, primary, primary_ms):
+        """Queue one served call for shadow scoring; never blocks"""
+        if model_key not in self.comparisons:
+            return
+        if self.sample_rate < 1.0 and self.rng.random() >= self.sample_rate:
+            return
+        try:
+            self.queue.put_nowait((model_key, X, primary, primary_ms))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return
+        with self.lock:
+            self.enqueued += 1
+
+    def _run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), SHADOW_NICE)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            model_key, X, primary, primary_ms = self.queue.get()
+            try:
+                start = time.perf_counter()
+                candidate = self.candidate(model_key, X)
+                candidate_ms = (time.perf_counter() - start) * 1000
+                with self.lock:
+                    self.comparisons[model_key].update(np.asarray(primary), np.asarray(candidate),
+                                                       primary_ms, candidate_ms)
+            except Exception as e:
+                with self.lock:
+                    self.errors += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+            finally:
+                self.queue.task_done()
+
+    def drain(self):
+        """Wait until every queued item has been scored"""
+        self.queue.join()
+
+    def reset(self):
+        self.drain()
+        with self.lock:
+            for key, comparison in self.comparisons.items():
+                self.comparisons[key] = ModelComparison(comparison.classifier)
+            self.enqueued = self.dropped = self.errors = 0
+            self.last_error = None
+
+    def report(self):
+        with self.lock:
+            return dict(self.info, **{
+                'sample_rate': self.sample_rate,
+                'queue': {
+                    'size': self.queue.qsize(),
+                    'max_size': self.queue.maxsize,
+                    'enqueued': self.enqueued,
+                    'dropped': self.dropped,
+                    'errors': self.errors,
+                    'last_error': self.last_error
+                },
+                'models': {key: c.report() for key, c in self.comparisons.items()}
+            })
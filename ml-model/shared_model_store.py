@@ -0,0 +1,260 @@
+"""
+Shared-Memory Model Store for the Sanity Orb ML API
+Compiles boosters into flat read-only tree arrays in one memory-mapped file
+
+Each xgb.Booster keeps its trees in private heap memory, so N worker
+processes hold N copies. This store writes every tree as flat numpy arrays
+into a single file (by default on /dev/shm). Workers map it read-only, so
+the page cache holds one copy no matter how many workers attach.
+SharedForest evaluates the arrays with vectorized numpy traversal and
+implements the subset of the Booster API that ml_api.py uses.
+
+Layout: magic (8 bytes) | header length (u64) | header JSON | padding
+| arrays (64-byte aligned, offsets in the header)
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+STORE_MAGIC = b'SANITYMS'
+ALIGNMENT = 64
+DEFAULT_STORE_PATH = '/dev/shm/sanity_orb_models.store' if os.path.isdir('/dev/shm') else \
+    os.path.join(tempfile.gettempdir(), 'sanity_orb_models.store')
+
+_PREAMBLE = struct.Struct('<8sQ')
+
+# Per-node arrays stored for every model, all shaped (n_trees * max_nodes,)
+NODE_ARRAYS = {
+    'left': np.int32,
+    'right': np.int32,
+    'feature': np.int32,
+    'threshold': np.float32,
+    'default_left': np.bool_,
+    'value': np.float32
+}
+
+def _pad(size):
+    return (-size) % ALIGNMENT
+
+def compile_forest(booster):
+    """
+    Flatten a booster's trees into padded node arrays
+
+    Leaves point to themselves so a fixed number of traversal steps
+    (the maximum depth) lands every row on a leaf without masking.
+    """
+    model = json.loads(booster.save_raw('json'))
+    learner = model['learner']
+    trees = learner['gradient_booster']['model']['trees']
+    tree_info = learner['gradient_booster']['model']['tree_info']
+    n_trees = len(trees)
+    max_nodes = max(len(t['left_children']) for t in trees)
+
+    arrays = {name: np.zeros(n_trees * max_nodes, dtype=dtype) for name, dtype in NODE_ARRAYS.items()}
+    max_depth = 0
+    for t, tree in enumerate(trees):
+        base = t * max_nodes
+        left = np.asarray(tree['left_children'], dtype=np.int64)
+        right = np.asarray(tree['right_children'], dtype=np.int64)
+        n = len(left)
+        is_leaf = left == -1
+        own = np.arange(n)
+        arrays['left'][base:base + n] = np.where(is_leaf, own, left) + base
+        arrays['right'][base:base + n] = np.where(is_leaf, own, right) + base
+        arrays['feature'][base:base + n] = np.where(is_leaf, 0, tree['split_indices'])
+        arrays['threshold'][base:base + n] = tree['split_conditions']
+        arrays['default_left'][base:base + n] = np.asarray(tree['default_left'], dtype=bool)
+        arrays['value'][base:base + n] = np.where(is_leaf, tree['split_conditions'], 0.0)
+
+        depth = np.zeros(n, dtype=np.int64)
+        for node in range(n):
+            if not is_leaf[node]:
+                depth[left[node]] = depth[node] + 1
+                depth[right[node]] = depth[node] + 1
+        max_depth = max(max_depth, int(depth.max()))
+
+    arrays['roots'] = (np.arange(n_trees) * max_nodes).astype(np.int32)
+    arrays['tree_group'] = np.asarray(tree_info, dtype=np.int32)
+    params = learner['learner_model_param']
+    meta = {
+        'n_trees': n_trees,
+        'max_nodes': max_nodes,
+        'max_depth': max_depth,
+        'num_class': int(params.get('num_class', '0')),
+        'base_score': float(params['base_score']),
+        'objective': learner['objective']['name'],
+        'feature_names': list(booster.feature_names or [])
+    }
+    return meta, arrays
+
+def build_store(path, boosters, extra=None):
+    """
+    Compile boosters into a store file, replacing any existing one atomically
+
+    extra: JSON-serializable data carried in the header (schemas, metadata,
+    source fingerprint) so workers can attach without loading anything else.
+    """
+    header = {'models': {}, 'extra': extra or {}}
+    blobs = []
+    offset = 0
+    for key, booster in boosters.items():
+        meta, arrays = compile_forest(booster)
+        meta['arrays'] = {}
+        for name, array in arrays.items():
+            data = array.tobytes()
+            meta['arrays'][name] = {'offset': offset, 'dtype': array.dtype.str, 'size': array.size}
+            blobs.append(data + b'\0' * _pad(len(data)))
+            offset += len(data) + _pad(len(data))
+        header['models'][key] = meta
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _PREAMBLE.size + len(header_bytes)
+    data_start += _pad(data_start)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.store_')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_PREAMBLE.pack(STORE_MAGIC, len(header_bytes)))
+            f.write(header_bytes)
+            f.write(b'\0' * (data_start - _PREAMBLE.size - len(header_bytes)))
+            for blob in blobs:
+                f.write(blob)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return header
+
+@contextlib.contextmanager
+def build_lock(path):
+    """
+    Exclusive lock on path + '.lock' for building the store
+
+    Workers that find the store missing or stale take it before building,
+    so one of them builds while the others wait, re-check and attach.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def read_store_header(path):
+    """Header of a store file without mapping its arrays"""
+    with open(path, 'rb') as f:
+        magic, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != STORE_MAGIC:
+            raise ValueError(f"{path} is not a Sanity Orb model store")
+        return json.loads(f.read(header_len))
+
+class SharedForest:
+    """Read-only tree ensemble backed by arrays in a shared mapping"""
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.feature_names = meta['feature_names']
+        self.num_class = meta['num_class']
+        self.base_score = np.float32(meta['base_score'])
+        self.max_depth = meta['max_depth']
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.n_groups = max(self.num_class, 1)
+
+    def _leaves(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size))
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+    def predict_margin(self, X):
+        leaves = self._leaves(X)
+        if self.n_groups == 1:
+            return leaves.sum(axis=1, dtype=np.float32) + self.base_score
+        margin = np.full((leaves.shape[0], self.n_groups), self.base_score, dtype=np.float32)
+        for group in range(self.n_groups):
+            margin[:, group] += leaves[:, self.tree_group == group].sum(axis=1, dtype=np.float32)
+        return margin
+
+    def inplace_predict(self, X, predict_type='value'):
+        """Same contract as xgb.Booster.inplace_predict for the objectives we serve"""
+        margin = self.predict_margin(X)
+        if predict_type == 'margin' or self.meta['objective'] == 'reg:squarederror':
+            return margin
+        if self.meta['objective'] == 'multi:softmax':
+            return margin.argmax(axis=1).astype(np.float32)
+        raise ValueError(f"Unsupported objective {self.meta['objective']}")
+
+    def set_param(self, params):
+        """Booster compatibility; numpy evaluation has no thread settings"""
+
+class SharedModelStore:
+    """
+    Read-only attachment to a store file
+
+    The mapping stays open for the life of the process; every array handed
+    out is a view into it, so attaching costs almost no private memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != STORE_MAGIC:
+            raise ValueError(f"{path} is not a Sanity Orb model store")
+        self.header = json.loads(self._mm[_PREAMBLE.size:_PREAMBLE.size + header_len])
+        data_start = _PREAMBLE.size + header_len
+        data_start += _pad(data_start)
+
+        self.forests = {}
+        for key, meta in self.header['models'].items():
+            arrays = {
+                name: np.frombuffer(self._mm, dtype=np.dtype(spec['dtype']),
+                                    count=spec['size'], offset=data_start + spec['offset'])
+                for name, spec in meta['arrays'].items()
+            }
+            self.forests[key] = SharedForest(meta, arrays)
+
+    @property
+    def extra(self):
+        return self.header['extra']
+
+def process_memory():
+    """Resident memory of this process in MB, split into private and shared pages"""
+    memory = {'pid': os.getpid()}
+    try:
+        with open('/proc/self/status', 'r') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        kb = {k: int(fields[k].split()[0]) for k in ('VmRSS', 'RssAnon', 'RssFile', 'RssShmem') if k in fields}
+        memory['rss_mb'] = round(kb.get('VmRSS', 0) / 1024, 1)
+        memory['private_mb'] = round(kb.get('RssAnon', 0) / 1024, 1)
+        memory['shared_mb'] = round((kb.get('RssFile', 0) + kb.get('RssShmem', 0)) / 1024, 1)
+    except (OSError, ValueError):
+        try:
+            import resource
+            memory['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        except ImportError:
+            pass
+    return memory
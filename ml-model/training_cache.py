@@ -0,0 +1,176 @@
+"""
+Training Matrix Cache for Sanity Orb Models
+Parsed and split training/evaluation matrices persisted on disk, so
+repeat trainings and tuning runs on the same dataset skip CSV parsing
+
+Entries are keyed by the data file's SHA-256, the feature and label
+columns, and the split parameters (test size, seed, stratification).
+Each entry is one uncompressed .npz of per-column arrays (original dtypes
+and row order) plus a JSON manifest with the build time, hit count and
+total time saved. xgboost cannot serialize a QuantileDMatrix, so the
+histogram binning itself still runs at fit time; the binning parameters
+do not change what is stored and are not part of the key.
+"""
+
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+DEFAULT_CACHE_DIR = 'ml-model/.matrix_cache'
+
+# Bumped when the stored layout changes, invalidating older entries
+CACHE_VERSION = 1
+
+SPLITS = ('train', 'test')
+
+def file_sha256(path):
+    """Hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_key(data_sha256, features, labels, split):
+    """Stable key for one dataset, column selection and split"""
+    payload = json.dumps({
+        'version': CACHE_VERSION,
+        'data': data_sha256,
+        'features': list(features),
+        'labels': list(labels),
+        'split': split
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+def split_frame(df, features, labels, test_size=0.2, random_state=42, stratify=None):
+    """
+    train_test_split of the feature frame and every label column at once
+
+    Returns {'train': (X, {label: y}), 'test': (X, {label: y})}, the same
+    rows in the same order as splitting X and the labels directly.
+    """
+    arrays = train_test_split(
+        df[list(features)], *(df[label] for label in labels),
+        test_size=test_size, random_state=random_state,
+        stratify=df[stratify] if stratify else None
+    )
+    X_train, X_test = arrays[0], arrays[1]
+    y_train = dict(zip(labels, arrays[2::2]))
+    y_test = dict(zip(labels, arrays[3::2]))
+    return {'train': (X_train, y_train), 'test': (X_test, y_test)}
+
+class TrainingMatrixCache:
+    """On-disk cache of split_frame results"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, verbose=True):
+        self.cache_dir = cache_dir
+        self.verbose = verbose
+        self.hits = 0
+        self.misses = 0
+        self.saved_s = 0.0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.npz', base + '.json'
+
+    def split(self, data_path, features, labels, test_size=0.2, random_state=42, stratify=None):
+        """
+        Cached split_frame of a CSV
+
+        Returns (splits, info) where info records whether the entry was a
+        hit, its key, the original build time and the time saved.
+        """
+        start = time.perf_counter()
+        data_sha256 = file_sha256(data_path)
+        split = {'test_size': test_size, 'random_state': random_state, 'stratify': stratify}
+        key = cache_key(data_sha256, features, labels, split)
+        arrays_path, manifest_path = self._paths(key)
+
+        manifest = None
+        if os.path.exists(arrays_path) and os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+
+        if manifest is not None:
+            splits = self._load(arrays_path, features, labels)
+            load_s = time.perf_counter() - start
+            saved_s = max(manifest['build_s'] - load_s, 0.0)
+            manifest['hits'] += 1
+            manifest['saved_s'] += saved_s
+            manifest['last_hit'] = datetime.now().isoformat()
+            self._write_manifest(manifest_path, manifest)
+            self.hits += 1
+            self.saved_s += saved_s
+            info = {'hit': True, 'key': key, 'build_s': manifest['build_s'],
+                    'load_s': load_s, 'saved_s': saved_s}
+            if self.verbose:
+                print(f"✓ Matrix cache hit {key}: loaded in {load_s:.3f}s "
+                      f"(built in {manifest['build_s']:.3f}s, saved {saved_s:.3f}s)")
+            return splits, info
+
+        usecols = list(dict.fromkeys(list(features) + list(labels)))
+        df = pd.read_csv(data_path, usecols=usecols)
+        splits = split_frame(df, features, labels, test_size, random_state, stratify)
+        build_s = time.perf_counter() - start
+        self._save(arrays_path, splits)
+        self._write_manifest(manifest_path, {
+            'key': key,
+            'version': CACHE_VERSION,
+            'data_file': os.path.abspath(data_path),
+            'data_sha256': data_sha256,
+            'features': list(features),
+            'labels': list(labels),
+            'split': split,
+            'rows': {name: len(splits[name][0]) for name in SPLITS},
+            'build_s': build_s,
+            'created': datetime.now().isoformat(),
+            'hits': 0,
+            'saved_s': 0.0
+        })
+        self.misses += 1
+        info = {'hit': False, 'key': key, 'build_s': build_s, 'load_s': None, 'saved_s': 0.0}
+        if self.verbose:
+            print(f"- Matrix cache miss {key}: built in {build_s:.3f}s, saved to {self.cache_dir}")
+        return splits, info
+
+    def _save(self, arrays_path, splits):
+        arrays = {}
+        for name in SPLITS:
+            X, ys = splits[name]
+            arrays[f'{name}/index'] = X.index.to_numpy()
+            for column in X.columns:
+                arrays[f'{name}/X/{column}'] = X[column].to_numpy()
+            for label, y in ys.items():
+                arrays[f'{name}/y/{label}'] = y.to_numpy()
+        # Write-then-rename so a concurrent reader never sees a partial file
+        tmp_path = f'{arrays_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, arrays_path)
+
+    def _load(self, arrays_path, features, labels):
+        splits = {}
+        with np.load(arrays_path, allow_pickle=False) as arrays:
+            for name in SPLITS:
+                index = arrays[f'{name}/index']
+                X = pd.DataFrame({column: arrays[f'{name}/X/{column}'] for column in features}, index=index)
+                ys = {label: pd.Series(arrays[f'{name}/y/{label}'], index=index, name=label)
+                      for label in labels}
+                splits[name] = (X, ys)
+        return splits
+
+    def _write_manifest(self, manifest_path, manifest):
+        tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'saved_s': self.saved_s}
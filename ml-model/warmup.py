@@ -0,0 +1,109 @@
+"""
+Startup Warmup for the Sanity Orb ML API
+Synthetic requests for every route and model, plus the readiness state
+
+The first predictions in a fresh process pay one-time costs (OpenMP thread
+pool creation, first allocations in xgboost, Flask/JSON code paths). Running
+synthetic traffic through every route and batch size before the worker is
+marked ready moves those costs out of real requests.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+# Batch sizes pushed through every model directly, beyond the routes' single rows
+WARMUP_BATCH_SIZES = (1, 64)
+
+# Marks synthetic warmup requests so request capture skips them
+WARMUP_HEADER = 'X-Warmup'
+
+def session_payload(rng):
+    return {
+        'hour': int(rng.integers(0, 24)),
+        'day_of_week': int(rng.integers(0, 7)),
+        'session_duration': float(rng.exponential(15) + 1),
+        'interactions': int(rng.poisson(10)),
+        'prev_sanity_1': float(rng.uniform(0, 100)),
+        'prev_sanity_2': float(rng.uniform(0, 100)),
+        'prev_sanity_3': float(rng.uniform(0, 100)),
+        'stress_level': float(rng.uniform(0, 100)),
+        'mood_factor': float(rng.normal(0, 10))
+    }
+
+def history_payload(rng, length=10):
+    return [float(v) for v in np.clip(rng.uniform(20, 80) + np.cumsum(rng.normal(0, 3, length)), 0, 100)]
+
+def stats_payload(rng):
+    return {
+        'current_sanity': float(rng.uniform(0, 100)),
+        'session_count': int(rng.poisson(50)),
+        'avg_duration': float(rng.exponential(15) + 5),
+        'interaction_rate': float(rng.uniform(0, 2)),
+        'consistency': float(rng.uniform(0, 100))
+    }
+
+def route_requests(rng):
+    """(path, body) for one request to every predict route"""
+    session = session_payload(rng)
+    stats = stats_payload(rng)
+    history = history_payload(rng)
+    return [
+        ('/api/predict/session', session),
+        ('/api/predict/trend', {'history': history}),
+        ('/api/predict/classify', stats),
+        ('/api/predict/advanced', {
+            'current_sanity': stats['current_sanity'],
+            'history': history,
+            'session_data': {k: session[k] for k in (
+                'hour', 'day_of_week', 'session_duration', 'interactions', 'stress_level', 'mood_factor'
+            )},
+            'user_stats': {k: v for k, v in stats.items() if k != 'current_sanity'}
+        })
+    ]
+
+class Readiness:
+    """Whether warmup has finished, and how it went"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = False
+        self.state = 'not_started'
+        self.error = None
+        self.duration_s = None
+        self.requests = 0
+
+    def status(self):
+        with self.lock:
+            return {
+                'ready': self.ready,
+                'state': self.state,
+                'warmup_s': self.duration_s,
+                'warmup_requests': self.requests,
+                'error': self.error
+            }
+
+    def run(self, warm, background=False):
+        """Call warm() (returning the number of requests made) and mark ready when it succeeds"""
+        def target():
+            with self.lock:
+                self.ready, self.state, self.error = False, 'warming', None
+            start = time.perf_counter()
+            try:
+                requests = warm()
+            except Exception as e:
+                with self.lock:
+                    self.state, self.error = 'failed', f"{type(e).__name__}: {e}"
+                return
+            with self.lock:
+                self.ready, self.state = True, 'ready'
+                self.duration_s = round(time.perf_counter() - start, 3)
+                self.requests = requests
+
+        if not background:
+            target()
+            return None
+        thread = threading.Thread(target=target, name='warmup', daemon=True)
+        thread.start()
+        return thread
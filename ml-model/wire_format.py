@@ -0,0 +1,95 @@
+"""
+Binary Wire Format for the Sanity Orb ML API
+Little-endian float32 matrices with a 12-byte header, for bulk and
+service-to-service prediction traffic
+
+Layout (requests and responses):
+    magic b'SORB' | version (u8) | kind (u8) | columns (u16) | rows (u32)
+    | rows x columns float32, row-major
+
+Requests are sent with Content-Type WIRE_MEDIA_TYPE and carry one row per
+prediction: the JSON route's input fields in REQUEST_COLUMNS order, or for
+/api/predict/trend one history per row (all the same length, at least 5
+points). Derived features such as avg_prev_sanity are computed server-side,
+as for JSON.
+
+Responses use the same layout with the route's RESPONSE_COLUMNS; the
+column names are also sent in the X-Wire-Columns header. Values are on
+the JSON route's scales, unrounded: sanity values 0-100, and confidences
+and class probabilities in percent. The body decodes straight into a
+numpy array with no per-field parsing.
+"""
+
+import struct
+
+import numpy as np
+
+WIRE_MEDIA_TYPE = 'application/x-sanity-f32'
+WIRE_MAGIC = b'SORB'
+WIRE_VERSION = 1
+
+KIND_REQUEST = 0
+KIND_RESPONSE = 1
+
+_HEADER = struct.Struct('<4sBBHI')
+HEADER_SIZE = _HEADER.size
+
+# Largest block accepted in one request
+MAX_ROWS = 100000
+
+# Request columns per binary-capable route (trend takes histories instead)
+REQUEST_COLUMNS = {
+    'session': ('hour', 'day_of_week', 'session_duration', 'interactions',
+                'prev_sanity_1', 'prev_sanity_2', 'prev_sanity_3', 'stress_level', 'mood_factor'),
+    'classify': ('current_sanity', 'session_count', 'avg_duration', 'interaction_rate', 'consistency')
+}
+
+# Response columns per binary-capable route
+RESPONSE_COLUMNS = {
+    'session': ('prediction',),
+    'trend': ('next_value', 'confidence', 'slope', 'volatility'),
+    'classify': ('category_id', 'confidence', 'p_critical', 'p_unstable', 'p_stable', 'p_optimal')
+}
+
+class WireFormatError(ValueError):
+    pass
+
+def encode(matrix, kind=KIND_RESPONSE):
+    """2-D array -> header + float32 little-endian rows"""
+    matrix = np.ascontiguousarray(matrix, dtype='<f4')
+    if matrix.ndim != 2:
+        raise WireFormatError('wire blocks are 2-D')
+    rows, columns = matrix.shape
+    return _HEADER.pack(WIRE_MAGIC, WIRE_VERSION, kind, columns, rows) + matrix.tobytes()
+
+def decode(body, kind=KIND_REQUEST, columns=None, min_columns=1):
+    """Header + float32 rows -> (rows, columns) float32 array, validated against the header and finite"""
+    if len(body) < HEADER_SIZE:
+        raise WireFormatError('body shorter than the wire header')
+    magic, version, block_kind, n_columns, n_rows = _HEADER.unpack_from(body)
+    if magic != WIRE_MAGIC or version != WIRE_VERSION:
+        raise WireFormatError('not a version 1 Sanity Orb wire block')
+    if block_kind != kind:
+        raise WireFormatError(f'expected a block of kind {kind}, got {block_kind}')
+    if columns is not None and n_columns != columns:
+        raise WireFormatError(f'expected {columns} columns, got {n_columns}')
+    if n_columns < min_columns:
+        raise WireFormatError(f'expected at least {min_columns} columns, got {n_columns}')
+    if not 1 <= n_rows <= MAX_ROWS:
+        raise WireFormatError(f'rows must be between 1 and {MAX_ROWS}')
+    if len(body) != HEADER_SIZE + n_rows * n_columns * 4:
+        raise WireFormatError('body length does not match the header')
+    X = np.frombuffer(body, dtype='<f4', offset=HEADER_SIZE).reshape(n_rows, n_columns)
+    if not np.isfinite(X).all():
+        raise WireFormatError('block must contain only finite numbers')
+    return X.astype(np.float32, copy=False)
+
+def wants_binary(request):
+    """
+    Binary response unless the client asks for JSON
+
+    A binary request gets a binary response by default; Accept:
+    application/json switches the response back to JSON.
+    """
+    best = request.accept_mimetypes.best_match([WIRE_MEDIA_TYPE, 'application/json'], default=WIRE_MEDIA_TYPE)
+    return best == WIRE_MEDIA_TYPE
@@ -12,14 +12,327 @@ import joblib
 import json
 from datetime import datetime
 import os
+import shutil
+import time
+import tempfile
+
+from model_bundle import BUNDLE_FILE, booster_sha256, pack_bundle
+from lookup_table import LOOKUP_TABLE_FILE
+from drift import DRIFT_REFERENCE_FILE, MONITORED, reference_sketch
+from data_streaming import CSVChunkIterator, DEFAULT_CHUNK_SIZE, iter_csv_chunks, holdout_mask, training_holdout
+from training_cache import DEFAULT_CACHE_DIR, TrainingMatrixCache, file_sha256, split_frame
+from coreset import DEFAULT_CORESET_SIZE, build_coreset
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SESSION_FEATURES = [
+    'hour', 'day_of_week', 'session_duration', 'interactions',
+    'prev_sanity_1', 'prev_sanity_2', 'prev_sanity_3',
+    'avg_prev_sanity', 'stress_level', 'mood_factor'
+]
+
+TREND_FEATURES = [
+    'mean', 'std', 'min', 'max', 'range', 'slope',
+    'last_3_avg', 'first_3_avg', 'volatility'
+]
+
+CLASSIFIER_FEATURES = [
+    'current_sanity', 'session_count', 'avg_duration',
+    'interaction_rate', 'consistency'
+]
+
+CLASS_NAMES = ['Critical', 'Unstable', 'Stable', 'Optimal']
+
+# Hyperparameters in XGBoost sklearn-wrapper form
+MODEL_PARAMS = {
+    'session': {
+        'n_estimators': 200,
+        'max_depth': 8,
+        'learning_rate': 0.1,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'objective': 'reg:squarederror',
+        'random_state': 42,
+        'n_jobs': -1
+    },
+    'trend': {
+        'n_estimators': 150,
+        'max_depth': 6,
+        'learning_rate': 0.1,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'objective': 'reg:squarederror',
+        'random_state': 42,
+        'n_jobs': -1
+    },
+    'classifier': {
+        'n_estimators': 150,
+        'max_depth': 6,
+        'learning_rate': 0.1,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'objective': 'multi:softmax',
+        'num_class': 4,
+        'random_state': 42,
+        'n_jobs': -1
+    }
+}
+
+# Saved model files, keyed the same way as the API's models dict
+MODEL_SPECS = {
+    'session': {
+        'model_file': 'session_predictor.json',
+        'metadata_file': 'session_predictor_metadata.json',
+        'data_file': 'session_data.csv',
+        'features': SESSION_FEATURES,
+        'label': 'current_sanity',
+        'params': 'session'
+    },
+    'trend_value': {
+        'model_file': 'trend_value_predictor.json',
+        'metadata_file': 'trend_predictor_metadata.json',
+        'data_file': 'trend_data.csv',
+        'features': TREND_FEATURES,
+        'label': 'next_value',
+        'params': 'trend'
+    },
+    'trend_confidence': {
+        'model_file': 'trend_confidence_predictor.json',
+        'metadata_file': 'trend_predictor_metadata.json',
+        'data_file': 'trend_data.csv',
+        'features': TREND_FEATURES,
+        'label': 'confidence',
+        'params': 'trend'
+    },
+    'classifier': {
+        'model_file': 'sanity_classifier.json',
+        'metadata_file': 'sanity_classifier_metadata.json',
+        'data_file': 'classification_data.csv',
+        'features': CLASSIFIER_FEATURES,
+        'label': 'category',
+        'params': 'classifier'
+    }
+}
+
+# Written by hyperparameter_tuning.py
+TUNING_FILE = 'tuning_results.json'
+
+# continue: append new boosting rounds fitted on the new data only
+# refresh: keep tree structure, recompute leaf values from the new data
+INCREMENTAL_MODES = ('continue', 'refresh')
+
+# in_memory: pandas + train_test_split (original behaviour)
+# quantile: chunks streamed into a QuantileDMatrix, raw rows never held
+# external_memory: chunks streamed into an on-disk paged DMatrix
+# coreset: one streaming pass keeps a weighted stratified sample, fitted in memory
+TRAINING_MODES = ('in_memory', 'quantile', 'external_memory', 'coreset')
+
+def native_params(params):
+    """Convert sklearn-wrapper hyperparameters to xgb.train params and round count"""
+    params = dict(params)
+    num_boost_round = params.pop('n_estimators')
+    renames = {'learning_rate': 'eta', 'random_state': 'seed', 'n_jobs': 'nthread'}
+    native = {renames.get(k, k): v for k, v in params.items()}
+    native.setdefault('tree_method', 'hist')
+    return native, num_boost_round
+
+def load_tuned_params(models_dir='ml-model/trained_models'):
+    """Tuned hyperparameters keyed like MODEL_PARAMS, or {} if never tuned"""
+    path = os.path.join(models_dir, TUNING_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        results = json.load(f)
+    return {key: result['params'] for key, result in results['models'].items()}
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def accumulated_rmse_mae(acc):
+    """RMSE and MAE from streaming error sums"""
+    n = max(acc['n'], 1)
+    return np.sqrt(acc['sse'] / n), acc['sae'] / n
+
+def holdout_score(booster, X, y, is_classifier):
+    """Holdout metric used to gate incremental updates: accuracy or RMSE"""
+    pred = booster.inplace_predict(X)
+    if is_classifier:
+        return float(np.mean(pred == y))
+    return float(np.sqrt(np.mean((pred - y) ** 2)))
+
+def normalized_gain(booster, feature_columns):
+    """Gain importance normalized to sum to 1, matching feature_importances_"""
+    scores = booster.get_score(importance_type='gain')
+    total = sum(scores.values()) or 1.0
+    return {f: scores.get(f, 0.0) / total for f in feature_columns}
 
 class SanityXGBoostModels:
-    def __init__(self):
+    def __init__(self, models_dir='ml-model/trained_models', training_mode='in_memory',
+                 chunk_size=DEFAULT_CHUNK_SIZE, params=None, matrix_cache_dir=None,
+                 coreset_size=DEFAULT_CORESET_SIZE, compare_full=False):
+        if training_mode not in TRAINING_MODES:
+            raise ValueError(f"Unknown training mode: {training_mode}")
+        if matrix_cache_dir and training_mode != 'in_memory':
+            raise ValueError("The matrix cache only applies to in_memory training")
+        # Per-model overrides of MODEL_PARAMS, e.g. from load_tuned_params()
+        self.params = {key: dict(value, **(params or {}).get(key, {}))
+                       for key, value in MODEL_PARAMS.items()}
         self.session_model = None
         self.trend_model = None
         self.classification_model = None
-        self.models_dir = 'ml-model/trained_models'
+        self.models_dir = models_dir
+        self.training_mode = training_mode
+        self.chunk_size = chunk_size
+        # Parsed, split CSVs reused across runs (training_cache.py)
+        self.matrix_cache = TrainingMatrixCache(matrix_cache_dir) if matrix_cache_dir else None
+        # Coreset mode: sample size, and whether to also fit on the full split to report the gap
+        self.coreset_size = coreset_size
+        self.compare_full = compare_full
+        self.coreset_report = None
         os.makedirs(self.models_dir, exist_ok=True)
+
+    def _split(self, data_path, feature_columns, label_columns, stratify=None):
+        """
+        Load a CSV and split it 80/20 (random_state=42) for in-memory training
+
+        Returns (n_samples, (X_train, {label: y}), (X_test, {label: y}), cache_info);
+        cache_info is None without a matrix cache.
+        """
+        if self.matrix_cache is not None:
+            splits, cache_info = self.matrix_cache.split(
+                data_path, feature_columns, label_columns, stratify=stratify
+            )
+        else:
+            df = pd.read_csv(data_path)
+            splits = split_frame(df, feature_columns, label_columns, stratify=stratify)
+            cache_info = None
+        n_samples = len(splits['train'][0]) + len(splits['test'][0])
+        return n_samples, splits['train'], splits['test'], cache_info
+
+    def _streaming_matrix(self, data_path, feature_columns, label_column, cache_dir):
+        """Build the training matrix for the streaming modes"""
+        cache_prefix = None
+        if self.training_mode == 'external_memory':
+            cache_prefix = os.path.join(cache_dir, label_column)
+        data_iter = CSVChunkIterator(
+            data_path, feature_columns, label_column,
+            subset='train', chunk_size=self.chunk_size, cache_prefix=cache_prefix
+        )
+        if self.training_mode == 'external_memory':
+            return xgb.DMatrix(data_iter)
+        return xgb.QuantileDMatrix(data_iter)
+
+    def _fit_streaming(self, data_path, feature_columns, label_columns, params, use_coreset=True):
+        """
+        Train one booster per label column on the streamed training split
+
+        Returns the boosters in label order. In coreset mode the split is
+        sampled unless use_coreset is False, which streams it in full into
+        a QuantileDMatrix.
+        """
+        if self.training_mode == 'coreset' and use_coreset:
+            return self._fit_coreset(data_path, feature_columns, label_columns, params)
+        native, num_boost_round = native_params(params)
+        cache_dir = tempfile.mkdtemp(prefix='sanity_extmem_')
+        try:
+            boosters = []
+            for label_column in label_columns:
+                dtrain = self._streaming_matrix(data_path, feature_columns, label_column, cache_dir)
+                boosters.append(xgb.train(native, dtrain, num_boost_round=num_boost_round))
+                del dtrain
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        return boosters
+
+    def _fit_coreset(self, data_path, feature_columns, label_columns, params):
+        """
+        Train one booster per label column on a weighted stratified coreset
+
+        Stratified by the first label column. With compare_full, also trains
+        on the full streamed split and records the holdout gap and speedup
+        in self.coreset_report.
+        """
+        start = time.perf_counter()
+        X, ys, weights, info = build_coreset(
+            data_path, feature_columns, label_columns, self.coreset_size, chunk_size=self.chunk_size
+        )
+        build_s = time.perf_counter() - start
+        print(f"Coreset: {info['rows_kept']} of {info['rows_seen']} training rows, "
+              f"stratified by {info['stratified_by']} ({build_s:.2f}s)")
+        
+        native, num_boost_round = native_params(params)
+        start = time.perf_counter()
+        boosters = [
+            xgb.train(native, xgb.DMatrix(X, label=ys[label], weight=weights, feature_names=feature_columns),
+                      num_boost_round=num_boost_round)
+            for label in label_columns
+        ]
+        fit_s = time.perf_counter() - start
+        self.coreset_report = dict(info, size=self.coreset_size, build_s=build_s, fit_s=fit_s)
+        
+        if self.compare_full:
+            print("Training on the full split for comparison...")
+            start = time.perf_counter()
+            full = self._fit_streaming(data_path, feature_columns, label_columns, params, use_coreset=False)
+            full_s = time.perf_counter() - start
+            is_classifier = params.get('objective', '').startswith('multi:')
+            comparison = {}
+            for name, models in (('coreset', boosters), ('full', full)):
+                totals = self._evaluate_streaming(models, data_path, feature_columns, label_columns)
+                for label in label_columns:
+                    test = totals[label]['test']
+                    metric = test['correct'] / max(test['n'], 1) if is_classifier else accumulated_rmse_mae(test)[0]
+                    comparison.setdefault(label, {})[name] = float(metric)
+            metric_name = 'test_accuracy' if is_classifier else 'test_rmse'
+            for label, scores in comparison.items():
+                scores['metric'] = metric_name
+                scores['gap'] = scores['coreset'] - scores['full']
+                print(f"  {label}: {metric_name} coreset {scores['coreset']:.4f} vs full "
+                      f"{scores['full']:.4f} (gap {scores['gap']:+.4f})")
+            speedup = full_s / (build_s + fit_s)
+            print(f"  Coreset {build_s + fit_s:.2f}s vs full {full_s:.2f}s ({speedup:.1f}x faster)")
+            self.coreset_report.update(full_fit_s=full_s, speedup=speedup, comparison=comparison)
+        return boosters
+
+    def _evaluate_streaming(self, boosters, data_path, feature_columns, label_columns):
+        """
+        Single streaming pass over the file, accumulating per-split error sums
+
+        Returns {label: {'train': acc, 'test': acc}} where acc holds
+        squared error, absolute error, correct predictions and row count.
+        """
+        totals = {
+            label: {split: {'sse': 0.0, 'sae': 0.0, 'correct': 0, 'n': 0}
+                    for split in ('train', 'test')}
+            for label in label_columns
+        }
+        for start, chunk in iter_csv_chunks(
+            data_path, feature_columns + list(label_columns), self.chunk_size
+        ):
+            is_test = holdout_mask(start, len(chunk))
+            X = chunk[feature_columns].to_numpy(dtype=np.float32)
+            for booster, label in zip(boosters, label_columns):
+                pred = booster.inplace_predict(X)
+                y = chunk[label].to_numpy()
+                err = pred - y
+                for split, mask in (('train', ~is_test), ('test', is_test)):
+                    acc = totals[label][split]
+                    acc['sse'] += float(np.sum(err[mask] ** 2))
+                    acc['sae'] += float(np.sum(np.abs(err[mask])))
+                    acc['correct'] += int(np.sum(pred[mask] == y[mask]))
+                    acc['n'] += int(mask.sum())
+        return totals
+
+    def _save_metadata(self, filename, metadata):
+        """Write a metadata file next to the models"""
+        with open(os.path.join(self.models_dir, filename), 'w') as f:
+            json.dump(metadata, f, indent=2)
         
     def train_session_predictor(self, data_path='ml-model/data/session_data.csv'):
         """Train XGBoost model to predict next sanity level"""
@@ -27,55 +340,57 @@ class SanityXGBoostModels:
         print("Training Session Prediction Model (XGBoost Regressor)")
         print("="*60)
         
-        # Load data
-        df = pd.read_csv(data_path)
-        print(f"Loaded {len(df)} training samples")
-        
-        # Prepare features and target
-        feature_columns = [
-            'hour', 'day_of_week', 'session_duration', 'interactions',
-            'prev_sanity_1', 'prev_sanity_2', 'prev_sanity_3', 
-            'avg_prev_sanity', 'stress_level', 'mood_factor'
-        ]
-        
-        X = df[feature_columns]
-        y = df['current_sanity']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-        
-        print(f"Training set: {len(X_train)} samples")
-        print(f"Test set: {len(X_test)} samples")
-        
-        # Train XGBoost model
-        print("\nTraining XGBoost model...")
-        self.session_model = xgb.XGBRegressor(
-            n_estimators=200,
-            max_depth=8,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            objective='reg:squarederror',
-            random_state=42,
-            n_jobs=-1
-        )
-        
-        self.session_model.fit(
-            X_train, y_train,
-            eval_set=[(X_test, y_test)],
-            verbose=False
-        )
-        
-        # Evaluate
-        train_pred = self.session_model.predict(X_train)
-        test_pred = self.session_model.predict(X_test)
+        feature_columns = SESSION_FEATURES
+        cache_info = None
         
-        train_rmse = np.sqrt(mean_squared_error(y_train, train_pred))
-        test_rmse = np.sqrt(mean_squared_error(y_test, test_pred))
-        train_mae = mean_absolute_error(y_train, train_pred)
-        test_mae = mean_absolute_error(y_test, test_pred)
+        if self.training_mode != 'in_memory':
+            print(f"Streaming {data_path} ({self.training_mode}, {self.chunk_size} rows per chunk)")
+            print("\nTraining XGBoost model...")
+            booster, = self._fit_streaming(
+                data_path, feature_columns, ['current_sanity'], self.params['session']
+            )
+            self.session_model = booster
+            
+            # Evaluate
+            totals = self._evaluate_streaming(
+                [booster], data_path, feature_columns, ['current_sanity']
+            )['current_sanity']
+            n_samples = totals['train']['n'] + totals['test']['n']
+            print(f"Training set: {totals['train']['n']} samples")
+            print(f"Test set: {totals['test']['n']} samples")
+            train_rmse, train_mae = accumulated_rmse_mae(totals['train'])
+            test_rmse, test_mae = accumulated_rmse_mae(totals['test'])
+            feature_importance = normalized_gain(booster, feature_columns)
+        else:
+            # Load and split data
+            n_samples, (X_train, y_train), (X_test, y_test), cache_info = self._split(
+                data_path, feature_columns, ['current_sanity']
+            )
+            y_train, y_test = y_train['current_sanity'], y_test['current_sanity']
+            print(f"Loaded {n_samples} training samples")
+            
+            print(f"Training set: {len(X_train)} samples")
+            print(f"Test set: {len(X_test)} samples")
+            
+            # Train XGBoost model
+            print("\nTraining XGBoost model...")
+            self.session_model = xgb.XGBRegressor(**self.params['session'])
+            
+            self.session_model.fit(
+                X_train, y_train,
+                eval_set=[(X_test, y_test)],
+                verbose=False
+            )
+            
+            # Evaluate
+            train_pred = self.session_model.predict(X_train)
+            test_pred = self.session_model.predict(X_test)
+            
+            train_rmse = np.sqrt(mean_squared_error(y_train, train_pred))
+            test_rmse = np.sqrt(mean_squared_error(y_test, test_pred))
+            train_mae = mean_absolute_error(y_train, train_pred)
+            test_mae = mean_absolute_error(y_test, test_pred)
+            feature_importance = dict(zip(feature_columns, self.session_model.feature_importances_))
         
         print(f"\n✓ Model trained successfully!")
         print(f"  Train RMSE: {train_rmse:.2f}")
@@ -84,7 +399,6 @@ class SanityXGBoostModels:
         print(f"  Test MAE: {test_mae:.2f}")
         
         # Feature importance
-        feature_importance = dict(zip(feature_columns, self.session_model.feature_importances_))
         sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)
         
         print(f"\nTop 5 Most Important Features:")
@@ -101,7 +415,9 @@ class SanityXGBoostModels:
             'model_type': 'XGBoost Regressor',
             'task': 'Session Sanity Prediction',
             'trained_date': datetime.now().isoformat(),
-            'n_samples': len(df),
+            'n_samples': n_samples,
+            'training_mode': self.training_mode,
+            'peak_rss_mb': peak_rss_mb(),
             'features': feature_columns,
             'metrics': {
                 'train_rmse': float(train_rmse),
@@ -111,9 +427,12 @@ class SanityXGBoostModels:
             },
             'feature_importance': {k: float(v) for k, v in sorted_features}
         }
+        if cache_info:
+            metadata['matrix_cache'] = cache_info
+        if self.training_mode == 'coreset':
+            metadata['coreset'] = self.coreset_report
         
-        with open(os.path.join(self.models_dir, 'session_predictor_metadata.json'), 'w') as f:
-            json.dump(metadata, f, indent=2)
+        self._save_metadata('session_predictor_metadata.json', metadata)
         
         return metadata
     
@@ -123,55 +442,31 @@ class SanityXGBoostModels:
         print("Training Trend Prediction Model (XGBoost Regressor)")
         print("="*60)
         
-        # Load data
-        df = pd.read_csv(data_path)
-        print(f"Loaded {len(df)} training samples")
-        
-        # Prepare features and targets
-        feature_columns = [
-            'mean', 'std', 'min', 'max', 'range', 'slope',
-            'last_3_avg', 'first_3_avg', 'volatility'
-        ]
+        feature_columns = TREND_FEATURES
         
-        X = df[feature_columns]
-        y_value = df['next_value']
-        y_confidence = df['confidence']
+        if self.training_mode != 'in_memory':
+            return self._train_trend_streaming(data_path)
         
-        # Split data
-        X_train, X_test, y_train_val, y_test_val, y_train_conf, y_test_conf = train_test_split(
-            X, y_value, y_confidence, test_size=0.2, random_state=42
+        # Load and split data
+        n_samples, (X_train, y_train), (X_test, y_test), cache_info = self._split(
+            data_path, feature_columns, ['next_value', 'confidence']
         )
+        y_train_val, y_test_val = y_train['next_value'], y_test['next_value']
+        y_train_conf, y_test_conf = y_train['confidence'], y_test['confidence']
+        print(f"Loaded {n_samples} training samples")
         
         print(f"Training set: {len(X_train)} samples")
         print(f"Test set: {len(X_test)} samples")
         
         # Train next value predictor
         print("\nTraining next value predictor...")
-        value_model = xgb.XGBRegressor(
-            n_estimators=150,
-            max_depth=6,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            objective='reg:squarederror',
-            random_state=42,
-            n_jobs=-1
-        )
+        value_model = xgb.XGBRegressor(**self.params['trend'])
         
         value_model.fit(X_train, y_train_val, verbose=False)
         
         # Train confidence predictor
         print("Training confidence predictor...")
-        confidence_model = xgb.XGBRegressor(
-            n_estimators=150,
-            max_depth=6,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            objective='reg:squarederror',
-            random_state=42,
-            n_jobs=-1
-        )
+        confidence_model = xgb.XGBRegressor(**self.params['trend'])
         
         confidence_model.fit(X_train, y_train_conf, verbose=False)
         
@@ -192,9 +487,41 @@ class SanityXGBoostModels:
         print(f"  Next Value RMSE: {value_rmse:.2f}")
         print(f"  Confidence RMSE: {conf_rmse:.2f}")
         
-        # Save models
-        value_model.save_model(os.path.join(self.models_dir, 'trend_value_predictor.json'))
-        confidence_model.save_model(os.path.join(self.models_dir, 'trend_confidence_predictor.json'))
+        return self._save_trend_models(n_samples, value_rmse, conf_rmse, cache_info)
+    
+    def _train_trend_streaming(self, data_path):
+        """Streaming counterpart of train_trend_predictor"""
+        print(f"Streaming {data_path} ({self.training_mode}, {self.chunk_size} rows per chunk)")
+        print("\nTraining next value and confidence predictors...")
+        labels = ['next_value', 'confidence']
+        value_model, confidence_model = self._fit_streaming(
+            data_path, TREND_FEATURES, labels, self.params['trend']
+        )
+        self.trend_model = {
+            'value': value_model,
+            'confidence': confidence_model
+        }
+        
+        # Evaluate
+        totals = self._evaluate_streaming(
+            [value_model, confidence_model], data_path, TREND_FEATURES, labels
+        )
+        n_samples = totals['next_value']['train']['n'] + totals['next_value']['test']['n']
+        print(f"Training set: {totals['next_value']['train']['n']} samples")
+        print(f"Test set: {totals['next_value']['test']['n']} samples")
+        value_rmse, _ = accumulated_rmse_mae(totals['next_value']['test'])
+        conf_rmse, _ = accumulated_rmse_mae(totals['confidence']['test'])
+        
+        print(f"\n✓ Models trained successfully!")
+        print(f"  Next Value RMSE: {value_rmse:.2f}")
+        print(f"  Confidence RMSE: {conf_rmse:.2f}")
+        
+        return self._save_trend_models(n_samples, value_rmse, conf_rmse)
+    
+    def _save_trend_models(self, n_samples, value_rmse, conf_rmse, cache_info=None):
+        """Save both trend models and their shared metadata"""
+        self.trend_model['value'].save_model(os.path.join(self.models_dir, 'trend_value_predictor.json'))
+        self.trend_model['confidence'].save_model(os.path.join(self.models_dir, 'trend_confidence_predictor.json'))
         print(f"\n✓ Models saved to {self.models_dir}")
         
         # Save metadata
@@ -202,16 +529,21 @@ class SanityXGBoostModels:
             'model_type': 'XGBoost Regressor (Dual)',
             'task': 'Trend Prediction',
             'trained_date': datetime.now().isoformat(),
-            'n_samples': len(df),
-            'features': feature_columns,
+            'n_samples': n_samples,
+            'training_mode': self.training_mode,
+            'peak_rss_mb': peak_rss_mb(),
+            'features': TREND_FEATURES,
             'metrics': {
                 'value_rmse': float(value_rmse),
                 'confidence_rmse': float(conf_rmse)
             }
         }
+        if cache_info:
+            metadata['matrix_cache'] = cache_info
+        if self.training_mode == 'coreset':
+            metadata['coreset'] = self.coreset_report
         
-        with open(os.path.join(self.models_dir, 'trend_predictor_metadata.json'), 'w') as f:
-            json.dump(metadata, f, indent=2)
+        self._save_metadata('trend_predictor_metadata.json', metadata)
         
         return metadata
     
@@ -221,57 +553,61 @@ class SanityXGBoostModels:
         print("Training Classification Model (XGBoost Classifier)")
         print("="*60)
         
-        # Load data
-        df = pd.read_csv(data_path)
-        print(f"Loaded {len(df)} training samples")
-        
-        # Prepare features and target
-        feature_columns = [
-            'current_sanity', 'session_count', 'avg_duration',
-            'interaction_rate', 'consistency'
-        ]
-        
-        X = df[feature_columns]
-        y = df['category']
+        feature_columns = CLASSIFIER_FEATURES
+        class_names = CLASS_NAMES
+        cache_info = None
         
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
-        
-        print(f"Training set: {len(X_train)} samples")
-        print(f"Test set: {len(X_test)} samples")
-        
-        # Train XGBoost classifier
-        print("\nTraining XGBoost classifier...")
-        self.classification_model = xgb.XGBClassifier(
-            n_estimators=150,
-            max_depth=6,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            objective='multi:softmax',
-            num_class=4,
-            random_state=42,
-            n_jobs=-1
-        )
-        
-        self.classification_model.fit(X_train, y_train, verbose=False)
-        
-        # Evaluate
-        train_pred = self.classification_model.predict(X_train)
-        test_pred = self.classification_model.predict(X_test)
-        
-        train_acc = accuracy_score(y_train, train_pred)
-        test_acc = accuracy_score(y_test, test_pred)
-        
-        print(f"\n✓ Model trained successfully!")
-        print(f"  Train Accuracy: {train_acc*100:.2f}%")
-        print(f"  Test Accuracy: {test_acc*100:.2f}%")
-        
-        print(f"\nClassification Report:")
-        class_names = ['Critical', 'Unstable', 'Stable', 'Optimal']
-        print(classification_report(y_test, test_pred, target_names=class_names))
+        if self.training_mode != 'in_memory':
+            print(f"Streaming {data_path} ({self.training_mode}, {self.chunk_size} rows per chunk)")
+            print("\nTraining XGBoost classifier...")
+            booster, = self._fit_streaming(
+                data_path, feature_columns, ['category'], self.params['classifier']
+            )
+            self.classification_model = booster
+            
+            # Evaluate
+            totals = self._evaluate_streaming(
+                [booster], data_path, feature_columns, ['category']
+            )['category']
+            n_samples = totals['train']['n'] + totals['test']['n']
+            print(f"Training set: {totals['train']['n']} samples")
+            print(f"Test set: {totals['test']['n']} samples")
+            train_acc = totals['train']['correct'] / max(totals['train']['n'], 1)
+            test_acc = totals['test']['correct'] / max(totals['test']['n'], 1)
+            
+            print(f"\n✓ Model trained successfully!")
+            print(f"  Train Accuracy: {train_acc*100:.2f}%")
+            print(f"  Test Accuracy: {test_acc*100:.2f}%")
+        else:
+            # Load and split data
+            n_samples, (X_train, y_train), (X_test, y_test), cache_info = self._split(
+                data_path, feature_columns, ['category'], stratify='category'
+            )
+            y_train, y_test = y_train['category'], y_test['category']
+            print(f"Loaded {n_samples} training samples")
+            
+            print(f"Training set: {len(X_train)} samples")
+            print(f"Test set: {len(X_test)} samples")
+            
+            # Train XGBoost classifier
+            print("\nTraining XGBoost classifier...")
+            self.classification_model = xgb.XGBClassifier(**self.params['classifier'])
+            
+            self.classification_model.fit(X_train, y_train, verbose=False)
+            
+            # Evaluate
+            train_pred = self.classification_model.predict(X_train)
+            test_pred = self.classification_model.predict(X_test)
+            
+            train_acc = accuracy_score(y_train, train_pred)
+            test_acc = accuracy_score(y_test, test_pred)
+            
+            print(f"\n✓ Model trained successfully!")
+            print(f"  Train Accuracy: {train_acc*100:.2f}%")
+            print(f"  Test Accuracy: {test_acc*100:.2f}%")
+            
+            print(f"\nClassification Report:")
+            print(classification_report(y_test, test_pred, target_names=class_names))
         
         # Save model
         model_path = os.path.join(self.models_dir, 'sanity_classifier.json')
@@ -283,7 +619,9 @@ class SanityXGBoostModels:
             'model_type': 'XGBoost Classifier',
             'task': 'Sanity Level Classification',
             'trained_date': datetime.now().isoformat(),
-            'n_samples': len(df),
+            'n_samples': n_samples,
+            'training_mode': self.training_mode,
+            'peak_rss_mb': peak_rss_mb(),
             'features': feature_columns,
             'classes': class_names,
             'metrics': {
@@ -291,11 +629,270 @@ class SanityXGBoostModels:
                 'test_accuracy': float(test_acc)
             }
         }
+        if cache_info:
+            metadata['matrix_cache'] = cache_info
+        if self.training_mode == 'coreset':
+            metadata['coreset'] = self.coreset_report
         
-        with open(os.path.join(self.models_dir, 'sanity_classifier_metadata.json'), 'w') as f:
-            json.dump(metadata, f, indent=2)
-        
+        self._save_metadata('sanity_classifier_metadata.json', metadata)
+
         return metadata
+
+    def distill_classifier(self, data_path='ml-model/data/classification_data.csv',
+                           min_agreement=0.99, samples_per_bin=256):
+        """
+        Compile the saved classifier into a lookup table over its dominant feature
+
+        Bin edges are the classifier's own split thresholds on that feature,
+        so inside a bin the ensemble's output depends only on the other
+        features. Each bin is evaluated once per sampled row of those other
+        features; its table entry is the mean probability vector and its
+        agreement the share of samples whose ensemble category matches the
+        table's. Bins below min_agreement are served by the full ensemble.
+        The table is validated on the holdout split of the classifier's
+        training mode and keyed to the classifier by booster_sha256.
+        """
+        print("\n" + "="*60)
+        print("Distilling Classifier into Lookup Table")
+        print("="*60)
+
+        feature_columns = CLASSIFIER_FEATURES
+        model_path = os.path.join(self.models_dir, 'sanity_classifier.json')
+        booster = xgb.Booster(model_file=model_path)
+        gain = normalized_gain(booster, feature_columns)
+        feature = max(gain, key=gain.get)
+        feature_index = feature_columns.index(feature)
+        print(f"Dominant feature: {feature} ({gain[feature]*100:.1f}% of gain)")
+
+        trees = booster.trees_to_dataframe()
+        edges = np.unique(trees.loc[trees['Feature'] == feature, 'Split'].to_numpy(dtype=np.float32))
+        # Region i holds edges[i-1] <= x < edges[i], matching xgboost's "x < split goes left"
+        representatives = np.concatenate([[np.nextafter(edges[0], np.float32(-np.inf))], edges])
+        print(f"Bins from split thresholds: {len(representatives)}")
+
+        with open(os.path.join(self.models_dir, 'sanity_classifier_metadata.json'), 'r') as f:
+            training_mode = json.load(f).get('training_mode', 'in_memory')
+        df = pd.read_csv(data_path)
+        X = df[feature_columns].to_numpy(dtype=np.float32)
+        y = df['category'].to_numpy()
+        # Validate on the rows the classifier's own training held out
+        is_test = training_holdout(data_path, training_mode, stratify='category')(0, len(df))
+        X_fit, X_val, y_val = X[~is_test], X[is_test], y[is_test]
+
+        rng = np.random.default_rng(42)
+        others = X_fit[rng.choice(len(X_fit), size=min(samples_per_bin, len(X_fit)), replace=False)]
+        grid = np.repeat(others[None, :, :], len(representatives), axis=0)
+        grid[:, :, feature_index] = representatives[:, None]
+        proba = booster.predict(xgb.DMatrix(grid.reshape(-1, len(feature_columns)),
+                                            feature_names=feature_columns), output_margin=True)
+        proba = np.exp(proba - proba.max(axis=1, keepdims=True))
+        proba = (proba / proba.sum(axis=1, keepdims=True)).reshape(len(representatives), len(others), -1)
+        table = proba.mean(axis=1)
+        agreement = (proba.argmax(axis=2) == table.argmax(axis=1)[:, None]).mean(axis=1)
+        served = agreement >= min_agreement
+
+        # Validate on the classifier's held-out split
+        bins = np.searchsorted(edges, X_val[:, feature_index], side='right')
+        ensemble = booster.predict(xgb.DMatrix(X_val, feature_names=feature_columns)).astype(int)
+        lut = table[bins].argmax(axis=1)
+        hit = served[bins]
+        combined = np.where(hit, lut, ensemble)
+        validation = {
+            'n_rows': int(len(X_val)),
+            'coverage': float(hit.mean()),
+            'agreement_on_covered': float((lut[hit] == ensemble[hit]).mean()) if hit.any() else None,
+            'agreement_overall': float((combined == ensemble).mean()),
+            'ensemble_accuracy': float((ensemble == y_val).mean()),
+            'combined_accuracy': float((combined == y_val).mean())
+        }
+
+        lookup = {
+            'model_type': 'Distilled Lookup Table',
+            'source_sha256': booster_sha256(booster),
+            'training_mode': training_mode,
+            'created': datetime.now().isoformat(),
+            'features': feature_columns,
+            'feature': feature,
+            'feature_gain': gain[feature],
+            'classes': CLASS_NAMES,
+            'min_agreement': min_agreement,
+            'samples_per_bin': len(others),
+            'edges': edges.tolist(),
+            'probabilities': table.round(6).tolist(),
+            'agreement': agreement.round(6).tolist(),
+            'validation': validation
+        }
+        path = os.path.join(self.models_dir, LOOKUP_TABLE_FILE)
+        with open(path, 'w') as f:
+            json.dump(lookup, f)
+
+        print(f"\n✓ Lookup table saved to {path}")
+        print(f"  Bins served by table: {served.sum()}/{len(served)}")
+        print(f"  Validation coverage: {validation['coverage']*100:.2f}%")
+        print(f"  Agreement with ensemble: {validation['agreement_overall']*100:.2f}%")
+        print(f"  Accuracy: {validation['combined_accuracy']*100:.2f}% "
+              f"(ensemble {validation['ensemble_accuracy']*100:.2f}%)")
+        return lookup
+
+    def save_drift_reference(self, data_dir='ml-model/data'):
+        """
+        Reference feature sketches for the API's drift monitor
+
+        One sketch per monitored model, built from the same CSVs and
+        feature columns the model was trained on.
+        """
+        reference = {'created': datetime.now().isoformat(), 'models': {}}
+        for key in MONITORED:
+            spec = MODEL_SPECS[key]
+            df = pd.read_csv(os.path.join(data_dir, spec['data_file']), usecols=spec['features'])
+            reference['models'][key] = reference_sketch(df[spec['features']].to_numpy(), spec['features'])
+        
+        path = os.path.join(self.models_dir, DRIFT_REFERENCE_FILE)
+        with open(path, 'w') as f:
+            json.dump(reference, f)
+        print(f"✓ Drift reference saved to {path}")
+        return reference
+    
+    def retrain_incremental(self, model_key, data_path, mode='continue', rounds=50,
+                            holdout_size=0.2, tolerance=0.02):
+        """
+        Warm-start one saved model on new data only
+        
+        The new rows are split into a fit part and a holdout. The update is
+        kept only if the holdout metric does not regress by more than
+        `tolerance` (relative) compared with the current model. Every attempt,
+        accepted or not, is appended to the metadata file's lineage.
+        """
+        if mode not in INCREMENTAL_MODES:
+            raise ValueError(f"Unknown incremental mode: {mode}")
+        spec = MODEL_SPECS[model_key]
+        is_classifier = model_key == 'classifier'
+        model_path = os.path.join(self.models_dir, spec['model_file'])
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"No saved model to warm-start from: {model_path}")
+        
+        print(f"\n>>> Incremental update of {model_key} ({mode}) from {data_path}")
+        start = time.perf_counter()
+        
+        df = pd.read_csv(data_path)
+        X = df[spec['features']]
+        y = df[spec['label']]
+        X_fit, X_hold, y_fit, y_hold = train_test_split(
+            X, y, test_size=holdout_size, random_state=42,
+            stratify=y if is_classifier else None
+        )
+        X_hold = X_hold.to_numpy(dtype=np.float32)
+        y_hold = y_hold.to_numpy()
+        
+        booster = xgb.Booster(model_file=model_path)
+        parent_rounds = booster.num_boosted_rounds()
+        before = holdout_score(booster, X_hold, y_hold, is_classifier)
+        
+        params, _ = native_params(self.params[spec['params']])
+        if mode == 'refresh':
+            params.pop('tree_method', None)
+            params.update({'process_type': 'update', 'updater': 'refresh', 'refresh_leaf': True})
+            rounds = parent_rounds
+        
+        dfit = xgb.DMatrix(X_fit, label=y_fit)
+        updated = xgb.train(params, dfit, num_boost_round=rounds, xgb_model=booster)
+        after = holdout_score(updated, X_hold, y_hold, is_classifier)
+        
+        if is_classifier:
+            accepted = after >= before * (1 - tolerance)
+        else:
+            accepted = after <= before * (1 + tolerance)
+        
+        metric = 'accuracy' if is_classifier else 'rmse'
+        parent_sha256 = file_sha256(model_path)
+        if accepted:
+            updated.save_model(model_path)
+            self._set_model(model_key, updated)
+            print(f"✓ Accepted: holdout {metric} {before:.4f} -> {after:.4f}")
+        else:
+            print(f"❌ Rejected: holdout {metric} {before:.4f} -> {after:.4f} "
+                  f"(tolerance {tolerance:.0%}), keeping current model")
+        
+        entry = {
+            'model': model_key,
+            'mode': mode,
+            'date': datetime.now().isoformat(),
+            'data_path': data_path,
+            'n_new_samples': len(df),
+            'parent_sha256': parent_sha256,
+            'sha256': file_sha256(model_path),
+            'parent_rounds': parent_rounds,
+            'rounds': updated.num_boosted_rounds() if accepted else parent_rounds,
+            'holdout_metric': metric,
+            'holdout_before': before,
+            'holdout_after': after,
+            'accepted': bool(accepted),
+            'duration_s': time.perf_counter() - start
+        }
+        
+        metadata_path = os.path.join(self.models_dir, spec['metadata_file'])
+        metadata = {}
+        if os.path.exists(metadata_path):
+            with open(metadata_path, 'r') as f:
+                metadata = json.load(f)
+        metadata.setdefault('lineage', []).append(entry)
+        if accepted:
+            metadata['last_updated'] = entry['date']
+        self._save_metadata(spec['metadata_file'], metadata)
+        
+        return entry
+    
+    def _set_model(self, model_key, model):
+        """Store a model on the matching attribute"""
+        if model_key == 'session':
+            self.session_model = model
+        elif model_key == 'classifier':
+            self.classification_model = model
+        else:
+            if self.trend_model is None:
+                self.trend_model = {}
+            self.trend_model[model_key.replace('trend_', '')] = model
+    
+    def export_bundle(self, path=None):
+        """
+        Pack the saved models into one checksummed bundle
+        
+        Every booster is stored in binary form together with its feature
+        schema, metrics and metadata. Raises ValueError if a saved model's
+        feature order disagrees with MODEL_SPECS.
+        """
+        path = path or os.path.join(self.models_dir, BUNDLE_FILE)
+        boosters, schemas = {}, {}
+        for key, spec in MODEL_SPECS.items():
+            booster = xgb.Booster(model_file=os.path.join(self.models_dir, spec['model_file']))
+            if booster.feature_names and list(booster.feature_names) != spec['features']:
+                raise ValueError(
+                    f"{spec['model_file']} was trained on {booster.feature_names}, "
+                    f"expected {spec['features']}"
+                )
+            booster.feature_names = spec['features']
+            config = json.loads(booster.save_config())
+            boosters[key] = booster
+            schemas[key] = {
+                'features': spec['features'],
+                'feature_types': booster.feature_types or ['float'] * len(spec['features']),
+                'dtype': 'float32',
+                'objective': config['learner']['objective']['name'],
+                'classes': CLASS_NAMES if key == 'classifier' else None,
+                'metadata_file': spec['metadata_file']
+            }
+        
+        metadata = {}
+        for filename in sorted({spec['metadata_file'] for spec in MODEL_SPECS.values()}
+                               | {'training_summary.json'}):
+            file_path = os.path.join(self.models_dir, filename)
+            if os.path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    metadata[filename.replace('_metadata.json', '').replace('.json', '')] = json.load(f)
+        
+        header = pack_bundle(path, boosters, schemas, metadata)
+        print(f"✓ Bundle {header['version_id']} saved to {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+        return header
     
     def load_models(self):
         """Load all trained models"""
@@ -331,40 +928,149 @@ class SanityXGBoostModels:
         
         print("\n✓ All models loaded successfully!")
 
-def train_all_models():
+def write_training_summary(models_dir='ml-model/trained_models'):
+    """Combine the per-model metadata files into training_summary.json"""
+    summary = {
+        'training_date': datetime.now().isoformat(),
+        'models_trained': 3
+    }
+    for key, filename in (('session_predictor', 'session_predictor_metadata.json'),
+                          ('trend_predictor', 'trend_predictor_metadata.json'),
+                          ('classifier', 'sanity_classifier_metadata.json')):
+        with open(os.path.join(models_dir, filename), 'r') as f:
+            summary[key] = json.load(f)
+    
+    with open(os.path.join(models_dir, 'training_summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+def train_all_models(training_mode='in_memory', chunk_size=DEFAULT_CHUNK_SIZE, use_tuned=False,
+                     models_dir='ml-model/trained_models', matrix_cache_dir=None,
+                     coreset_size=DEFAULT_CORESET_SIZE, compare_full=False):
     """Train all XGBoost models"""
     print("\n" + "="*70)
     print("SANITY ORB - XGBoost AI MODEL TRAINING")
     print("="*70)
     
-    models = SanityXGBoostModels()
+    params = None
+    if use_tuned:
+        params = load_tuned_params(models_dir)
+        print(f"Using tuned hyperparameters for: {', '.join(params) or 'none found'}")
+    
+    models = SanityXGBoostModels(models_dir=models_dir, training_mode=training_mode,
+                                 chunk_size=chunk_size, params=params,
+                                 matrix_cache_dir=matrix_cache_dir,
+                                 coreset_size=coreset_size, compare_full=compare_full)
     
     # Train all models
     session_metadata = models.train_session_predictor()
     trend_metadata = models.train_trend_predictor()
     classification_metadata = models.train_classifier()
+    models.distill_classifier()
+    models.save_drift_reference()
     
-    # Create summary
-    summary = {
-        'training_date': datetime.now().isoformat(),
-        'models_trained': 3,
-        'session_predictor': session_metadata,
-        'trend_predictor': trend_metadata,
-        'classifier': classification_metadata
-    }
-    
-    with open('ml-model/trained_models/training_summary.json', 'w') as f:
-        json.dump(summary, f, indent=2)
+    write_training_summary(models.models_dir)
+    models.export_bundle()
     
     print("\n" + "="*70)
     print("✓ ALL MODELS TRAINED SUCCESSFULLY!")
     print("="*70)
-    print(f"\nModels saved to: ml-model/trained_models/")
+    print(f"\nModels saved to: {models_dir}/")
     print("\nSummary:")
     print(f"  • Session Predictor - RMSE: {session_metadata['metrics']['test_rmse']:.2f}")
     print(f"  • Trend Predictor - RMSE: {trend_metadata['metrics']['value_rmse']:.2f}")
     print(f"  • Sanity Classifier - Accuracy: {classification_metadata['metrics']['test_accuracy']*100:.2f}%")
+    if models.matrix_cache is not None:
+        stats = models.matrix_cache.stats()
+        print(f"  • Matrix cache - {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['saved_s']:.2f}s saved")
     print("\n")
     
+def retrain_all_incremental(data_dir, mode='continue', rounds=50, tolerance=0.02,
+                            models_dir='ml-model/trained_models'):
+    """Warm-start every saved model on the CSVs found in data_dir"""
+    print("\n" + "="*70)
+    print("SANITY ORB - INCREMENTAL XGBoost RETRAINING")
+    print("="*70)
+    
+    models = SanityXGBoostModels(models_dir=models_dir)
+    results = []
+    for model_key, spec in MODEL_SPECS.items():
+        data_path = os.path.join(data_dir, spec['data_file'])
+        if not os.path.exists(data_path):
+            print(f"\n- Skipping {model_key}: {data_path} not found")
+            continue
+        results.append(models.retrain_incremental(
+            model_key, data_path, mode=mode, rounds=rounds, tolerance=tolerance
+        ))
+    
+    if any(entry['accepted'] for entry in results):
+        models.export_bundle()
+    if any(entry['accepted'] and entry['model'] == 'classifier' for entry in results):
+        # The lookup table was distilled from the previous classifier
+        models.distill_classifier()
+    
+    print("\n" + "="*70)
+    print("Summary:")
+    for entry in results:
+        status = '✓' if entry['accepted'] else '❌'
+        print(f"  {status} {entry['model']}: {entry['holdout_metric']} "
+              f"{entry['holdout_before']:.4f} -> {entry['holdout_after']:.4f} "
+              f"in {entry['duration_s']:.1f}s")
+    print("\n")
+    return results
+    
 if __name__ == '__main__':
-    train_all_models()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Train the Sanity Orb XGBoost models')
+    parser.add_argument('--mode', choices=TRAINING_MODES, default='in_memory',
+                        help='in_memory loads each CSV into pandas; quantile and '
+                             'external_memory stream it in chunks; coreset trains on a '
+                             'weighted stratified sample streamed in one pass')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='rows per chunk in the streaming modes')
+    parser.add_argument('--coreset-size', type=int, default=DEFAULT_CORESET_SIZE,
+                        help='rows kept per model in coreset mode')
+    parser.add_argument('--compare-full', action='store_true',
+                        help='in coreset mode, also train on the full data and report '
+                             'the holdout gap and speedup')
+    parser.add_argument('--models-dir', default='ml-model/trained_models')
+    parser.add_argument('--export-bundle', action='store_true',
+                        help='only pack the saved models into a single bundle file')
+    parser.add_argument('--distill', action='store_true',
+                        help='only rebuild the lookup table from the saved classifier')
+    parser.add_argument('--drift-reference', metavar='DATA_DIR', nargs='?', const='ml-model/data',
+                        help='only rebuild the drift monitor reference from the CSVs in DATA_DIR')
+    parser.add_argument('--use-tuned', action='store_true',
+                        help='train with the best configs from hyperparameter_tuning.py')
+    parser.add_argument('--matrix-cache', metavar='DIR', nargs='?', const=DEFAULT_CACHE_DIR,
+                        help='reuse parsed, split training matrices from DIR across runs '
+                             '(in_memory mode only)')
+    parser.add_argument('--incremental', metavar='DATA_DIR',
+                        help='warm-start the saved models on the new CSVs in DATA_DIR '
+                             'instead of training from scratch')
+    parser.add_argument('--incremental-mode', choices=INCREMENTAL_MODES, default='continue')
+    parser.add_argument('--rounds', type=int, default=50,
+                        help='boosting rounds to add in continue mode')
+    parser.add_argument('--tolerance', type=float, default=0.02,
+                        help='relative holdout regression allowed before an update is rejected')
+    args = parser.parse_args()
+    if args.matrix_cache and args.mode != 'in_memory':
+        parser.error('--matrix-cache only applies to --mode in_memory')
+    
+    if args.export_bundle:
+        SanityXGBoostModels(models_dir=args.models_dir).export_bundle()
+    elif args.distill:
+        SanityXGBoostModels(models_dir=args.models_dir).distill_classifier()
+    elif args.drift_reference:
+        SanityXGBoostModels(models_dir=args.models_dir).save_drift_reference(args.drift_reference)
+    elif args.incremental:
+        retrain_all_incremental(args.incremental, mode=args.incremental_mode,
+                                rounds=args.rounds, tolerance=args.tolerance,
+                                models_dir=args.models_dir)
+    else:
+        train_all_models(training_mode=args.mode, chunk_size=args.chunk_size,
+                         use_tuned=args.use_tuned, models_dir=args.models_dir,
+                         matrix_cache_dir=args.matrix_cache,
+                         coreset_size=args.coreset_size, compare_full=args.compare_full)
@@ -181,11 +181,12 @@ class SanityOrbAPI {
     });
   }
 
-  async getMLTrend() {
+  async getMLTrend(horizon?: number) {
     return this.request('/ml/predict/trend', {
       method: 'POST',
       body: JSON.stringify({
-        userId: this.userId
+        userId: this.userId,
+        horizon
       }),
     });
   }
@@ -220,6 +221,13 @@ class SanityOrbAPI {
 // ML API (XGBoost Models)
 // ============================================
 
+interface MLForecastStep {
+  step: number;
+  value: number;
+  confidence: number;
+  trend: string;
+}
+
 interface MLPredictionResponse {
   success: boolean;
   prediction?: number;
@@ -227,6 +235,7 @@ interface MLPredictionResponse {
   confidence?: number;
   trend?: string;
   slope?: number;
+  forecast?: MLForecastStep[];
   category?: string;
   error?: string;
 }
@@ -308,10 +317,10 @@ class SanityOrbMLAPI {
     });
   }
 
-  async predictTrend(history: number[]): Promise<MLPredictionResponse> {
+  async predictTrend(history: number[], horizon?: number): Promise<MLPredictionResponse> {
     return this.request('/predict/trend', {
       method: 'POST',
-      body: JSON.stringify({ history }),
+      body: JSON.stringify(horizon ? { history, horizon } : { history }),
     });
   }
 